@@ -0,0 +1 @@
+"""Benchmarks for Forged. Run them from the repository root so the asset paths resolve."""
@@ -0,0 +1,32 @@
+"""Benchmark the combat simulator. tests/test_simulate.py checks that it plays fights out like
+the game does.
+
+Usage: python -m benchmarks.combat
+"""
+
+from benchmarks.common import measure
+
+UNIT = 'ns/fight'
+
+# The number of fights each simulation of the benchmark plays out.
+FIGHTS = 100_000
+
+
+def run(number: int = 1, fights: int = FIGHTS) -> dict[str, float]:
+    """Return the cost per fight in nanoseconds of simulating the player's dagger against a
+    fireball and against a sword."""
+    from game.item import Magic, Weapon
+    from game.simulate import Combatant, simulate
+
+    dagger = Combatant(Weapon('RUSTY DAGGER', '', 3))
+    results = {}
+    for name, item in (('fireball', Magic('FIREBALL', '', 100)), ('sword', Weapon('SWORD', '', 5))):
+        foe = Combatant(item)
+        results[f'dagger vs {name}'] = measure(lambda: simulate(dagger, foe, fights),
+                                               number) / fights * 1e9
+    return results
+
+
+if __name__ == '__main__':
+    for name, cost in run().items():
+        print(f'{name:>20}: {cost:10.2f} {UNIT}')
@@ -0,0 +1,39 @@
+"""Benchmark playing commands through the headless engine: parsing, dispatch and the handlers.
+
+Usage: python -m benchmarks.commands
+"""
+
+from benchmarks.common import measure
+
+UNIT = 'us/command'
+
+# A round of play that leaves the world as it found it, so that it can be repeated.
+ROUND = ('LOOK', 'I', 'EXAMINE DECK', 'EXAMINE RUSTY DAGGER', 'TAKE TORCH', 'SIT', 'STAND',
+         'DROP SHABBY JERKIN', 'TAKE SHABBY JERKIN', 'DROP ALL', 'TAKE RUSTY DAGGER',
+         'TAKE SHABBY JERKIN', 'WAIT', 'JUMP', 'XYZZY')
+
+
+def run(number: int = 200) -> dict[str, float]:
+    """Return the cost per command in microseconds of playing a round of commands, and of only
+    handling their parsed form."""
+    from game.engine import Engine
+
+    engine = Engine()
+    parsed = [engine.parser.parse_command(user_input) for user_input in ROUND]
+
+    def submit() -> None:
+        for user_input in ROUND:
+            engine.submit(user_input)
+
+    def handle() -> None:
+        engine.output = []
+        for action, subject in parsed:
+            engine.handle_command(action, subject)
+
+    return {name: measure(func, number) / len(ROUND) * 1e6
+            for name, func in (('submit', submit), ('handle_command', handle))}
+
+
+if __name__ == '__main__':
+    for name, cost in run().items():
+        print(f'{name:>14}: {cost:8.2f} {UNIT}')
@@ -0,0 +1,27 @@
+"""Helpers shared by the benchmarks."""
+
+import os
+from time import perf_counter
+from typing import Callable
+
+
+def init_headless() -> None:
+    """Initialize pygame with the dummy video and audio drivers, so that the benchmarks run on
+    machines without a display, a sound card or a GPU."""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    import pygame
+    pygame.init()
+
+
+def measure(func: Callable[[], object], number: int, repeat: int = 5) -> float:
+    """Call func number times, repeat times over, and return the best time per call in
+    seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (perf_counter() - start) / number)
+    return best
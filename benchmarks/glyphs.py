@@ -0,0 +1,43 @@
+"""Benchmark the cost of drawing a line of the transcript with Font.render and with a GlyphAtlas.
+
+Usage: python -m benchmarks.glyphs
+"""
+
+from benchmarks.common import init_headless, measure
+
+UNIT = 'us/line'
+
+
+def run(number: int = 2000) -> dict[str, float]:
+    """Return the cost per line in microseconds of every way of drawing a line."""
+    import pygame
+    from game.glyphs import GlyphAtlas
+    from game.layout import TextLayout
+    from game.world import load_world
+
+    screen = pygame.display.set_mode((1280, 720))
+    font = pygame.font.Font('assets/font/Commodore Pixelized v1.2.ttf', 36)
+    lines = TextLayout()
+    world = load_world()
+    lines.append(world.room(world.start).desc)
+    atlas = GlyphAtlas(font, 'white', 'black')
+
+    def font_render() -> None:
+        for line in lines:
+            screen.blit(font.render(line, True, 'white'), (18, 18))
+
+    def atlas_blit() -> None:
+        for line in lines:
+            atlas.blit(screen, line, (18, 18))
+
+    return {name: measure(func, number // len(lines)) / len(lines) * 1e6
+            for name, func in (('font.render', font_render),
+                               ('atlas.blit', atlas_blit))}
+
+
+if __name__ == '__main__':
+    init_headless()
+    results = run()
+    baseline = results['font.render']
+    for name, cost in results.items():
+        print(f'{name:>14}: {cost:8.2f} us/line ({baseline / cost:5.1f}x)')
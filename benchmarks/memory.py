@@ -0,0 +1,62 @@
+"""Benchmark the memory taken by each kind of entity of the game.
+
+Usage: python -m benchmarks.memory
+"""
+
+import json
+import os
+import tempfile
+import tracemalloc
+from typing import Callable
+
+UNIT = 'bytes/entity'
+
+COUNT = 20_000
+# The description every entity of a kind shares, decoded anew for each, as the world loads it.
+DESC = b'A PLAIN THING, OF NO PARTICULAR INTEREST TO ANYONE WHO SEES IT.'
+
+
+def allocated(make: Callable[[int], object], count: int = COUNT) -> float:
+    """Return the bytes allocated per entity by making the given number of entities, each made by
+    calling make with its number."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [make(number) for number in range(count)]
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del entities
+    return size / count
+
+
+def run(count: int = COUNT) -> dict[str, float]:
+    """Return the bytes each item, weapon, room and NPC takes, and each room of a loaded world
+    with its items."""
+    from benchmarks.world import ITEMS_PER_ROOM, build_source
+    from game.character import NPC
+    from game.item import Item, Weapon
+    from game.room import Room
+    from game.world import World, compile_world
+
+    room = Room('room', DESC.decode())
+    results = {
+        'item': allocated(lambda number: Item(f'THING {number}', DESC.decode()), count),
+        'weapon': allocated(lambda number: Weapon(f'SWORD {number}', DESC.decode(), 3), count),
+        'room': allocated(lambda number: Room(f'room {number}', DESC.decode()), count),
+        'npc': allocated(lambda number: NPC(room, f'NPC {number}', DESC.decode()), count)}
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_path = os.path.join(directory, 'world.json')
+        path = os.path.join(directory, 'world.bin')
+        size = count // ITEMS_PER_ROOM
+        with open(source_path, 'w') as file:
+            json.dump(build_source(size), file)
+        compile_world(source_path, path)
+        world = World(path)
+        results[f'world room with {ITEMS_PER_ROOM} items'] = allocated(world.room, size)
+        world.close()
+    return results
+
+
+if __name__ == '__main__':
+    for name, cost in run().items():
+        print(f'{name:>24}: {cost:10.1f} {UNIT}')
@@ -0,0 +1,87 @@
+"""Benchmark the command parser against the NLTK-based parser it replaced, and check that the
+tokenizer splits a corpus of commands the way NLTK does. NLTK is only needed for the comparison.
+
+Usage: python -m benchmarks.parser
+"""
+
+from benchmarks.common import measure
+
+UNIT = 'us/command'
+
+# Commands the way players type them, including typos and punctuation.
+CORPUS = (
+    'LOOK', 'L', 'I', 'INVENTORY', 'WAIT', 'SIT', 'STAND', 'SLEEP', 'TAKE', 'JUMP',
+    'TAKE DAGGER', 'TAKE THE DAGGER', 'TAKE RUSTY DAGGER', 'TAKE THE RUSTY DAGGER.',
+    'EXAMINE DECK', 'EXAMINE THE DECK OF CARDS', 'ATTACK DECK', 'ATTACK DECK!', 'DROP ALL',
+    'DROP THE DAGGER', 'EQUIP DAGGER', 'PLEASE TAKE THE DAGGER', 'I WANNA TAKE THE DAGGER',
+    "DON'T TAKE THE DAGGER", "TAKE DECK'S CARDS", 'GO NORTH', 'NORTH', 'WALK WEST', 'TAKE ALL',
+    'LOOK AT THE DECK?', 'TAKE DAGGER, THEN LOOK', '"TAKE DAGGER"', 'TAKE (DAGGER)',
+    'TAKE DAGGER...', 'TAKE DAGGER. LOOK.', 'GIMME THE DAGGER', 'ATTACK DECK WITH DAGGER',
+    '  TAKE   DAGGER  ', 'EXAMINE NOTHING', 'XYZZY', "'TWAS DAGGER", '',
+)
+
+
+NOUNS = ['NORTH', 'EAST', 'SOUTH', 'WEST', 'ALL', 'DAGGER', 'RUSTY DAGGER', 'DECK']
+
+
+def nltk_parse(verbs: set[str], nouns: list[str], stop_words: list[str],
+               user_input: str) -> tuple[str | None] | None:
+    """Parse the given command the way the parser did with NLTK and a list of nouns."""
+    from nltk.tokenize import word_tokenize
+
+    if user_input == '':
+        return
+    words = [word for word in word_tokenize(user_input) if word.isalpha()
+             and word not in stop_words]
+    action = None
+    subject = None
+    for index, word in enumerate(words):
+        if word in verbs:
+            action = word
+        elif word in nouns:
+            subject = word
+        elif index < len(words) - 1:
+            two_word = word + ' ' + words[index + 1]
+            if two_word in nouns:
+                subject = two_word
+    return (action, subject)
+
+
+def run(number: int = 200) -> dict[str, float]:
+    """Return the cost per command in microseconds of each parser. Raise an AssertionError if
+    the tokenizer and NLTK disagree on any command of the corpus."""
+    from game.parser import Parser, tokenize
+
+    parser = Parser()
+    for noun in NOUNS:
+        parser.nouns.add(noun)
+
+    def parse() -> None:
+        for command in CORPUS:
+            parser.parse_command(command)
+
+    results = {'Parser': measure(parse, number) / len(CORPUS) * 1e6}
+    try:
+        from nltk.tokenize import word_tokenize
+        from nltk.corpus import stopwords
+        stop_words = stopwords.words('english')
+        for command in CORPUS:
+            expected = word_tokenize(command)
+            assert tokenize(command) == expected, (command, expected)
+    except (ImportError, LookupError):
+        # NLTK or its data is not installed.
+        return results
+
+    def parse_nltk() -> None:
+        for command in CORPUS:
+            nltk_parse(parser.verbs, NOUNS, stop_words, command)
+
+    results['NLTK'] = measure(parse_nltk, max(1, number // 10)) / len(CORPUS) * 1e6
+    return results
+
+
+if __name__ == '__main__':
+    results = run()
+    baseline = results.get('NLTK', results['Parser'])
+    for name, cost in results.items():
+        print(f'{name:>14}: {cost:8.2f} us/command ({baseline / cost:5.1f}x)')
@@ -0,0 +1,57 @@
+"""Benchmark the frame time of the transcript screen against transcripts of growing length.
+
+Usage: python -m benchmarks.render
+"""
+
+from benchmarks.common import init_headless, measure
+
+UNIT = 'us/frame'
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def run(number: int = 200, sizes: tuple[int, ...] = SIZES) -> dict[str, float]:
+    """Return the cost per frame in microseconds of the transcript screen, with a transcript of
+    each of the given numbers of lines, for a frame in which nothing changed, one that scrolls
+    by a line and one that adds a message."""
+    from game.ui import UIManager
+    from game.world import load_world
+
+    world = load_world()
+    text = world.room(world.start).desc
+    ui = UIManager()
+    results = {}
+    for size in sizes:
+        ui.lines.clear()
+        while len(ui.lines) < size:
+            ui.lines.append(text)
+        bottom = max(0, len(ui.lines) - 8)
+        ui.scroll_position = bottom
+        ui.invalidate()
+        ui.render_text()
+        ui.update()
+
+        def idle() -> None:
+            ui.render_text()
+            ui.update()
+
+        def scroll() -> None:
+            ui.scroll_position = bottom - 1 if ui.scroll_position == bottom else bottom
+            ui.render_text()
+            ui.update()
+
+        def message() -> None:
+            ui.lines.append('YOU LOITER.')
+            ui.scroll_position = max(0, len(ui.lines) - 8)
+            ui.render_text()
+            ui.update()
+
+        for name, func in (('idle', idle), ('scroll', scroll), ('message', message)):
+            results[f'{name} {size}'] = measure(func, number) * 1e6
+    return results
+
+
+if __name__ == '__main__':
+    init_headless()
+    for name, cost in run().items():
+        print(f'{name:>14}: {cost:8.2f} {UNIT}')
@@ -0,0 +1,48 @@
+"""Benchmark walking from room to room in worlds of growing size.
+
+Usage: python -m benchmarks.rooms
+"""
+
+from benchmarks.common import measure
+
+UNIT = 'us/transition'
+
+SIZES = (10, 100, 1_000)
+ITEMS_PER_ROOM = 20
+
+
+def build_world(size: int) -> list:
+    """Return a ring of the given number of rooms, each with ITEMS_PER_ROOM items and an exit
+    to the next room."""
+    from game.item import Item
+    from game.room import Room
+
+    rooms = [Room(f'room {number}', f'ROOM {number}.',
+                  [Item(f'THING {number} {index}', 'A THING.') for index in range(ITEMS_PER_ROOM)])
+             for number in range(size)]
+    for room, next_room in zip(rooms, rooms[1:] + rooms[:1]):
+        room.exits['NORTH'] = next_room
+    return rooms
+
+
+def run(number: int = 5, sizes: tuple[int, ...] = SIZES) -> dict[str, float]:
+    """Return the cost per room transition in microseconds of walking around each world."""
+    from game.engine import Engine
+
+    engine = Engine()
+    results = {}
+    for size in sizes:
+        rooms = build_world(size)
+        engine.set_room(rooms[0])
+
+        def walk() -> None:
+            for _ in rooms:
+                engine.set_room(engine.current_room.get_exit('NORTH'))
+
+        results[f'set_room {size}'] = measure(walk, number) / size * 1e6
+    return results
+
+
+if __name__ == '__main__':
+    for name, cost in run().items():
+        print(f'{name:>14}: {cost:8.2f} {UNIT}')
@@ -0,0 +1,91 @@
+"""Run the benchmarks and write the results to a JSON file, to compare them across commits.
+
+Usage: python -m benchmarks.run [--output FILE] [--compare FILE] [SUITE ...]
+
+The results file holds the commit and the machine the benchmarks ran on, and the cost of every
+case, keyed by suite and case name:
+
+    {"commit": "...", "results": {"render/idle 1000": {"value": 12.3, "unit": "us/frame"}}}
+"""
+
+import json
+import platform
+import subprocess
+import sys
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from importlib import import_module
+
+from benchmarks.common import init_headless
+
+SUITES = ('parser', 'commands', 'glyphs', 'render', 'title', 'rooms', 'world', 'save', 'memory',
+          'combat', 'server')
+
+# How much slower a case may get, as a ratio, before the comparison flags it.
+TOLERANCE = 1.1
+
+
+def git_commit() -> str | None:
+    """Return the commit the working tree is at, marked as dirty if it has changes, or None if
+    it is not a git repository."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        changed = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                 capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + '-dirty' if changed else commit
+
+
+def run_suites(suites: list[str]) -> dict:
+    """Run the given suites and return the report of their results."""
+    import pygame
+
+    results = {}
+    for suite in suites:
+        module = import_module(f'benchmarks.{suite}')
+        for case, value in module.run().items():
+            results[f'{suite}/{case}'] = {'value': round(value, 3), 'unit': module.UNIT}
+            print(f'{suite + "/" + case:<32}{value:12.2f} {module.UNIT}', file=sys.stderr)
+    return {'commit': git_commit(),
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'machine': platform.platform(),
+            'results': results}
+
+
+def compare(baseline: dict, report: dict) -> None:
+    """Print the cost of every case in the report against the baseline report."""
+    print(f'{"CASE":<32}{"BASELINE":>12}{"CURRENT":>12}{"RATIO":>8}')
+    for case, result in report['results'].items():
+        if case not in baseline['results']:
+            print(f'{case:<32}{"-":>12}{result["value"]:>12.2f}')
+            continue
+        base = baseline['results'][case]['value']
+        ratio = result['value'] / base if base else float('inf')
+        flag = '  slower' if ratio > TOLERANCE else ''
+        print(f'{case:<32}{base:>12.2f}{result["value"]:>12.2f}{ratio:>8.2f}{flag}')
+
+
+if __name__ == '__main__':
+    arguments = ArgumentParser(description='Run the Forged benchmarks.')
+    arguments.add_argument('suites', nargs='*', metavar='SUITE',
+                           help=f'the suites to run, out of {", ".join(SUITES)} (all by default)')
+    arguments.add_argument('--output', default='benchmark_results.json',
+                           help='the file to write the results to')
+    arguments.add_argument('--compare', metavar='FILE',
+                           help='a results file of an earlier run to compare the results with')
+    options = arguments.parse_args()
+    for suite in options.suites:
+        if suite not in SUITES:
+            arguments.error(f'unknown suite: {suite}')
+
+    init_headless()
+    report = run_suites(options.suites or list(SUITES))
+    with open(options.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    if options.compare:
+        with open(options.compare) as file:
+            compare(json.load(file), report)
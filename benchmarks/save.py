@@ -0,0 +1,65 @@
+"""Benchmark saving and restoring games in compiled worlds of growing size.
+
+Usage: python -m benchmarks.save
+"""
+
+import json
+import os
+import tempfile
+
+from benchmarks.common import measure
+from benchmarks.world import build_source
+
+UNIT = 'us'
+
+SIZES = (1_000, 50_000)
+# The number of rooms walked through before saving, dropping an item in every tenth room.
+WALK = 500
+
+
+def run(number: int = 20, sizes: tuple[int, ...] = SIZES) -> dict[str, float]:
+    """Return, for a game in a compiled world of each of the given sizes, after a walk that
+    loaded and changed rooms all over it, the time in microseconds it takes to capture its state
+    on the game thread, to write it as a checkpoint, and to restore it in a new game."""
+    from game.engine import Engine
+    from game.save import SaveFile, capture, restore
+    from game.world import World, compile_world
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            source_path = os.path.join(directory, f'{size}.json')
+            path = os.path.join(directory, f'{size}.bin')
+            save_path = os.path.join(directory, f'{size}.save')
+            with open(source_path, 'w') as file:
+                json.dump(build_source(size), file)
+            compile_world(source_path, path)
+
+            engine = Engine(World(path))
+            for step in range(WALK):
+                room = engine.current_room
+                if step % 10 == 0:
+                    item = room.items[0]
+                    room.remove_item(item)
+                    engine.player.add_item(item)
+                    engine.player.remove_item(item)
+                engine.set_room(room.get_exit('NORTH'))
+
+            results[f'capture {size}'] = measure(lambda: capture(engine), number) * 1e6
+            snapshot = capture(engine)
+
+            def write() -> None:
+                SaveFile(save_path, engine.world.fingerprint).write(snapshot)
+
+            results[f'write {size}'] = measure(write, number) * 1e6
+            restored = Engine(World(path))
+            results[f'restore {size}'] = measure(lambda: restore(restored, save_path),
+                                                 number) * 1e6
+            engine.world.close()
+            restored.world.close()
+    return results
+
+
+if __name__ == '__main__':
+    for name, cost in run().items():
+        print(f'{name:>16}: {cost:10.2f} {UNIT}')
@@ -0,0 +1,143 @@
+"""Load test the server with many players entering commands at once, and report the commands it
+handles per second and how long players wait for their answers.
+
+Usage: python -m benchmarks.server [--host HOST] [--port PORT] [--unix PATH] [--sessions N]
+                                   [--commands N]
+
+Without an address, a server is started for the test on a Unix socket, and stopped after it.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+from argparse import ArgumentParser
+from time import perf_counter
+from typing import Awaitable, Callable
+
+UNIT = 'us'
+
+SESSIONS = (100, 1_000)
+# The number of commands each player enters before quitting.
+COMMANDS = 20
+# The commands the players enter, in turn.
+SCRIPT = (b'LOOK\n', b'INVENTORY\n', b'EXAMINE RUSTY DAGGER\n', b'WAIT\n', b'DROP RUSTY DAGGER\n',
+          b'TAKE RUSTY DAGGER\n', b'SIT\n', b'STAND\n')
+
+Connect = Callable[[], Awaitable[tuple[asyncio.StreamReader, asyncio.StreamWriter]]]
+
+
+async def answer(reader: asyncio.StreamReader) -> list[bytes]:
+    """Return the lines of the next answer of the server, up to the empty line that ends it.
+
+    Raises:
+        ConnectionError: If the server closed the connection before the end of the answer.
+    """
+    lines = []
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionError('the server closed the connection')
+        if line == b'\n':
+            return lines
+        lines.append(line)
+
+
+async def player(connect: Connect, commands: int, latencies: list[float]) -> None:
+    """Connect to the server, enter the given number of commands, each once the answer to the one
+    before it has come, and quit. Add the time each answer took, in seconds, to latencies."""
+    reader, writer = await connect()
+    await answer(reader)
+    for index in range(commands):
+        start = perf_counter()
+        writer.write(SCRIPT[index % len(SCRIPT)])
+        await answer(reader)
+        latencies.append(perf_counter() - start)
+    writer.write(b'QUIT\n')
+    await answer(reader)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def load(connect: Connect, sessions: int, commands: int) -> tuple[float, list[float]]:
+    """Play the given number of players at once, each entering the given number of commands, and
+    return the commands handled per second and the sorted time each answer took."""
+    latencies = []
+    start = perf_counter()
+    await asyncio.gather(*(player(connect, commands, latencies) for _ in range(sessions)))
+    elapsed = perf_counter() - start
+    latencies.sort()
+    return len(latencies) / elapsed, latencies
+
+
+def percentile(latencies: list[float], share: float) -> float:
+    """Return the given percentile of the given sorted latencies."""
+    return latencies[min(int(share / 100 * len(latencies)), len(latencies) - 1)]
+
+
+def start_server(path: str, sessions: int) -> subprocess.Popen:
+    """Start a server listening on the Unix socket at the given path, in a process of its own so
+    that the players do not slow it down, and return it once it listens."""
+    server = subprocess.Popen([sys.executable, '-m', 'game.server', '--unix', path,
+                               '--sessions', str(sessions)], stdout=subprocess.PIPE)
+    if not server.stdout.readline():
+        raise RuntimeError(f'the server exited with status {server.wait()}')
+    return server
+
+
+def run(sessions: tuple[int, ...] = SESSIONS, commands: int = COMMANDS) -> dict[str, float]:
+    """Return, for each of the given numbers of players entering commands at once, the time in
+    microseconds the server takes per command (the inverse of its throughput), and the median and
+    99th percentile time a player waits for an answer."""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'server.sock')
+        server = start_server(path, max(sessions))
+        try:
+            for count in sessions:
+                throughput, latencies = asyncio.run(
+                    load(lambda: asyncio.open_unix_connection(path), count, commands))
+                results[f'{count} sessions, per command'] = 1e6 / throughput
+                results[f'{count} sessions, p50 latency'] = percentile(latencies, 50) * 1e6
+                results[f'{count} sessions, p99 latency'] = percentile(latencies, 99) * 1e6
+        finally:
+            server.terminate()
+            server.wait()
+    return results
+
+
+if __name__ == '__main__':
+    arguments = ArgumentParser(description='Load test a Forged server.')
+    arguments.add_argument('--host', help='the host of a running server to test')
+    arguments.add_argument('--port', type=int, default=4000, help='the port of the server')
+    arguments.add_argument('--unix', metavar='PATH', help='the Unix socket of the server')
+    arguments.add_argument('--sessions', type=int, default=SESSIONS[-1],
+                           help='the number of players at once')
+    arguments.add_argument('--commands', type=int, default=COMMANDS,
+                           help='the number of commands each player enters')
+    options = arguments.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        server = None
+        if options.host is not None:
+            def connect() -> Awaitable:
+                return asyncio.open_connection(options.host, options.port)
+        else:
+            path = options.unix
+            if path is None:
+                path = os.path.join(directory, 'server.sock')
+                server = start_server(path, options.sessions)
+
+            def connect() -> Awaitable:
+                return asyncio.open_unix_connection(path)
+        try:
+            throughput, latencies = asyncio.run(load(connect, options.sessions, options.commands))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    print(f'{options.sessions} sessions, {len(latencies)} commands: {throughput:.0f} commands/s')
+    for share in (50, 90, 99, 100):
+        print(f'p{share:<3} latency: {percentile(latencies, share) * 1e3:8.3f} ms')
@@ -0,0 +1,45 @@
+"""Benchmark the frame time of the title screen.
+
+Usage: python -m benchmarks.title
+"""
+
+from benchmarks.common import init_headless, measure
+
+UNIT = 'us/frame'
+
+
+def run(number: int = 200) -> dict[str, float]:
+    """Return the cost per frame in microseconds of the title screen, for a frame in which the
+    mouse did not move, one in which it moved the background, and one in which it moved on and
+    off the start button."""
+    from game.ui import UIManager
+
+    ui = UIManager()
+    ui.title_elements.initialize(ui.font, ui.title_font)
+    button = ui.title_elements.press_enter_rect.center
+    positions = [(300, 200), (306, 206)]
+    ui.render_main_menu(positions[0])
+    ui.update()
+
+    def idle() -> None:
+        ui.render_main_menu(positions[0])
+        ui.update()
+
+    def parallax() -> None:
+        positions.reverse()
+        ui.render_main_menu(positions[0])
+        ui.update()
+
+    def hover() -> None:
+        positions[0] = button if positions[0] != button else (300, 200)
+        ui.render_main_menu(positions[0])
+        ui.update()
+
+    return {name: measure(func, number) * 1e6
+            for name, func in (('idle', idle), ('parallax', parallax), ('hover', hover))}
+
+
+if __name__ == '__main__':
+    init_headless()
+    for name, cost in run().items():
+        print(f'{name:>14}: {cost:8.2f} {UNIT}')
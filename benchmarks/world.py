@@ -0,0 +1,68 @@
+"""Benchmark opening compiled worlds of growing size, and walking through them region by region.
+
+Usage: python -m benchmarks.world
+"""
+
+import json
+import os
+import tempfile
+
+from benchmarks.common import measure
+
+UNIT = 'us'
+
+SIZES = (1_000, 10_000, 50_000)
+ROOMS_PER_REGION = 50
+ITEMS_PER_ROOM = 5
+
+
+def build_source(size: int) -> dict:
+    """Return the source of a world of the given number of rooms, in regions of
+    ROOMS_PER_REGION rooms, each room with ITEMS_PER_ROOM items and exits to the rooms before and
+    after it, and an NPC in the first room of every region."""
+    regions = {}
+    npcs = {}
+    for number in range(size):
+        region = regions.setdefault(f'region {number // ROOMS_PER_REGION}', {'rooms': {}})
+        region['rooms'][f'room {number}'] = {
+            'desc': f'ROOM {number}.',
+            'exits': {'NORTH': f'room {(number + 1) % size}',
+                      'SOUTH': f'room {(number - 1) % size}'},
+            'items': [{'name': f'THING {number} {index}', 'desc': 'A THING.'}
+                      for index in range(ITEMS_PER_ROOM)]}
+        if number % ROOMS_PER_REGION == 0:
+            npcs[f'npc {number}'] = {'name': f'NPC {number}', 'desc': 'AN NPC.',
+                                     'room': f'room {number}'}
+    return {'start': 'room 0', 'regions': regions, 'npcs': npcs}
+
+
+def run(number: int = 5, sizes: tuple[int, ...] = SIZES) -> dict[str, float]:
+    """Return, for a compiled world of each of the given sizes, the time in microseconds it takes
+    to open it and to start a game in it and walk 1000 rooms from the start."""
+    from game.engine import Engine
+    from game.world import World, compile_world
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            source_path = os.path.join(directory, f'{size}.json')
+            path = os.path.join(directory, f'{size}.bin')
+            with open(source_path, 'w') as file:
+                json.dump(build_source(size), file)
+            compile_world(source_path, path)
+
+            results[f'open {size}'] = measure(lambda: World(path).close(), number) * 1e6
+
+            def walk() -> None:
+                engine = Engine(World(path))
+                for _ in range(1000):
+                    engine.set_room(engine.current_room.get_exit('NORTH'))
+                engine.world.close()
+
+            results[f'walk 1000 of {size}'] = measure(walk, number) * 1e6
+    return results
+
+
+if __name__ == '__main__':
+    for name, cost in run().items():
+        print(f'{name:>22}: {cost:10.2f} {UNIT}')
@@ -1,3 +1,7 @@
 """Game is the package containing the major code elements used to build Forged."""
 
-__all__ = ['game', 'item', 'player', 'room', 'ui', 'settings', 'parser', 'character']
+__all__ = ['game', 'item', 'player', 'room', 'ui', 'settings', 'parser', 'character', 'layout',
+           'glyphs', 'dirty', 'scheduler', 'scrollback', 'vocabulary', 'registry',
+           'commands', 'verbs', 'engine', 'profiler', 'dice', 'replay', 'assets',
+           'soundbank', 'tiles', 'typewriter',
+           'history', 'world', 'save', 'simulate', 'server']
@@ -0,0 +1,209 @@
+"""The assets module loads the images, fonts and sounds of the game, once, and shares them.
+
+Assets are asked for by path and variant, and released when no longer needed:
+
+    background = assets.image('assets/images/tomb_bg.png', alpha=False)
+    ...
+    assets.release(background)
+
+Files that will be needed soon can be read ahead of time on a background thread with preload, so
+that asking for them later does not wait on the disk.
+"""
+
+import sys
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from threading import Lock
+from time import perf_counter
+from typing import Callable, TextIO
+
+import pygame
+
+from game.settings import ASSET_CACHE_SIZE
+
+# The path of the font of the game.
+FONT_PATH = 'assets/font/Commodore Pixelized v1.2.ttf'
+
+
+class _Asset:
+    """A loaded asset, with the number of its users and how long it took to load.
+
+    Attributes:
+        value: The asset.
+        refs: The number of users of the asset that have not released it.
+        hits: The number of times the asset was asked for after it was loaded.
+        seconds: The time spent loading the asset, including reading its file.
+        preloaded: Whether the file of the asset was read ahead of time.
+    """
+    # Attribute types
+    value: object
+    refs: int
+    hits: int
+    seconds: float
+    preloaded: bool
+
+    def __init__(self, value: object, seconds: float, preloaded: bool) -> None:
+        """Initialize a loaded asset with no users."""
+        self.value = value
+        self.refs = 0
+        self.hits = 0
+        self.seconds = seconds
+        self.preloaded = preloaded
+
+
+class AssetManager:
+    """A cache of the assets of the game, keyed by kind, path and variant, such as the size of a
+    font or the scale of an image. An asset is kept while it has users, and afterwards among a
+    limited number of unused assets, the least recently used of which are forgotten first. The
+    contents of each file are kept while an asset made from it is, so that the variants of a file
+    read it only once.
+
+    Attributes:
+        max_unused: The number of assets without users that are kept.
+        _assets: The loaded assets by key.
+        _keys: The key of each loaded asset by the id of the asset.
+        _unused: The keys of the assets without users, the least recently used first.
+        _files: The contents of the files of the loaded assets by path.
+        _pending: The files being read on the background thread by path.
+        _executor: The background thread the files are read on, created the first time.
+        _lock: Guards the files being read, which the background thread completes.
+    """
+    # Attribute types
+    max_unused: int
+    _assets: dict[tuple, _Asset]
+    _keys: dict[int, tuple]
+    _unused: OrderedDict[tuple, None]
+    _files: dict[str, bytes]
+    _pending: dict[str, Future]
+    _executor: ThreadPoolExecutor | None
+    _lock: Lock
+
+    def __init__(self, max_unused: int = 32) -> None:
+        """Initialize an empty cache that keeps the given number of assets without users."""
+        self.max_unused = max_unused
+        self._assets = {}
+        self._keys = {}
+        self._unused = OrderedDict()
+        self._files = {}
+        self._pending = {}
+        self._executor = None
+        self._lock = Lock()
+
+    def image(self, path: str, alpha: bool = True,
+              scale: tuple[int, int] | None = None) -> pygame.Surface:
+        """Return the image at the given path, converted to the format of the display, with
+        per-pixel transparency if alpha is true, and scaled to the given size if there is one.
+        The display must have been set up."""
+        def load(data: bytes) -> pygame.Surface:
+            surface = pygame.image.load(BytesIO(data), path)
+            surface = surface.convert_alpha() if alpha else surface.convert()
+            return surface if scale is None else pygame.transform.smoothscale(surface, scale)
+        return self._get(('image', path, alpha, scale), load)
+
+    def font(self, path: str, size: int) -> pygame.font.Font:
+        """Return the font at the given path in the given size."""
+        return self._get(('font', path, size),
+                         lambda data: pygame.font.Font(BytesIO(data), size))
+
+    def sound(self, path: str) -> pygame.mixer.Sound:
+        """Return the sound at the given path. The mixer must have been set up."""
+        return self._get(('sound', path), lambda data: pygame.mixer.Sound(file=BytesIO(data)))
+
+    def _get(self, key: tuple, load: Callable[[bytes], object]) -> object:
+        """Return the asset with the given key, loading it from the contents of its file with the
+        given function if it is not loaded, and count a new user of it."""
+        asset = self._assets.get(key)
+        if asset is None:
+            start = perf_counter()
+            preloaded = key[1] in self._pending
+            value = load(self._read(key[1]))
+            asset = _Asset(value, perf_counter() - start, preloaded)
+            self._assets[key] = asset
+            self._keys[id(asset.value)] = key
+        else:
+            asset.hits += 1
+        if asset.refs == 0:
+            self._unused.pop(key, None)
+        asset.refs += 1
+        return asset.value
+
+    def release(self, value: object) -> None:
+        """Count one user fewer of the given asset. An asset without users is kept until too many
+        others are unused.
+
+        Raises:
+            KeyError: If the asset was not loaded by this manager.
+        """
+        key = self._keys[id(value)]
+        asset = self._assets[key]
+        if asset.refs == 0:
+            return
+        asset.refs -= 1
+        if asset.refs == 0:
+            self._unused[key] = None
+            while len(self._unused) > self.max_unused:
+                self._forget(self._unused.popitem(last=False)[0])
+
+    def _forget(self, key: tuple) -> None:
+        """Forget the unused asset with the given key, and the contents of its file if no other
+        asset is made from it."""
+        asset = self._assets.pop(key)
+        del self._keys[id(asset.value)]
+        if all(other[1] != key[1] for other in self._assets):
+            self._files.pop(key[1], None)
+
+    def preload(self, *paths: str) -> None:
+        """Start reading the files at the given paths on the background thread, unless they are
+        read already. Missing files are only reported when an asset is made from them."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1,
+                                                    thread_name_prefix='asset-preload')
+            for path in paths:
+                if path not in self._files and path not in self._pending:
+                    self._pending[path] = self._executor.submit(_read_file, path)
+
+    def _read(self, path: str) -> bytes:
+        """Return the contents of the file at the given path, waiting for the background thread
+        if it is reading it."""
+        data = self._files.get(path)
+        if data is None:
+            with self._lock:
+                future = self._pending.pop(path, None)
+            data = _read_file(path) if future is None else future.result()
+            self._files[path] = data
+        return data
+
+    def stats(self) -> dict[str, tuple[int, int, float, bool]]:
+        """Return the number of users, the number of hits, the seconds spent loading and whether
+        the file was read ahead of time of each loaded asset, by kind, path and variant."""
+        return {' '.join(str(part) for part in key): (asset.refs, asset.hits, asset.seconds,
+                                                      asset.preloaded)
+                for key, asset in self._assets.items()}
+
+    def dump_stats(self, file: TextIO = sys.stdout) -> None:
+        """Write a table of the loaded assets to the given file, the slowest to load first."""
+        file.write(f'{"ASSET":<64}{"REFS":>6}{"HITS":>6}{"LOAD MS":>10}{"PRELOADED":>11}\n')
+        for name, (refs, hits, seconds, preloaded) in sorted(self.stats().items(),
+                                                             key=lambda stat: -stat[1][2]):
+            file.write(f'{name[-64:]:<64}{refs:>6}{hits:>6}{seconds * 1e3:>10.3f}'
+                       f'{"YES" if preloaded else "NO":>11}\n')
+
+    def close(self) -> None:
+        """Stop the background thread, without waiting for the files it is reading."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._pending.clear()
+
+
+def _read_file(path: str) -> bytes:
+    """Return the contents of the file at the given path."""
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+# The assets of the game.
+assets = AssetManager(ASSET_CACHE_SIZE)
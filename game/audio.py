@@ -1,20 +1,56 @@
 """The audio module is responsible for playing audio in Forged."""
 
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+
 import pygame
 
+from game.settings import CROSSFADE_MS, SOUND_CHANNELS
+from game.soundbank import SoundBank
+
+# The tracks that are layered under the music as ambience beds, each on a channel of its own.
+AMBIENCE = ('forest', 'rain')
+
+# The channels that the music alternates between, so that one track can fade into the next.
+_MUSIC_CHANNELS = (0, 1)
+
 
 class AudioEngine:
-    """The audio engine of Forged.
+    """The audio engine of Forged. Tracks are decoded on a background thread, and start playing on
+    a later frame once they are ready, so that starting one never stalls the game loop. Tracks
+    that may be played soon are read ahead, still compressed, and only the tracks that play are
+    decoded, since a decoded track takes tens of megabytes. A track that cannot be read or decoded
+    is not played. The music alternates between two reserved mixer channels, so that a new track
+    fades in while the last one fades out, and each ambience bed plays on a reserved channel of
+    its own. The sound effects play on a pool of reserved channels of their own.
 
     Attributes:
         tracks: The music tracks of the game.
-        sound_effects: The sound effects of the game.
+        sounds: The sound effects of the game.
         playing: Whether the audio engine is playing music.
+        _decoder: The background thread tracks are read and decoded on.
+        _buffered: The files of the tracks read ahead, or the reading of files being read, by
+                   name.
+        _decoded: The decoded tracks, or the decoding of tracks being decoded, by name.
+        _music: The index in _MUSIC_CHANNELS of the channel of the current track.
+        _current: The name of the current track, or None if there is none.
+        _requested: The track to fade into once it is decoded with its fade time, or None.
+        _beds: The channel of each ambience bed.
+        _requested_beds: The ambience beds to fade in once they are decoded, with their volume
+                         and fade time.
     """
     # Attribute types
     tracks: dict[str, str]
-    sound_effects: dict[str, pygame.mixer.Sound]
+    sounds: SoundBank
     playing: bool
+    _decoder: ThreadPoolExecutor
+    _buffered: dict[str, Future]
+    _decoded: dict[str, Future]
+    _music: int
+    _current: str | None
+    _requested: tuple[str, int] | None
+    _beds: dict[str, pygame.mixer.Channel]
+    _requested_beds: dict[str, tuple[float, int]]
 
     def __init__(self) -> None:
         """Initialize the audio engine."""
@@ -22,23 +58,142 @@ class AudioEngine:
                        'tomb': 'assets/music/forgotten_tombs.mp3',
                        'forest': 'assets/music/forest_ambience.mp3',
                        'rain': 'assets/music/rain_ambience.ogg'}
-        self.sound_effects = {'open_inventory': pygame.mixer.Sound(file='assets/sounds/inventory'
-                                                                        '/leather_inventory.wav')}
+        # Reserve every channel, so that nothing plays but through the channels given out here.
+        reserved = len(_MUSIC_CHANNELS) + len(AMBIENCE)
+        pygame.mixer.set_num_channels(reserved + SOUND_CHANNELS)
+        pygame.mixer.set_reserved(reserved + SOUND_CHANNELS)
+        self.sounds = SoundBank([pygame.mixer.Channel(reserved + index)
+                                 for index in range(SOUND_CHANNELS)])
         self.playing = False
+        self._decoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix='audio-decoder')
+        self._buffered = {}
+        self._decoded = {}
+        self._music = 0
+        self._current = None
+        self._requested = None
+        self._beds = {name: pygame.mixer.Channel(len(_MUSIC_CHANNELS) + index)
+                      for index, name in enumerate(AMBIENCE)}
+        self._requested_beds = {}
+
+    def preload_tracks(self, *track_names: str) -> None:
+        """Start reading the files of the specified tracks, so that starting them later does not
+        wait on the disk, and forget the files read for any other track."""
+        for track_name in list(self._buffered):
+            if track_name not in track_names:
+                del self._buffered[track_name]
+        for track_name in track_names:
+            if track_name not in self._buffered:
+                self._buffered[track_name] = self._decoder.submit(_read_file,
+                                                                  self.tracks[track_name])
 
-    def play_track(self, track_name: str) -> None:
-        """Play the specified track."""
-        track = self.tracks[track_name]
-        pygame.mixer.music.load(track)
-        pygame.mixer.music.play(-1)
+    def _decode(self, track_name: str) -> None:
+        """Start decoding the specified track, from its file if it was read ahead."""
+        if track_name not in self._decoded:
+            self._decoded[track_name] = self._decoder.submit(
+                _decode_file, self.tracks[track_name], self._buffered.get(track_name))
+
+    def play_track(self, track_name: str, fade_ms: int = CROSSFADE_MS) -> None:
+        """Fade from the current track into the specified track, as soon as it is decoded."""
+        self._decode(track_name)
+        self._requested = (track_name, fade_ms)
         self.playing = True
 
-    def stop_track(self) -> None:
-        """Stop the currently playing track."""
-        pygame.mixer.music.fadeout(300)
+    def stop_track(self, fade_ms: int = CROSSFADE_MS) -> None:
+        """Fade out the currently playing track."""
+        pygame.mixer.Channel(_MUSIC_CHANNELS[self._music]).fadeout(fade_ms)
+        self._forget(self._current)
+        self._current = None
+        self._requested = None
         self.playing = False
 
+    def play_ambience(self, bed_name: str, volume: float = 1.0,
+                      fade_ms: int = CROSSFADE_MS) -> None:
+        """Fade in the specified ambience bed at the given volume under the music, as soon as
+        it is decoded, or fade it to the given volume if it is playing."""
+        channel = self._beds[bed_name]
+        if channel.get_busy():
+            # Channels only fade between silence and full volume, so a playing bed changes at once.
+            channel.set_volume(volume)
+            self._requested_beds.pop(bed_name, None)
+        else:
+            self._decode(bed_name)
+            self._requested_beds[bed_name] = (volume, fade_ms)
+
+    def stop_ambience(self, bed_name: str, fade_ms: int = CROSSFADE_MS) -> None:
+        """Fade out the specified ambience bed."""
+        self._beds[bed_name].fadeout(fade_ms)
+        self._requested_beds.pop(bed_name, None)
+        self._forget(bed_name)
+
+    def busy(self) -> bool:
+        """Return whether a track is waiting to be decoded before it starts."""
+        return self._requested is not None or bool(self._requested_beds)
+
+    def update(self) -> None:
+        """Start the tracks that were asked for and have been decoded, drop the ones that could
+        not be, and let every sound effect be played again. Called once a frame."""
+        self.sounds.end_frame()
+        if self._requested is not None:
+            track_name, fade_ms = self._requested
+            if self._decoded[track_name].done():
+                self._requested = None
+                if self._failed(track_name):
+                    self.playing = self._current is not None
+                else:
+                    self._crossfade(track_name, fade_ms)
+        for bed_name, (volume, fade_ms) in list(self._requested_beds.items()):
+            if self._decoded[bed_name].done():
+                del self._requested_beds[bed_name]
+                if self._failed(bed_name):
+                    continue
+                self._beds[bed_name].set_volume(volume)
+                self._beds[bed_name].play(self._decoded[bed_name].result(), loops=-1,
+                                          fade_ms=fade_ms)
+
+    def _failed(self, track_name: str) -> bool:
+        """Return whether the specified track, which is done decoding, could not be read or
+        decoded, and forget it if so, so that asking for it again tries again."""
+        if self._decoded[track_name].exception() is None:
+            return False
+        del self._decoded[track_name]
+        self._buffered.pop(track_name, None)
+        return True
+
+    def _crossfade(self, track_name: str, fade_ms: int) -> None:
+        """Fade the current track out on its channel and the specified track in on the other."""
+        if track_name == self._current:
+            return
+        pygame.mixer.Channel(_MUSIC_CHANNELS[self._music]).fadeout(fade_ms)
+        self._forget(self._current)
+        self._music = 1 - self._music
+        pygame.mixer.Channel(_MUSIC_CHANNELS[self._music]).play(
+            self._decoded[track_name].result(), loops=-1, fade_ms=fade_ms)
+        self._current = track_name
+
+    def _forget(self, track_name: str | None) -> None:
+        """Forget the decoded specified track, unless it is asked for. A channel fading it out
+        keeps it until it is silent."""
+        if track_name is not None and track_name not in self._requested_beds and (
+                self._requested is None or self._requested[0] != track_name):
+            self._decoded.pop(track_name, None)
+
     def play_sound(self, sound_name: str) -> None:
         """Play the specified sound."""
-        sound = self.sound_effects[sound_name]
-        sound.play()
+        self.sounds.play(sound_name)
+
+    def close(self) -> None:
+        """Stop the background thread, without waiting for the tracks it is decoding."""
+        self._decoder.shutdown(wait=False, cancel_futures=True)
+
+
+def _read_file(path: str) -> bytes:
+    """Return the contents of the file at the given path."""
+    with open(path, 'rb') as file:
+        return file.read()
+
+
+def _decode_file(path: str, buffered: Future | None) -> pygame.mixer.Sound:
+    """Return the track at the given path, decoded from the given reading of its file if there is
+    one. Runs on the background thread, after the reading, which was submitted to it first."""
+    data = buffered.result() if buffered is not None else _read_file(path)
+    return pygame.mixer.Sound(file=BytesIO(data))
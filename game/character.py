@@ -1,26 +1,32 @@
 """The character module contains the Character and NPC classes."""
 
 from __future__ import annotations
-from game.room import Room, tomb
+from sys import intern
+
+from game.room import Room
 from game.item import Item, Weapon, Magic
-from random import randint
+from game.registry import NameIndex
+from game.dice import rng
 
 
 class Character():
     """The character class. Superclass of NPC and Player.
-    This is an abstract class and should not be instantiated directly.
+    This is an abstract class and should not be instantiated directly. Characters are slotted.
 
     Attributes:
         health: The hit points of this character.
         inventory: The items that this character has.
+        inventory_index: The items that this character has by name.
         location: The room that this character is in.
         holding: The item that this character is holding, or None if this character is holding
                  nothing.
         ac: The armor class of this character.
     """
+    __slots__ = ('health', 'inventory', 'inventory_index', 'location', 'holding', 'ac')
     # Attribute types
     health: int
     inventory: list[Item]
+    inventory_index: NameIndex[Item]
     location: Room
     holding: Item | Weapon | None
     ac: int
@@ -29,13 +35,25 @@ class Character():
         """Initialize a new character."""
         self.health = 100
         self.inventory = []
+        self.inventory_index = NameIndex()
         self.location = location
         self.holding = None
         self.ac = 10
 
+    def restore(self, health: int, ac: int, inventory: list[Item], holding: Item | None) -> None:
+        """Give this character the given health, armor class and items, in place of its own."""
+        self.health = health
+        self.ac = ac
+        self.inventory = []
+        self.inventory_index = NameIndex()
+        for item in inventory:
+            self.add_item(item)
+        self.holding = holding
+
     def add_item(self, item: Item) -> None:
         """Add the specified item to the inventory of this character."""
         self.inventory.append(item)
+        self.inventory_index.add(item)
         item.in_inventory = True
         if item == self.holding:
             self.holding = None
@@ -48,6 +66,7 @@ class Character():
             self.holding is None
         """
         self.inventory.remove(item)
+        self.inventory_index.remove(item)
         item.in_inventory = False
         self.holding = item
 
@@ -61,6 +80,7 @@ class Character():
         """
         if item in self.inventory:
             self.inventory.remove(item)
+            self.inventory_index.remove(item)
             item.in_inventory = False
         else:  # item == self.holding
             self.holding = None
@@ -80,6 +100,7 @@ class NPC(Character):
         desc: The description of this NPC.
         hostile: Whether this NPC is hostile toward the player.
     """
+    __slots__ = ('name', 'desc', 'hostile')
     # Attribute types
     name: str
     desc: str
@@ -88,17 +109,17 @@ class NPC(Character):
     def __init__(self, location: Room, name: str, desc: str) -> None:
         """Initialize a new NPC."""
         Character.__init__(self, location)
-        self.name = name
-        self.desc = desc
+        self.name = intern(name)
+        self.desc = intern(desc)
         self.hostile = False
 
     def attack(self, target: Character) -> str:
         """Attack the target."""
-        if self.holding is Weapon:
+        if type(self.holding) is Weapon:
             crit_damage = self.holding.damage * 2
             hit = False
             crit = False
-            roll = randint(1, 20)
+            roll = rng.randint(1, 20)
             if roll == 20:
                 target.health -= crit_damage
                 crit = True
@@ -135,14 +156,3 @@ class NPC(Character):
         else:
             return f"{self.name} TRIED TO MAKE A SPELL ATTACK BUT FORGOT HOW."
 
-    def setup_deck(self) -> None:
-        """Set up Deck."""
-        self.add_item(Magic('FIREBALL', 'A BALL OF FIRE', 100))
-        self.holding = deck.inventory[0]
-        self.add_item(Item('TORCH', "A RAMSHACKLE TORCH. IT GIVES OFF A DIM LIGHT."))
-
-
-deck = NPC(tomb, 'DECK', 'DECK IS A TALL, SLENDER, ELF WITH DARK EYES, WITH A SHOCK OF '
-                         'DARK EMERALD HAIR AND A RESTING WORRY FACE. HE HAS BEEN '
-                         'TRAVELLING WITH YOU IN SEARCH OF TREASURE AND GLORY. ONE '
-                         'OF THE GOOD GUYS.')
@@ -0,0 +1,98 @@
+"""The commands module routes parsed commands to the functions that carry them out.
+
+Verbs are added by decorating a handler, which is called with the game and the subject of the
+command, or None for a command without a subject:
+
+    @command('SING')
+    def sing(game: Engine, subject: None) -> None:
+        game.add_text('YOU HUM A FEW BARS.')
+
+The module defining the handler only needs to be imported before the game starts.
+"""
+
+from __future__ import annotations
+
+import sys
+from time import perf_counter
+from typing import Callable, TextIO, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from game.engine import Engine
+
+Handler = Callable[['Engine', str | None], None]
+
+
+class CommandDispatcher:
+    """A table of the handlers of each verb, with and without a subject, which also counts the
+    calls of each handler and the time spent in it.
+
+    Attributes:
+        _handlers: The handler of each verb, with and without a subject.
+        _calls: The number of calls of each handler.
+        _seconds: The total time spent in each handler.
+    """
+    # Attribute types
+    _handlers: dict[tuple[str, bool], Handler]
+    _calls: dict[tuple[str, bool], int]
+    _seconds: dict[tuple[str, bool], float]
+
+    def __init__(self) -> None:
+        """Initialize a dispatcher with no handlers."""
+        self._handlers = {}
+        self._calls = {}
+        self._seconds = {}
+
+    def register(self, *verbs: str, subject: bool = False) -> Callable[[Handler], Handler]:
+        """Return a decorator that makes a function the handler of the given verbs, for commands
+        with a subject if subject is true and without one otherwise. A later handler of the same
+        verb replaces the earlier one."""
+        def decorator(handler: Handler) -> Handler:
+            for verb in verbs:
+                self.add(verb, subject, handler)
+            return handler
+        return decorator
+
+    def add(self, verb: str, subject: bool, handler: Handler) -> None:
+        """Make the given function the handler of the given verb."""
+        self._handlers[verb, subject] = handler
+        self._calls.setdefault((verb, subject), 0)
+        self._seconds.setdefault((verb, subject), 0.0)
+
+    def get(self, verb: str, subject: bool) -> Handler | None:
+        """Return the handler of the given verb, or None if it has none."""
+        return self._handlers.get((verb, subject))
+
+    def dispatch(self, game: Engine, verb: str, subject: str | None) -> bool:
+        """Call the handler of the given command, and return whether it has one."""
+        key = (verb, subject is not None)
+        handler = self._handlers.get(key)
+        if handler is None:
+            return False
+        start = perf_counter()
+        handler(game, subject)
+        self._seconds[key] += perf_counter() - start
+        self._calls[key] += 1
+        return True
+
+    def verbs(self) -> set[str]:
+        """Return the verbs that have a handler."""
+        return {verb for verb, _ in self._handlers}
+
+    def stats(self) -> dict[str, tuple[int, float]]:
+        """Return the number of calls of each handler and the total seconds spent in it, by verb,
+        with ' *' after the verbs of commands with a subject."""
+        return {verb + (' *' if subject else ''): (self._calls[verb, subject],
+                                                   self._seconds[verb, subject])
+                for verb, subject in self._handlers}
+
+    def dump_stats(self, file: TextIO = sys.stdout) -> None:
+        """Write a table of the handlers to the given file, the most time consuming first."""
+        file.write(f'{"COMMAND":<16}{"CALLS":>8}{"TOTAL MS":>12}{"MEAN US":>12}\n')
+        for name, (calls, seconds) in sorted(self.stats().items(), key=lambda stat: -stat[1][1]):
+            mean = seconds / calls * 1e6 if calls else 0.0
+            file.write(f'{name:<16}{calls:>8}{seconds * 1e3:>12.3f}{mean:>12.1f}\n')
+
+
+# The dispatcher of the game's commands.
+commands = CommandDispatcher()
+command = commands.register
@@ -0,0 +1,13 @@
+"""The dice module holds the random number generator behind every roll in the game, so that a
+session can be played again with the same rolls."""
+
+from random import Random
+
+# The random number generator of the game. Seed it with seed(), never replace it, since modules
+# keep a reference to it.
+rng = Random()
+
+
+def seed(value: int) -> None:
+    """Seed the random number generator of the game."""
+    rng.seed(value)
@@ -0,0 +1,51 @@
+"""The dirty module keeps track of the parts of the screen that need to be presented again."""
+
+import pygame
+
+
+class DirtyRegions:
+    """The areas of the display surface that changed since the last frame was presented.
+
+    Attributes:
+        full_redraw: Whether every frame is presented in full, whatever changed. This is the
+                     fallback for displays that do not handle partial updates well.
+        rects: The areas that changed.
+        everything: Whether the whole display surface changed.
+    """
+    # Attribute types
+    full_redraw: bool
+    rects: list[pygame.Rect]
+    everything: bool
+
+    def __init__(self, full_redraw: bool = False) -> None:
+        """Initialize a tracker with nothing to present."""
+        self.full_redraw = full_redraw
+        self.rects = []
+        self.everything = False
+
+    def mark(self, rect: pygame.Rect) -> None:
+        """Mark the given area as changed."""
+        if not self.everything:
+            self.rects.append(pygame.Rect(rect))
+
+    def mark_all(self) -> None:
+        """Mark the whole display surface as changed."""
+        self.everything = True
+        self.rects.clear()
+
+    def __bool__(self) -> bool:
+        """Return whether anything needs to be presented."""
+        return self.full_redraw or self.everything or bool(self.rects)
+
+    def present(self) -> bool:
+        """Push the changed areas to the display, and return whether a frame was presented.
+        Nothing is presented if nothing changed."""
+        if self.full_redraw or self.everything:
+            pygame.display.update()
+        elif self.rects:
+            pygame.display.update(self.rects)
+        else:
+            return False
+        self.rects.clear()
+        self.everything = False
+        return True
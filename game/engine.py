@@ -0,0 +1,186 @@
+"""The engine module simulates the game world, without a display, audio or a frame clock. It can
+be driven by the Game window, or headless by a stream of commands."""
+
+from typing import Iterable, Iterator
+
+from game.item import Item
+from game.room import Room
+from game.player import Player
+from game.character import NPC
+from game.parser import Parser
+from game.commands import commands
+from game.registry import NameIndex
+from game.profiler import FrameProfiler
+from game.world import World, load_world
+from game.save import Autosaver
+from game.settings import AUTOSAVE_INTERVAL, SAVE_DELTAS
+import game.verbs  # noqa: F401 (registers the built-in commands)
+
+
+class Engine:
+    """The simulation of the game: the world, the parser and the commands. Text is produced with
+    add_text and sounds are requested with play_sound, which a front end overrides to present
+    them.
+
+    Attributes:
+        world: The world the rooms, items and NPCs are loaded from.
+        player: The object that represents the player.
+        current_room: The room the player is currently in.
+        parser: The parser is responsible for translating user input for the game to turn into
+                game actions.
+        active_npcs: The NPCs in the regions of the world that are loaded.
+        npc_index: The NPCs in the regions of the world that are loaded, by name.
+        combat: Whether the player is in combat.
+        output: The text produced by the last command.
+        profiler: Times the parsing and handling of commands, if enabled.
+        saves: Saves the game, or None if it cannot be saved.
+    """
+    # Attribute types
+    world: World
+    player: Player
+    current_room: Room | None
+    parser: Parser
+    active_npcs: list[NPC]
+    npc_index: NameIndex[NPC]
+    combat: bool
+    output: list[str]
+    profiler: FrameProfiler
+    saves: Autosaver | None
+
+    def __init__(self, world: World | None = None, save_path: str | None = None) -> None:
+        """Initialize a new game in the given world, or in the world of the settings if there is
+        none, saved to the file at the given path if there is one."""
+        self.world = world if world is not None else load_world()
+        self.parser = Parser()
+        self.parser.verbs.update(commands.verbs())
+        start = self.world.room(self.world.start)
+        self.player = Player(start)
+        for item in self.world.player_items():
+            self.player.add_item(item)
+        self.active_npcs = []
+        self.npc_index = NameIndex()
+        self.setup_nouns()
+        self.current_room = None
+        self.set_room(start)
+        self.combat = False
+        self.output = []
+        self.profiler = FrameProfiler()
+        self.saves = None
+        if save_path is not None:
+            self.saves = Autosaver(save_path, self.world, AUTOSAVE_INTERVAL, SAVE_DELTAS)
+
+    def setup_nouns(self) -> None:
+        """Add the names of the player's items, which are in sight wherever the player goes, to
+        the parser nouns."""
+        for item in self._player_items():
+            self.parser.nouns.add(item.name)
+
+    def _player_items(self) -> list[Item]:
+        """Return the items in the player's inventory, and the item they hold if they hold
+        one."""
+        if self.player.holding is None:
+            return self.player.inventory
+        return self.player.inventory + [self.player.holding]
+
+    def clear(self) -> None:
+        """Take the player's items, the NPCs and the items of the current room out of the game
+        and the parser nouns, so that a saved game can be put in their place."""
+        for item in self._player_items():
+            self.parser.nouns.remove(item.name)
+        for npc in self.active_npcs:
+            self.parser.nouns.remove(npc.name)
+            for item in npc.inventory:
+                self.parser.nouns.remove(item.name)
+        if self.current_room is not None:
+            for item in self.current_room.items:
+                self.parser.nouns.remove(item.name)
+        self.active_npcs = []
+        self.npc_index = NameIndex()
+        self.current_room = None
+
+    def add_npc(self, npc: NPC) -> None:
+        """Add the given NPC, loaded from the world, to the game, and its name and the names of
+        its items to the parser nouns."""
+        self.active_npcs.append(npc)
+        self.npc_index.add(npc)
+        self.parser.nouns.add(npc.name)
+        for item in npc.inventory:
+            self.parser.nouns.add(item.name)
+
+    def remove_npc(self, npc: NPC) -> None:
+        """Take the given NPC, released by the world, out of the game, and its name and the names
+        of its items out of the parser nouns."""
+        self.active_npcs.remove(npc)
+        self.npc_index.remove(npc)
+        self.parser.nouns.remove(npc.name)
+        for item in npc.inventory:
+            self.parser.nouns.remove(item.name)
+
+    def submit(self, user_input: str) -> list[str]:
+        """Play a round with the given command: the hostile NPCs attack if the player is in
+        combat, then the command is carried out. Return the text produced."""
+        self.output = []
+        if self.combat:
+            with self.profiler.phase('command'):
+                self.handle_combat()
+        with self.profiler.phase('parse'):
+            parsed_input = self.parser.parse_command(user_input)
+        if parsed_input is not None:
+            with self.profiler.phase('command'):
+                self.handle_command(parsed_input[0], parsed_input[1])
+        if self.saves is not None:
+            self.saves.update(self)
+        return self.output
+
+    def run_commands(self, user_inputs: Iterable[str]) -> Iterator[str]:
+        """Play a round with each of the given commands in turn, and yield the text produced."""
+        for user_input in user_inputs:
+            yield from self.submit(user_input)
+
+    def add_text(self, text: str) -> None:
+        """Output the given text."""
+        self.output.append(text)
+
+    def play_sound(self, sound_name: str) -> None:
+        """Request the given sound effect. The simulation alone has nothing to play it on."""
+
+    def handle_command(self, action: str | None, subject: str | None) -> None:
+        """Handle the output of the parser by calling the handler of the command."""
+        if action is None:
+            self.add_text("THAT'S NOT A VERB I RECOGNIZE.")
+        elif not commands.dispatch(self, action, subject):
+            self.add_text(f'I UNDERSTOOD YOU AS FAR AS WANTING TO {action}.')
+
+    def handle_combat(self) -> None:
+        """Handle a round of combat."""
+        for npc in self.active_npcs:
+            if npc.hostile and npc.location == self.current_room:
+                self.add_text(npc.spell_attack(self.player))
+            if self.player.health <= 0:
+                self.player.health = 1
+                self.combat = False
+                self.add_text('YOU ARE DEAD. SEE YOU IN HELL.')
+                self.set_room(self.world.room(self.world.death))
+                return
+
+    def set_room(self, room: Room) -> None:
+        """Update the current room and update the parser nouns accordingly,
+        as well as the player's location. The regions of the world near the room are loaded, and
+        the NPCs in them join the game, while the NPCs of the regions released leave it.
+        """
+        arrived, departed = self.world.enter(room)
+        for npc in departed:
+            self.remove_npc(npc)
+        for npc in arrived:
+            self.add_npc(npc)
+        # Items only move between the room and the inventories while the player stays, and both
+        # are in the nouns, so only the items of the rooms left and entered change them.
+        if self.current_room is not None:
+            for item in self.current_room.items:
+                self.parser.nouns.remove(item.name)
+        for item in room.items:
+            self.parser.nouns.add(item.name)
+
+        self.current_room = room
+        self.player.location = self.current_room
+        # self.add_text(self.current_room.desc)
@@ -4,19 +4,24 @@ rules, data structures, and logic. - ChatGPT"""
 import pygame
 from sys import exit
 from enum import Enum
-from random import choice
 
 from .audio import AudioEngine
 from .ui import UIManager
-from .settings import FPS
-from .room import Room, tomb, hell
-from .player import Player
-from .character import NPC, deck
-from .parser import Parser
-from .stack import Stack
-
-
-pygame.init()
+from .settings import (FPS, IDLE_FPS, IDLE_DELAY, ADAPTIVE_FPS, SCROLLBACK_LINES,
+                       SCROLLBACK_BYTES, TRANSCRIPT_PATH, COMMAND_STATS_PATH, PROFILE,
+                       PROFILE_OVERLAY, PROFILE_WINDOW, PROFILE_TRACE_PATH, ASSET_STATS_PATH,
+                       TYPEWRITER_SPEED, TYPEWRITER_BUDGET, HISTORY_SIZE, HISTORY_PATH,
+                       SAVE_PATH)
+from .scheduler import FrameScheduler
+from .scrollback import Scrollback
+from .typewriter import Typewriter
+from .engine import Engine
+from .profiler import FrameProfiler
+from .commands import commands
+from .assets import assets, FONT_PATH
+from .room import Room
+from .replay import LiveInput
+from .history import CommandHistory
 
 
 class GameState(Enum):
@@ -25,80 +30,113 @@ class GameState(Enum):
     PLAYING = 2
 
 
-class Game:
-    """Game class.
+class Game(Engine):
+    """Game class. Inherits from Engine, which it presents in a window with audio.
 
     Attributes:
         running: Whether the game is running.
         game_state: The current game state: MENU, PLAYING, or PAUSED.
-        clock: The game clock, used for keeping the FPS.
+        scheduler: Paces the game loop, keeping the FPS while active and sleeping while idle.
+        input_source: Where the events of each frame and the state of the mouse come from: the
+                      player, optionally recorded to a log, or a log played back.
         ui: The rendering engine of the game.
         audio: The audio engine of the game.
-        player: The object that represents the player.
-        current_room: The room the player is currently in.
-        parser: The parser is responsible for translating user input for the game to turn into
-                game actions.
-        current_text: All the text displayed by the system.
-        command_stack: The stack of commands the player has entered.
-        temp_stack: A temporary stack used for storing commands when the player is scrolling.
-        combat: Whether the player is in combat.
+        scrollback: All the text displayed by the system, the older part of it on disk.
+        typewriter: The new text on its way to the scrollback and the screen.
+        history: The commands the player has entered, in this session and earlier ones, or only
+                 in this session if it is recorded or played back.
+        search_text: The text being searched for in the history with Ctrl+R, or None if the
+                     history is not being searched.
+        search_match: The sequence number in the history of the latest command found by the
+                      search, or None if none was found.
     """
     # Attribute types
     running: bool
     game_state: GameState
-    clock: pygame.time.Clock
+    scheduler: FrameScheduler
+    input_source: LiveInput
     ui: UIManager
     audio: AudioEngine
-    player: Player
-    current_room = Room
-    parser: Parser
-    current_text: str
-    active_npcs: list[NPC]
-    command_stack: Stack
-    temp_stack: Stack
-    combat: bool
+    scrollback: Scrollback
+    typewriter: Typewriter
+    history: CommandHistory
+    search_text: str | None
+    search_match: int | None
 
-    def __init__(self) -> None:
-        """Initialize a new game."""
+    def __init__(self, recorded: bool = False) -> None:
+        """Initialize a new game. A game that is recorded or played back keeps its history in
+        memory and cannot be saved, so that neither the history nor the saved game of other
+        sessions makes a replay differ from the session it replays, and a replay never saves over
+        the player's game."""
+        # Read the files of the title screen while the display and the mixer are set up.
+        assets.preload(FONT_PATH, 'assets/images/F.png', 'assets/images/fantasy_bg.png',
+                       'assets/images/fire_sword_transparent.png')
         pygame.init()
         self.game_state = GameState.MENU
         self.running = True
-        self.clock = pygame.time.Clock()
+        self.scheduler = FrameScheduler(FPS, IDLE_FPS, IDLE_DELAY, ADAPTIVE_FPS)
+        self.input_source = LiveInput(self.scheduler)
         self.ui = UIManager()
         self.audio = AudioEngine()
-        self.parser = Parser()
-        self.player = Player(self.current_room)
-        self.active_npcs = []
-        self.setup_npcs()
-        self.set_room(tomb)
-        self.current_text = self.current_room.desc
-        self.command_stack = Stack()
-        self.temp_stack = Stack()
-        self.combat = False
-
-    def setup_npcs(self) -> None:
-        """Set up the NPCs."""
-        self.active_npcs.append(deck)
-        deck.setup_deck()
+        self.scrollback = Scrollback(self.ui.lines, SCROLLBACK_LINES, SCROLLBACK_BYTES,
+                                     TRANSCRIPT_PATH)
+        Engine.__init__(self, save_path=None if recorded else SAVE_PATH)
+        self.profiler = FrameProfiler(PROFILE, PROFILE_WINDOW, PROFILE_TRACE_PATH,
+                                      PROFILE_OVERLAY)
+        self.scrollback.append(self.current_room.desc)
+        self.typewriter = Typewriter(self.scrollback, self.ui, TYPEWRITER_SPEED,
+                                     TYPEWRITER_BUDGET)
+        self.history = CommandHistory(HISTORY_SIZE, None if recorded else HISTORY_PATH)
+        self.search_text = None
+        self.search_match = None
 
     def run(self) -> None:
         """The main game loop."""
         while self.running:
-            self.handle_events()
-            parsed_input = self.parser.parse_command(self.ui.user_input)
-            if parsed_input is not None:
-                self.handle_command(parsed_input[0], parsed_input[1])
-            if self.ui.user_input != '':
-                self.ui.user_input = ''
+            # The title screen parallax and text being revealed are the only animations, but
+            # tracks waiting to be decoded are started on the first frame after they are.
+            events = self.input_source.wait(animating=self.game_state == GameState.MENU
+                                            or self.typewriter.busy() or self.audio.busy())
+            self.profiler.begin_frame()
+            with self.profiler.phase('events'):
+                self.handle_events(events)
+            # An empty command still plays a round, in which hostile NPCs attack.
+            if self.ui.user_input is not None:
+                self.submit(self.ui.user_input)
+                self.ui.user_input = None
+            self.audio.update()
             self.render()
-            self.clock.tick(FPS)
+            self.profiler.end_frame()
 
-    def handle_events(self) -> None:
-        """Handle user input and update game state accordingly."""
-        for event in pygame.event.get():
+    def handle_events(self, events: list[pygame.event.Event]) -> None:
+        """Handle the given user input events and update game state accordingly."""
+        for event in events:
             if event.type == pygame.QUIT:
+                self.input_source.close()
+                self.typewriter.skip()
+                self.scrollback.close()
+                self.history.close()
+                if self.saves is not None:
+                    self.saves.close(self)
+                self.world.close()
+                self.profiler.close()
+                assets.close()
+                self.audio.close()
+                if COMMAND_STATS_PATH is not None:
+                    with open(COMMAND_STATS_PATH, 'w') as file:
+                        commands.dump_stats(file)
+                if ASSET_STATS_PATH is not None:
+                    with open(ASSET_STATS_PATH, 'w') as file:
+                        assets.dump_stats(file)
                 pygame.quit()
                 exit()
+            if event.type == pygame.WINDOWEXPOSED:
+                self.ui.invalidate()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3 and self.profiler.enabled:
+                self.profiler.overlay = not self.profiler.overlay
+                # Draw the whole screen again to remove the overlay or show it.
+                self.ui.invalidate()
+                continue
             if self.game_state == GameState.MENU:
                 # if not self.audio.playing:
                 #     self.audio.play_track('title')
@@ -108,209 +146,124 @@ class Game:
                 # self.audio.stop_track()
                 # if not self.audio.playing:
                 #     self.audio.play_track(self.current_room.name)
+                if event.type == pygame.KEYDOWN and self.search_text is not None:
+                    if self.handle_search_key(event):
+                        continue
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_BACKSPACE:
                         self.ui.user_text = self.ui.user_text[:-1]
                     elif event.key == pygame.K_RETURN:
                         self.ui.user_input = self.ui.user_text.strip('>')
+                        # Entering a command brings the view back down to follow its answer.
+                        self.typewriter.follow()
                         self.add_text(self.ui.user_text)
                         self.ui.user_text = '> '
-                        while not self.temp_stack.is_empty():
-                            self.command_stack.push(self.temp_stack.pop())
-                        self.command_stack.push(self.ui.user_input)
-                        if self.combat:
-                            self.handle_combat()
+                        self.history.add(self.ui.user_input)
                     elif event.key == pygame.K_UP:
-                        if not self.command_stack.is_empty():
-                            command = self.command_stack.pop()
-                            self.ui.user_text = '>' + command
-                            self.temp_stack.push(command)
+                        command = self.history.previous()
+                        if command is not None:
+                            self.ui.user_text = '> ' + command
                     elif event.key == pygame.K_DOWN:
-                        if not self.temp_stack.is_empty():
-                            command = self.temp_stack.pop()
-                            self.ui.user_text = '>' + command
-                            self.command_stack.push(command)
-                        else:
-                            self.ui.user_text = '> '
+                        command = self.history.next()
+                        self.ui.user_text = '> ' if command is None else '> ' + command
+                    elif event.key == pygame.K_r and event.mod & pygame.KMOD_CTRL:
+                        self.search_text = ''
+                        self.search_match = None
+                        self.show_search()
                     elif event.key == pygame.K_PAGEUP:
-                        if self.ui.scroll_position > 0:
-                            self.ui.scroll_position -= 1
+                        self.scroll(-1)
                     elif event.key == pygame.K_PAGEDOWN:
-                        if self.ui.scroll_position < len(self.ui.lines) - 9:
-                            self.ui.scroll_position += 1
+                        self.scroll(1)
+                    elif event.key == pygame.K_ESCAPE:
+                        self.typewriter.skip()
                     else:
                         self.ui.user_text += event.unicode.upper()
                 self.handle_mouse_scrolling(event)
 
+    def handle_search_key(self, event: pygame.event.Event) -> bool:
+        """Handle the given key press while the history is being searched. Ctrl+R finds the
+        next older match, typing changes the text searched for, and ESC cancels the search. Any
+        other key puts the match on the prompt and ends the search, and is then handled as
+        usual. Return whether the key press was handled."""
+        if event.key == pygame.K_r and event.mod & pygame.KMOD_CTRL:
+            if self.search_match is not None:
+                older = self.history.search(self.search_text, self.search_match)
+                self.search_match = self.search_match if older is None else older
+        elif event.key == pygame.K_ESCAPE:
+            self.search_text = None
+            self.ui.user_text = '> '
+            return True
+        elif event.key == pygame.K_BACKSPACE or event.unicode.isprintable() and event.unicode:
+            if event.key == pygame.K_BACKSPACE:
+                self.search_text = self.search_text[:-1]
+            else:
+                self.search_text += event.unicode.upper()
+            self.search_match = self.history.search(self.search_text)
+        else:
+            self.search_text = None
+            if self.search_match is not None:
+                self.history.cursor = self.search_match
+                self.ui.user_text = '> ' + self.history[self.search_match]
+            else:
+                self.ui.user_text = '> '
+            return False
+        self.show_search()
+        return True
+
+    def show_search(self) -> None:
+        """Show the text searched for in the history and the command found on the prompt."""
+        match = '' if self.search_match is None else self.history[self.search_match]
+        self.ui.user_text = f"(SEARCH) '{self.search_text}': {match}"
+
     def handle_mouse_scrolling(self, event: pygame.event.Event) -> None:
         """Handle mouse scrolling."""
         if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 4:
-                if self.ui.scroll_position > 0:
-                    self.ui.scroll_position -= 1
+                self.scroll(-1)
             elif event.button == 5:
-                if self.ui.scroll_position < len(self.ui.lines) - 9:
-                    self.ui.scroll_position += 1
+                self.scroll(1)
+
+    def scroll(self, lines: int) -> None:
+        """Scroll the text by the given number of lines, up if negative. Scrolling up past the
+        oldest text in memory pages older text back in from the transcript file."""
+        position = self.ui.scroll_position + lines
+        if lines < 0:
+            if position < 0:
+                position += self.scrollback.page_in()
+            self.ui.scroll_position = max(0, position)
+        elif position <= len(self.ui.lines) - 9:
+            self.ui.scroll_position = position
 
     def render(self) -> None:
         """Use the UI module to render the game based on the current game state."""
-        if self.game_state == GameState.MENU:
-            hover = self.ui.render_main_menu()
-            if hover and pygame.mouse.get_pressed()[0]:
-                self.game_state = self.game_state.PLAYING
-        elif self.game_state == GameState.PLAYING:
-            self.ui.render_text(self.current_text)
-
-        self.ui.update()
-
-    def add_text(self, text: str) -> None:
-        """Add the given string to a new line of self.current_text."""
-        self.current_text += '                                           ' + text
-        self.ui.scroll_position = max(0, len(self.ui.lines) - 7 + len(text) // 44)
-
-    def handle_command(self, action: str | None, subject: str | None) -> None:
-        """Handle the output of the parser and perform the appropriate action."""
-
-        # Commands that did not have a valid action.
-        if action is None:
-            self.add_text("THAT'S NOT A VERB I RECOGNIZE.")
-            return
-
-        # Commands that did not have a valid subject. These can be one-word commands or invalid.
-        if subject is None:
-            if action not in {'LOOK', 'INVENTORY', 'I', 'WAIT', 'SIT', 'SLEEP', 'STAND'}:
-                self.add_text(f'I UNDERSTOOD YOU AS FAR AS WANTING TO {action}.')
-                return
-            elif action == 'LOOK':
-                self.add_text(self.current_room.desc)
-                return
-            elif action in ('INVENTORY', 'I'):
-                self.add_text(str(self.player))
-                self.audio.play_sound('open_inventory')
-                return
-            elif action == 'WAIT':
-                self.add_text(choice(('YOU LOITER.',
-                                      'YOU WAIT FOR THE GAME TO BEAT ITSELF.',
-                                      '*WHISTLING*',
-                                      "MAYBE IF YOU WAIT LONG ENOUGH, YOU'LL WIN. MAYBE.")))
-                return
-            elif action == 'SIT':
-                if not self.player.sitting:
-                    self.add_text('YOU SIT DOWN.')
-                    self.player.sitting = True
-                    return
-                else:
-                    self.add_text('YOU ARE ALREADY SITTING. ARE YOU TRYING TO PHASE THROUGH THE '
-                                  'GROUND?')
-                    return
-            elif action == 'STAND':
-                if self.player.sitting:
-                    self.add_text('YOU STAND UP.')
-                    self.player.sitting = False
-                    return
-                else:
-                    if self.player.health >= 50:
-                        self.add_text('YOU HAVE EXCELLENT POSTURE.')
-                        return
-                    else:
-                        self.add_text('YOU FIGHT THE URGE TO HUNCH OVER IN PAIN.')
-                        return
-            elif action == 'SLEEP':
-                self.add_text('NOW IS NOT THE TIME FOR A NAP.')
-                return
-
-        # Commands that had a valid subject.
-        else:
-            if action == 'EXAMINE':
-                for item in self.current_room.items:
-                    if item.name == subject:
-                        self.add_text(item.desc)
-                        return
-                for item in self.player.inventory:
-                    if item.name == subject:
-                        self.add_text(item.desc)
-                        return
-                for npc in self.active_npcs:
-                    if npc.name == subject:
-                        self.add_text(npc.desc)
-                        return
-                self.add_text('YOU SEE NO SUCH THING.')
-                return
-            elif action == 'TAKE':
-                for item in self.current_room.items:
-                    if item.name == subject:
-                        self.current_room.remove_item(item)
-                        self.player.add_item(item)
-                        self.add_text(f'YOU TAKE THE {item.name}.')
-                        return
-                for npc in self.active_npcs:
-                    if any(item.name == subject for item in npc.inventory):
-                        self.add_text('NO GRABSIES.')
-                        return
-                self.add_text("YOU CAN'T SEE ANY SUCH THING.")
-                return
-            elif action == 'EQUIP':
-                for item in self.player.inventory:
-                    if item.name == subject:
-                        self.player.hold(item)
-                        self.add_text(f'YOU ARE NOW HOLDING THE {item.name}.')
-                        return
-                self.add_text("YOU DON'T HAVE ANY SUCH THING IN YOUR INVENTORY, SO YOU CAN'T "
-                              "EQUIP IT.")
-                return
-            elif action == 'ATTACK':
-                for npc in self.active_npcs:
-                    if npc.name == subject:
-                        if not npc.hostile:
-                            self.add_text(f'{npc.name} IS NOW HOSTILE.')
-                            npc.hostile = True
-                        self.add_text(self.player.attack(npc))
-                        self.combat = True
-                        return
-                self.add_text('YOU SEE NO SUCH TARGET.')
-                return
-            elif action == 'DROP':
-                if subject == 'ALL':
-                    for item in self.player.inventory:
-                        self.player.remove_item(item)
-                        self.current_room.add_item(item)
-                        self.add_text(f'YOU DROP THE {item.name}.')
-                    return
-                for item in self.player.inventory:
-                    if item.name == subject:
-                        self.player.remove_item(item)
-                        self.add_text(f'YOU DROP THE {item.name}.')
-                        return
-                self.add_text("YOU AREN'T CARRYING ANY SUCH THING, SO YOU CAN'T DROP IT.")
-                return
+        with self.profiler.phase('render'):
+            if self.game_state == GameState.MENU:
+                hover = self.ui.render_main_menu(self.input_source.mouse_pos)
+                if hover and self.input_source.mouse_buttons[0]:
+                    self.game_state = self.game_state.PLAYING
+            elif self.game_state == GameState.PLAYING:
+                self.typewriter.update()
+                self.ui.render_text()
+            if self.profiler.overlay:
+                self.ui.render_overlay(self.profiler.report())
 
-    def handle_combat(self) -> None:
-        """Handle a round of combat."""
-        for npc in self.active_npcs:
-            if npc.hostile and npc.location == self.current_room:
-                self.add_text(npc.spell_attack(self.player))
-            if self.player.health <= 0:
-                self.player.health = 1
-                self.combat = False
-                self.add_text('YOU ARE DEAD. SEE YOU IN HELL.')
-                self.set_room(hell)
-                return
+        with self.profiler.phase('present'):
+            self.ui.update()
 
     def set_room(self, room: Room) -> None:
-        """Update the current room and update the parser nouns accordingly,
-        as well as the player's location.
-        """
-        self.current_room = room
-        self.player.location = self.current_room
-        # self.add_text(self.current_room.desc)
+        """Update the current room, and start reading the files and the music of the rooms
+        connected to it, so that going to them does not wait on the disk. The music of rooms
+        that are no longer connected is forgotten."""
+        Engine.set_room(self, room)
+        for exit_room in room.exits.values():
+            assets.preload(*exit_room.assets)
+        self.audio.preload_tracks(*[exit_room.name for exit_room in room.exits.values()
+                                    if exit_room.name in self.audio.tracks])
+
+    def add_text(self, text: str) -> None:
+        """Add the given string to a new line of the scrollback, through the typewriter."""
+        self.typewriter.write(text)
 
-        # Make a new parser to flush the last room's noun additions
-        self.parser = Parser()
-        for item in room.items:
-            self.parser.nouns.append(item.name)
-        for item in self.player.inventory:
-            self.parser.nouns.append(item.name)
-        for npc in self.active_npcs:
-            self.parser.nouns.append(npc.name)
-            for item in npc.inventory:
-                self.parser.nouns.append(item.name)
+    def play_sound(self, sound_name: str) -> None:
+        """Play the given sound effect."""
+        self.audio.play_sound(sound_name)
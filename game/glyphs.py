@@ -0,0 +1,177 @@
+"""The glyphs module renders text from pre-rasterized glyphs instead of rasterizing it every frame.
+
+Forged uses a fixed-width pixel font, so a line of text is just its glyphs laid side by side, one
+advance apart.
+"""
+
+import pygame
+
+# The characters rasterized up front. Anything else is rasterized the first time it is drawn.
+CHARSET = ''.join(chr(code) for code in range(32, 127))
+
+
+# A rasterized glyph: the surface it is on and its area there, which holds all of it as rendered,
+# the distance from the pen position to the left of that area, the advance of the glyph, and the
+# parts of the area outside the advance, which the glyphs next to it cover, each with its distance
+# from the pen position.
+Glyph = tuple[pygame.Surface, pygame.Rect, int, int, tuple[tuple[pygame.Rect, int], ...]]
+
+
+class GlyphAtlas:
+    """A sheet holding every glyph of one font in one color.
+
+    With a background color the glyphs are opaque and drawing a line is a series of plain copies,
+    which is much cheaper than alpha blending. Without one the glyphs are transparent and can be
+    drawn over anything. Glyphs that reach past their advance, like wide or italic ones, have the
+    parts beyond it drawn again after the line, so that the glyphs next to them do not cut them
+    off.
+
+    Attributes:
+        font: The font the glyphs are rasterized with.
+        color: The color of the glyphs.
+        background: The color behind the glyphs, or None if they are transparent.
+        height: The height of a line of text.
+        sheet: The surface the glyphs are rasterized onto, side by side.
+        glyphs: Every rasterized glyph, by character.
+        _depth: The height of the tallest glyph rasterized, or of a line of text if it is taller.
+        _copy_flags: The blit flags that copy a glyph as is. Transparent glyphs never overlap, so
+                     they are not alpha blended onto transparent surfaces.
+    """
+    # Attribute types
+    font: pygame.font.Font
+    color: pygame.Color
+    background: pygame.Color | None
+    height: int
+    sheet: pygame.Surface
+    glyphs: dict[str, Glyph]
+    _depth: int
+    _copy_flags: int
+
+    def __init__(self, font: pygame.font.Font, color: str | pygame.Color,
+                 background: str | pygame.Color | None = None, charset: str = CHARSET) -> None:
+        """Rasterize the given characters onto a new sheet."""
+        self.font = font
+        self.color = pygame.Color(color)
+        self.background = None if background is None else pygame.Color(background)
+        self.height = font.get_height()
+        self.glyphs = {}
+        self._copy_flags = pygame.BLEND_RGBA_MAX if self.background is None else 0
+
+        rendered = [self._rasterize(char) for char in charset]
+        self._depth = max([self.height] + [surface.get_height() for surface in rendered])
+        sheet = self._new_surface((sum(surface.get_width() for surface in rendered), self._depth))
+        x = 0
+        for char, metrics, surface in zip(charset, font.metrics(charset), rendered):
+            sheet.blit(surface, (x, 0), None, self._copy_flags)
+            self.glyphs[char] = _glyph(sheet, pygame.Rect((x, 0), surface.get_size()), metrics)
+            x += surface.get_width()
+        self.sheet = sheet
+
+    def _new_surface(self, size: tuple[int, int]) -> pygame.Surface:
+        """Return a new surface filled with the background, in the display format if there is a
+        display."""
+        if self.background is None:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+            surface.fill((0, 0, 0, 0))
+        else:
+            surface = pygame.Surface(size)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert()
+            surface.fill(self.background)
+        return surface
+
+    def _rasterize(self, char: str) -> pygame.Surface:
+        """Rasterize the given character with the font."""
+        return self.font.render(char, True, self.color, self.background)
+
+    def glyph(self, char: str) -> Glyph:
+        """Return the glyph of the given character, rasterizing it if needed."""
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            rendered = self._rasterize(char)
+            surface = self._new_surface(rendered.get_size())
+            surface.blit(rendered, (0, 0), None, self._copy_flags)
+            self._depth = max(self._depth, rendered.get_height())
+            glyph = self.glyphs[char] = _glyph(surface, surface.get_rect(),
+                                               self.font.metrics(char)[0])
+        return glyph
+
+    def _sequence(self, text: str, pos: tuple[int, int]) -> tuple[list, pygame.Rect]:
+        """Return the blits that draw the given text with its pen starting at pos, the parts of
+        glyphs beyond their advances last, and the area they draw over."""
+        x, y = pos
+        left = right = x
+        sequence = []
+        overhangs = []
+        glyphs = self.glyphs
+        for char in text:
+            surface, area, offset, advance, overhang = glyphs.get(char) or self.glyph(char)
+            sequence.append((surface, (x + offset, y), area))
+            # Only the glyphs that reach past their advance draw outside the advances.
+            if overhang:
+                overhangs.extend([(surface, (x + distance, y), part)
+                                  for part, distance in overhang])
+                left = min(left, x + offset)
+                right = max(right, x + offset + area.width)
+            x += advance
+        sequence.extend(overhangs)
+        return sequence, pygame.Rect(left, y, max(right, x) - left, self._depth)
+
+    def size(self, text: str) -> tuple[int, int]:
+        """Return the width and height the given text takes up."""
+        sequence, rect = self._sequence(text, (0, 0))
+        return rect.width, _height(sequence, self.height)
+
+    def blit(self, dest: pygame.Surface, text: str, pos: tuple[int, int]) -> pygame.Rect:
+        """Draw the given text onto dest with its top left corner at pos, and return the area
+        drawn over, as tall as the tallest glyph rasterized."""
+        sequence, rect = self._sequence(text, pos)
+        dest.blits(sequence, doreturn=False)
+        return rect
+
+    def render(self, text: str) -> pygame.Surface:
+        """Return a new surface with the given text on it, like Font.render."""
+        sequence, rect = self._sequence(text, (0, 0))
+        surface = pygame.Surface((rect.width, _height(sequence, self.height)),
+                                 self.sheet.get_flags(), self.sheet)
+        surface.fill((0, 0, 0, 0) if self.background is None else self.background)
+        surface.blits([(glyph_surface, (x - rect.x, y), area, self._copy_flags)
+                       for glyph_surface, (x, y), area in sequence], doreturn=False)
+        return surface
+
+
+def _height(sequence: list, height: int) -> int:
+    """Return the height of the text the given blits draw, with the given line height, which is
+    taller if a glyph is."""
+    return max([height] + [area.height for _, _, area in sequence])
+
+
+def _glyph(surface: pygame.Surface, area: pygame.Rect, metrics: tuple | None) -> Glyph:
+    """Return the glyph rendered in the given area of the given surface, with the given metrics
+    of the font, or None if the font has no metrics for it. A rendered glyph starts at its
+    leftmost pixel if that is left of the pen, and at the pen otherwise."""
+    minx, advance = (metrics[0], metrics[4]) if metrics else (0, area.width)
+    offset = min(0, minx)
+    overhang = []
+    if offset < 0:
+        overhang.append((pygame.Rect(area.x, area.y, -offset, area.height), offset))
+    if area.width + offset > advance:
+        overhang.append((pygame.Rect(area.x - offset + advance, area.y,
+                                     area.width + offset - advance, area.height), advance))
+    return surface, area, offset, advance, tuple(overhang)
+
+
+_atlases: dict[tuple, GlyphAtlas] = {}
+
+
+def get_atlas(font: pygame.font.Font, color: str | pygame.Color,
+              background: str | pygame.Color | None = None) -> GlyphAtlas:
+    """Return the glyph atlas of the given font and colors, creating it the first time."""
+    key = (font, tuple(pygame.Color(color)),
+           None if background is None else tuple(pygame.Color(background)))
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = _atlases[key] = GlyphAtlas(font, color, background)
+    return atlas
@@ -0,0 +1,174 @@
+"""The history module keeps the commands the player has entered, across sessions, to be recalled
+with the arrow keys or searched for."""
+
+import mmap
+import os
+from typing import TextIO
+
+# The length of the substrings the search index is made of.
+_GRAM = 3
+
+
+class CommandHistory:
+    """The latest commands, the oldest forgotten first once there are too many, with a cursor
+    that moves through them one command at a time. Every command gets a sequence number, the
+    next one after the last, which stays its number while it is kept. Commands are found by
+    substring through an index of the three letter substrings of each command.
+
+    The history is saved to a file that commands are appended to, one per line. Only the end of
+    the file is read when the history is loaded, through a memory map, and the file is rewritten
+    with only the commands kept once it grows to twice their size.
+
+    Attributes:
+        max_size: The number of commands kept.
+        cursor: The sequence number of the command the cursor is on, or the sequence number the
+                next command will get if it is past the latest command.
+        _ring: The commands, each at its sequence number modulo the maximum size.
+        _next: The sequence number the next command will get.
+        _index: The sequence numbers of the commands that contain each three letter substring.
+        _file: The file the commands are appended to, or None if they are not saved.
+    """
+    # Attribute types
+    max_size: int
+    cursor: int
+    _ring: list[str | None]
+    _next: int
+    _index: dict[str, set[int]]
+    _file: TextIO | None
+
+    def __init__(self, max_size: int = 500, path: str | None = None) -> None:
+        """Initialize a history that keeps the given number of commands, loaded from and saved
+        to the file at the given path, if there is one."""
+        self.max_size = max_size
+        self._ring = [None] * max_size
+        self._next = 0
+        self._index = {}
+        self._file = None
+        if path is not None:
+            for command in self._load(path):
+                self._add(command)
+            self._file = open(path, 'a', encoding='utf-8')
+        self.cursor = self._next
+
+    def _load(self, path: str) -> list[str]:
+        """Return the latest commands saved in the file at the given path, the oldest first, and
+        compact the file if most of it is forgotten commands."""
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return []
+        with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0,
+                                                 access=mmap.ACCESS_READ) as data:
+            # Walk back from the end of the file, a line at a time, until enough are read.
+            end = len(data) - 1 if data[-1:] == b'\n' else len(data)
+            lines = []
+            while end > 0 and len(lines) < self.max_size:
+                start = data.rfind(b'\n', 0, end) + 1
+                if start < end:
+                    lines.append(data[start:end].decode('utf-8', errors='replace'))
+                end = start - 1
+            size = len(data)
+            kept = size - max(end, 0)
+        lines.reverse()
+        if end > 0 and size > 2 * kept:
+            self._compact(path, lines)
+        return lines
+
+    def _compact(self, path: str, commands: list[str]) -> None:
+        """Replace the file at the given path with one holding only the given commands."""
+        temporary = path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            file.writelines(command + '\n' for command in commands)
+        os.replace(temporary, path)
+
+    def add(self, command: str) -> None:
+        """Add the given command as the latest, save it, and move the cursor past it. Empty
+        commands and repeats of the latest command are not added."""
+        command = command.replace('\n', ' ').strip()
+        if command and (self._next == self._first() or command != self[self._next - 1]):
+            self._add(command)
+            if self._file is not None:
+                self._file.write(command + '\n')
+                self._file.flush()
+        self.cursor = self._next
+
+    def _add(self, command: str) -> None:
+        """Add the given command as the latest, forgetting the oldest if the history is full."""
+        slot = self._next % self.max_size
+        if self._next >= self.max_size:
+            self._unindex(self._next - self.max_size, self._ring[slot])
+        self._ring[slot] = command
+        for gram in _grams(command):
+            self._index.setdefault(gram, set()).add(self._next)
+        self._next += 1
+
+    def _unindex(self, number: int, command: str) -> None:
+        """Remove the command with the given sequence number from the search index."""
+        for gram in _grams(command):
+            numbers = self._index[gram]
+            numbers.discard(number)
+            if not numbers:
+                del self._index[gram]
+
+    def _first(self) -> int:
+        """Return the sequence number of the oldest command kept."""
+        return max(0, self._next - self.max_size)
+
+    def previous(self) -> str | None:
+        """Move the cursor to the command before it and return it, or return None if the cursor
+        is on the oldest command."""
+        if self.cursor <= self._first():
+            return None
+        self.cursor -= 1
+        return self[self.cursor]
+
+    def next(self) -> str | None:
+        """Move the cursor to the command after it and return it, or return None if that moves
+        it past the latest command."""
+        if self.cursor >= self._next:
+            return None
+        self.cursor += 1
+        return None if self.cursor == self._next else self[self.cursor]
+
+    def search(self, text: str, before: int | None = None, prefix: bool = False) -> int | None:
+        """Return the sequence number of the latest command that contains the given text, or
+        starts with it if prefix is true, before the given sequence number if there is one, or
+        None if no command does."""
+        before = self._next if before is None else min(before, self._next)
+        first = self._first()
+        grams = _grams(text)
+        if grams:
+            # Only the commands with every substring of the text can contain it.
+            candidates = min((self._index.get(gram, set()) for gram in grams), key=len)
+            numbers = sorted((number for number in candidates if first <= number < before),
+                             reverse=True)
+        else:
+            numbers = range(before - 1, first - 1, -1)
+        for number in numbers:
+            command = self[number]
+            if command.startswith(text) if prefix else text in command:
+                return number
+        return None
+
+    def __getitem__(self, number: int) -> str:
+        """Return the command with the given sequence number.
+
+        Raises:
+            IndexError: If the command is not kept.
+        """
+        if not self._first() <= number < self._next:
+            raise IndexError('command not in history')
+        return self._ring[number % self.max_size]
+
+    def __len__(self) -> int:
+        """Return the number of commands kept."""
+        return self._next - self._first()
+
+    def close(self) -> None:
+        """Close the file the commands are saved to, if there is one."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _grams(text: str) -> set[str]:
+    """Return the three letter substrings of the given text."""
+    return {text[index:index + _GRAM] for index in range(len(text) - _GRAM + 1)}
@@ -1,24 +1,32 @@
 """The item class models the items in the game."""
 
+from sys import intern
+
 
 class Item:
-    """Item class.
+    """Item class. Items are slotted, and their names and descriptions interned, so that the many
+    items that share a description share one copy of it.
 
     Attributes:
         name: The name of this item.
         desc: The description of this item.
         in_inventory: Whether this item is in a character's inventory.
+        key: The number of this item in the world file it was loaded from, or None if it was not
+             loaded from one.
     """
+    __slots__ = ('name', 'desc', 'in_inventory', 'key')
     # Attribute types
     name: str
     desc: str
     in_inventory: bool
+    key: int | None
 
     def __init__(self, name: str, desc: str) -> None:
         """Initialize a new item."""
-        self.name = name
-        self.desc = desc
+        self.name = intern(name)
+        self.desc = intern(desc)
         self.in_inventory = False
+        self.key = None
 
     def action(self, action: str) -> None:
         """This method is called when this item appears as the subject of a player
@@ -32,6 +40,7 @@ class Weapon(Item):
     Attributes:
         damage: The damage this weapon does.
     """
+    __slots__ = ('damage',)
     # Attribute types
     damage: int
 
@@ -47,6 +56,7 @@ class Armor(Item):
     Attributes:
         rating: The rating of this armor determines its effectiveness.
     """
+    __slots__ = ('rating',)
     # Attribute types
     rating: int
 
@@ -62,6 +72,7 @@ class Magic(Item):
     Attributes:
         damage: The damage this spell does.
     """
+    __slots__ = ('damage',)
     # Attribute types
     damage: int
 
@@ -0,0 +1,136 @@
+"""The layout module word-wraps the game transcript incrementally, one message at a time."""
+
+from itertools import islice
+from textwrap import TextWrapper
+from typing import Iterator
+
+from game.settings import LINE_LENGTH
+
+# The whitespace characters recognized by textwrap.
+_WHITESPACE = '\t\n\x0b\x0c\r '
+
+# The padding that used to separate messages in the transcript string.
+_SEPARATOR = ' ' * (LINE_LENGTH - 1)
+
+
+class TextLayout:
+    """A word-wrapped transcript that only wraps the text appended to it.
+
+    Wrapping the messages one by one gives the same line breaks as wrapping the whole transcript,
+    with the messages separated by LINE_LENGTH - 1 spaces, in one go. The padding always pushes
+    the next message onto a new line, and textwrap drops the whitespace at the start of every
+    line but the first.
+
+    Attributes:
+        _wrapper: The text wrapper used for every message.
+        _lines: The wrapped lines of the transcript, from self._start on.
+        _start: The index in self._lines of the first line. Trimmed lines are only dropped from
+                self._lines once they make up half of it, so that trimming is cheap.
+        _base: The number of the line at the start of self._lines, counting every line ever
+               added, so that a line keeps its number when lines are trimmed or prepended.
+        _pending: The raw text appended so far, kept only while it has produced no lines yet.
+        _column: The column the transcript ends at, modulo the tab size, or None if nothing has
+                 been appended yet. Tabs expand relative to the whole transcript.
+    """
+    # Attribute types
+    _wrapper: TextWrapper
+    _lines: list[str]
+    _start: int
+    _base: int
+    _pending: str | None
+    _column: int | None
+
+    def __init__(self, width: int = LINE_LENGTH) -> None:
+        """Initialize an empty layout."""
+        self._wrapper = TextWrapper(width)
+        self._lines = []
+        self._start = 0
+        self._base = 0
+        self._pending = None
+        self._column = None
+
+    @property
+    def first_line(self) -> int:
+        """The number of the first line, counting every line ever added. The number of a line
+        never changes, and is never reused after the layout is cleared."""
+        return self._base + self._start
+
+    def append(self, text: str) -> int:
+        """Wrap the given message onto new lines and return the number of lines it added."""
+        started = self._column is not None and self._pending is None
+        text = self._expand_tabs(text)
+        if started:
+            new_lines = self.wrap(text)
+        else:
+            # Leading whitespace is only kept at the very start of the transcript, so until then
+            # the raw text is rewrapped as a whole.
+            if self._pending is None:
+                self._pending = text
+            else:
+                self._pending += _SEPARATOR + text
+            new_lines = self._wrapper.wrap(self._pending)
+            if new_lines:
+                self._pending = None
+        self._lines.extend(new_lines)
+        return len(new_lines)
+
+    def wrap(self, text: str) -> list[str]:
+        """Return the lines the given message would take up after the first message, without
+        adding them to this layout."""
+        return self._wrapper.wrap(text.lstrip(_WHITESPACE))
+
+    def trim(self, count: int) -> None:
+        """Remove the given number of lines from the start of this layout."""
+        self._start = min(self._start + count, len(self._lines))
+        if self._start * 2 >= len(self._lines):
+            del self._lines[:self._start]
+            self._base += self._start
+            self._start = 0
+
+    def prepend(self, lines: list[str]) -> None:
+        """Add the given, already wrapped, lines to the start of this layout."""
+        self._base += self._start - len(lines)
+        self._lines[:self._start] = lines
+        self._start = 0
+
+    def clear(self) -> None:
+        """Remove all the lines from this layout."""
+        self._base += len(self._lines)
+        self._lines = []
+        self._start = 0
+        self._pending = None
+        self._column = None
+
+    def _expand_tabs(self, text: str) -> str:
+        """Expand the tabs in the given message as if it were at the end of the transcript, and
+        update self._column."""
+        tab_size = self._wrapper.tabsize
+        column = 0 if self._column is None else self._column + len(_SEPARATOR)
+        if '\t' in text:
+            text = (' ' * column + text).expandtabs(tab_size)[column:]
+        line_start = max(text.rfind('\n'), text.rfind('\r')) + 1
+        if line_start:
+            column = 0
+        self._column = (column + len(text) - line_start) % tab_size
+        return text
+
+    def __len__(self) -> int:
+        """Return the number of wrapped lines."""
+        return len(self._lines) - self._start
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        """Return the line or lines at the given index or slice."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self._lines[self._start + i] for i in range(start, stop, step)]
+            return self._lines[self._start + start:self._start + stop]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('line index out of range')
+        return self._lines[self._start + index]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the wrapped lines."""
+        return islice(self._lines, self._start, None)
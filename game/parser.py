@@ -1,7 +1,123 @@
 """The parser translates user input into actions and subjects."""
 
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
+import re
+
+from game.vocabulary import Vocabulary
+
+# NLTK's English stop words. Like NLTK's, they are lower case and matched case sensitively.
+STOP_WORDS = frozenset((
+    'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', "you're", "you've",
+    "you'll", "you'd", 'your', 'yours', 'yourself', 'yourselves', 'he', 'him', 'his', 'himself',
+    'she', "she's", 'her', 'hers', 'herself', 'it', "it's", 'its', 'itself', 'they', 'them',
+    'their', 'theirs', 'themselves', 'what', 'which', 'who', 'whom', 'this', 'that', "that'll",
+    'these', 'those', 'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has',
+    'had', 'having', 'do', 'does', 'did', 'doing', 'a', 'an', 'the', 'and', 'but', 'if', 'or',
+    'because', 'as', 'until', 'while', 'of', 'at', 'by', 'for', 'with', 'about', 'against',
+    'between', 'into', 'through', 'during', 'before', 'after', 'above', 'below', 'to', 'from',
+    'up', 'down', 'in', 'out', 'on', 'off', 'over', 'under', 'again', 'further', 'then', 'once',
+    'here', 'there', 'when', 'where', 'why', 'how', 'all', 'any', 'both', 'each', 'few', 'more',
+    'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same', 'so', 'than',
+    'too', 'very', 's', 't', 'can', 'will', 'just', 'don', "don't", 'should', "should've", 'now',
+    'd', 'll', 'm', 'o', 're', 've', 'y', 'ain', 'aren', "aren't", 'couldn', "couldn't", 'didn',
+    "didn't", 'doesn', "doesn't", 'hadn', "hadn't", 'hasn', "hasn't", 'haven', "haven't", 'isn',
+    "isn't", 'ma', 'mightn', "mightn't", 'mustn', "mustn't", 'needn', "needn't", 'shan',
+    "shan't", 'shouldn', "shouldn't", 'wasn', "wasn't", 'weren', "weren't", 'won', "won't",
+    'wouldn', "wouldn't"))
+
+VERBS = frozenset(('LOOK', 'TAKE', 'DROP', 'EXAMINE', 'SEARCH', 'INVENTORY', 'I', 'OPEN',
+                   'CLOSE', 'LOCK', 'UNLOCK', 'ASK', 'TELL', 'SAY', 'GIVE', 'SHOW', 'WAIT',
+                   'AGAIN', 'ATTACK', 'BUY', 'COVER', 'DRINK', 'EAT', 'FILL', 'JUMP', 'KISS',
+                   'KNOCK', 'LISTEN', 'MOVE', 'PULL', 'PUSH', 'REMOVE', 'READ', 'SIT', 'SLEEP',
+                   'STAND', 'THROW', 'TIE', 'TOUCH', 'TURN', 'UNTIE', 'WEAR', 'EQUIP'))
+
+# The tokenizer follows the rules of NLTK's word_tokenize. Commands made of words of letters,
+# some with a possessive or a contraction like 'S or N'T, some ending in a punctuation mark, are
+# the common case and skip the rules entirely, except for the few words that word_tokenize
+# splits in two.
+_SPLIT_WORDS = {'cannot': 3, 'gimme': 3, 'gonna': 3, 'gotta': 3, 'lemme': 3, 'wanna': 3}
+_CLITIC = re.compile(r"([^\W\d_]+?)('[sSmMdD]|'ll|'LL|'re|'RE|'ve|'VE|n't|N'T)")
+_MARKS = frozenset('.?!,:;')
+
+# The end of a sentence: a word ending in a period, question mark or exclamation mark, possibly
+# followed by closing brackets and quotes.
+_SENTENCE_END = re.compile(r"(?<=[.?!])([\])}>\"'»”’]*)\s+")
+
+# The rules of the Treebank tokenizer that word_tokenize uses on each sentence, in order, each
+# with the text one of which must be in the sentence, in lower case, for the rule to apply.
+_RULES = tuple((re.compile(pattern), replacement, tuple(triggers))
+               for pattern, replacement, triggers in (
+    # Opening quotes
+    (r'([«“‘„]|[`]+)', r' \1 ', '«“‘„`'),
+    (r'^"', r'``', '"'),
+    (r'(``)', r' \1 ', '`"'),
+    (r'([ (\[{<])("|\'{2})', r'\1 `` ', '"\''),
+    (r"(?i)(?<!\w)(')(?!(?:re|ve|ll|m|t|s|d|n)\b)(?=\w)", r'\1 ', "'"),
+    # Punctuation
+    (r'([^.])(\.)([\])}>"\'»”’ ]*)\s*$', r'\1 \2 \3 ', '.'),
+    (r'([:,])([^\d])', r' \1 \2', ':,'),
+    (r'([:,])$', r' \1 ', ':,'),
+    (r'\.{2,}', r' \g<0> ', '.'),
+    (r'[;@#$%&]', r' \g<0> ', ';@#$%&'),
+    (r'[‒-―]', r' \g<0> ', '‒–—―'),
+    (r'([^.])(\.)([\])}>"\']*)\s*$', r'\1 \2\3 ', '.'),
+    (r'[?!]', r' \g<0> ', '?!'),
+    (r"([^'])' ", r"\1 ' ", "'"),
+    (r'[*]', r' \g<0> ', '*'),
+    (r'[\][(){}<>]', r' \g<0> ', '[](){}<>'),
+    (r'--', r' -- ', ('--',)),
+    (r'^|$', r' ', ()),
+    # Closing quotes and contractions
+    (r'([»”’])', r' \1 ', '»”’'),
+    (r"''", r" '' ", '\'"'),
+    (r'"', r" '' ", '"'),
+    (r'\s+', r' ', ()),
+    (r"([^' ])('[sS]|'[mM]|'[dD]|') ", r'\1 \2 ', "'"),
+    (r"([^' ])('ll|'LL|'re|'RE|'ve|'VE|n't|N'T) ", r'\1 \2 ', "'"),
+    (r'(?i)\b(can)(not)\b', r' \1 \2 ', ('cannot',)),
+    (r"(?i)\b(d)('ye)\b", r' \1 \2 ', ("d'ye",)),
+    (r'(?i)\b(gim)(me)\b', r' \1 \2 ', ('gimme',)),
+    (r'(?i)\b(gon)(na)\b', r' \1 \2 ', ('gonna',)),
+    (r'(?i)\b(got)(ta)\b', r' \1 \2 ', ('gotta',)),
+    (r'(?i)\b(lem)(me)\b', r' \1 \2 ', ('lemme',)),
+    (r"(?i)\b(more)('n)\b", r' \1 \2 ', ("more'n",)),
+    (r'(?i)\b(wan)(na)(?=\s)', r' \1 \2 ', ('wanna',)),
+    (r"(?i) ('t)(is)\b", r' \1 \2 ', ("'tis",)),
+    (r"(?i) ('t)(was)\b", r' \1 \2 ', ("'twas",))))
+
+
+def tokenize(user_input: str) -> list[str]:
+    """Split the given command into the tokens that NLTK's word_tokenize would find."""
+    tokens = []
+    for word in user_input.split():
+        mark = word[-1] if word[-1] in _MARKS else None
+        stem = word[:-1] if mark else word
+        clitic = None
+        if not stem.isalpha():
+            match = _CLITIC.fullmatch(stem)
+            if match is None:
+                return [token for sentence in _SENTENCE_END.sub(r'\1\n', user_input).split('\n')
+                        for token in _tokenize_sentence(sentence)]
+            stem, clitic = match.groups()
+        split = _SPLIT_WORDS.get(stem.lower())
+        if split is None:
+            tokens.append(stem)
+        else:
+            tokens += (stem[:split], stem[split:])
+        if clitic:
+            tokens.append(clitic)
+        if mark:
+            tokens.append(mark)
+    return tokens
+
+
+def _tokenize_sentence(sentence: str) -> list[str]:
+    """Split a sentence that is not only words of letters into tokens."""
+    # The rules only ever add spaces and quotes, so the triggers can be looked up beforehand.
+    lowered = sentence.lower()
+    for pattern, replacement, triggers in _RULES:
+        if not triggers or any(trigger in lowered for trigger in triggers):
+            sentence = pattern.sub(replacement, sentence)
+    return sentence.split()
 
 
 class Parser:
@@ -10,22 +126,18 @@ class Parser:
     Attributes:
         stop_words: A set of words that convey little meaning and can be removed from inputs.
         verbs: A set of accepted verbs.
-        nouns: A list of accepted nouns. These change based on the room, but always include
-               cardinal directions.
+        nouns: The accepted nouns, which may be several words long. These change based on the
+               room, but always include cardinal directions.
     """
-    stop_words: set
+    stop_words: frozenset[str]
     verbs: set
-    nouns: list[str]
+    nouns: Vocabulary
 
     def __init__(self) -> None:
         """Initialize the parser."""
-        self.stop_words = set(stopwords.words('english'))
-        self.verbs = {'LOOK', 'TAKE', 'DROP', 'EXAMINE', 'SEARCH', 'INVENTORY', 'I', 'OPEN',
-                      'CLOSE', 'LOCK', 'UNLOCK', 'ASK', 'TELL', 'SAY', 'GIVE', 'SHOW', 'WAIT',
-                      'AGAIN', 'ATTACK', 'BUY', 'COVER', 'DRINK', 'EAT', 'FILL', 'JUMP', 'KISS',
-                      'KNOCK', 'LISTEN', 'MOVE', 'PULL', 'PUSH', 'REMOVE', 'READ', 'SIT', 'SLEEP',
-                      'STAND', 'THROW', 'TIE', 'TOUCH', 'TURN', 'UNTIE', 'WEAR', 'EQUIP'}
-        self.nouns = ['NORTH', 'N' 'EAST', 'E' 'SOUTH', 'S' 'WEST', 'W', 'ALL']
+        self.stop_words = STOP_WORDS
+        self.verbs = set(VERBS)
+        self.nouns = Vocabulary(('NORTH', 'N', 'EAST', 'E', 'SOUTH', 'S', 'WEST', 'W', 'ALL'))
 
     # noinspection PyTypeChecker
     def parse_command(self, user_input: str) -> tuple[str | None] | None:
@@ -34,20 +146,24 @@ class Parser:
         """
         if user_input == '':
             return
-        tokens = word_tokenize(user_input)
+        tokens = tokenize(user_input)
         words = [word for word in tokens if word.isalpha() and word not in self.stop_words]
 
         action = None
         subject = None
 
-        for index, word in enumerate(words):
+        # Verbs come first, then the longest noun beginning at each word, which uses up its words.
+        index = 0
+        while index < len(words):
+            word = words[index]
             if word in self.verbs:
                 action = word
-            elif word in self.nouns:
-                subject = word
-            elif index < len(words) - 1:
-                two_word = word + ' ' + words[index + 1]
-                if two_word in self.nouns:
-                    subject = two_word
+                index += 1
+                continue
+            match = self.nouns.match(words, index)
+            if match is None:
+                index += 1
+            else:
+                subject, index = match
 
         return (action, subject)
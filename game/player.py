@@ -1,9 +1,9 @@
 """The Player class tracks various attributes of the player, like their inventory and location."""
 
 from game.room import Room
-from game.item import Item, Weapon, Armor
+from game.item import Weapon
 from game.character import Character, NPC
-from random import randint
+from game.dice import rng
 
 
 class Player(Character):
@@ -12,16 +12,13 @@ class Player(Character):
     Attributes:
         sitting: Whether the player is sitting.
     """
+    __slots__ = ('sitting',)
     # Attribute types
     sitting: bool
 
     def __init__(self, location: Room) -> None:
         """Initialize a new player."""
         Character.__init__(self, location)
-        self.inventory = [Weapon('RUSTY DAGGER', 'A SHODDILY CRAFTED DAGGER. SLIGHTLY MORE IMPOSING'
-                                                 ' THAN A FINGERNAIL.', 3),
-                          Armor('SHABBY JERKIN', 'A TATTERED AND DIRTY '
-                                                 'JERKIN. IT PROVIDES LITTLE PROTECTION.', 1)]
         self.sitting = False
 
     def __str__(self) -> str:
@@ -48,7 +45,7 @@ class Player(Character):
             crit_damage = self.holding.damage * 2
             hit = False
             crit = False
-            roll = randint(1, 20)
+            roll = rng.randint(1, 20)
             if roll == 20:
                 target.health -= crit_damage
                 crit = True
@@ -0,0 +1,201 @@
+"""The profiler module times the phases of each frame of the game loop."""
+
+import json
+from collections import deque
+from time import perf_counter
+from typing import TextIO
+
+# The phases of a frame, in the order they happen.
+PHASES = ('events', 'parse', 'command', 'render', 'present')
+
+# The number of seconds between updates of the report shown on screen.
+_REPORT_INTERVAL = 0.5
+
+
+class RollingTimings:
+    """The durations of the last few times something happened, and their percentiles.
+
+    Attributes:
+        samples: The durations in seconds, the oldest first.
+    """
+    # Attribute types
+    samples: deque[float]
+
+    def __init__(self, window: int) -> None:
+        """Initialize timings that keep the given number of the latest durations."""
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds: float) -> None:
+        """Add the given duration, forgetting the oldest one if the window is full."""
+        self.samples.append(seconds)
+
+    def percentiles(self, *ranks: float) -> list[float]:
+        """Return the durations at the given percentiles, by the nearest rank, or zeros if there
+        are no durations."""
+        if not self.samples:
+            return [0.0] * len(ranks)
+        ordered = sorted(self.samples)
+        return [ordered[min(len(ordered) - 1, max(0, round(rank / 100 * len(ordered)) - 1))]
+                for rank in ranks]
+
+
+class _Phase:
+    """Times a phase of the current frame when used in a with statement."""
+    # Attribute types
+    profiler: 'FrameProfiler'
+    name: str
+    start: float
+
+    def __init__(self, profiler: 'FrameProfiler', name: str) -> None:
+        """Initialize the timer of the given phase."""
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        """Start timing the phase."""
+        self.start = perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        """Stop timing the phase and add its duration to the current frame."""
+        self.profiler.record(self.name, self.start, perf_counter())
+
+
+class _NoPhase:
+    """Stands in for the timer of a phase when the profiler is disabled."""
+
+    def __enter__(self) -> None:
+        """Do nothing."""
+
+    def __exit__(self, *exc_info) -> None:
+        """Do nothing."""
+
+
+_NO_PHASE = _NoPhase()
+
+
+class FrameProfiler:
+    """Times the phases of each frame, keeping the timings of the latest frames for a report,
+    and optionally writing every frame to a trace file. A trace file ending in .json is in the
+    Trace Event Format that chrome://tracing and Perfetto open, and any other file is CSV with
+    one row per frame and the durations in milliseconds.
+
+    Attributes:
+        enabled: Whether frames are timed at all.
+        overlay: Whether the report is shown on screen.
+        timings: The timings of each phase and of whole frames, under 'frame'.
+        _phases: The timer of each phase.
+        _frame: The time spent in each phase during the current frame.
+        _frame_start: The time the current frame started.
+        _frame_number: The number of frames started.
+        _spans: The phases of the current frame with their start and end times, for the trace.
+        _origin: The time the profiler was created, which trace times are relative to.
+        _trace: The trace file, or None if there is none.
+        _json: Whether the trace file is in the Trace Event Format.
+        _report: The last report.
+        _report_time: The time the last report was made.
+    """
+    # Attribute types
+    enabled: bool
+    overlay: bool
+    timings: dict[str, RollingTimings]
+    _phases: dict[str, _Phase]
+    _frame: dict[str, float]
+    _frame_start: float
+    _frame_number: int
+    _spans: list[tuple[str, float, float]]
+    _origin: float
+    _trace: TextIO | None
+    _json: bool
+    _report: list[str]
+    _report_time: float
+
+    def __init__(self, enabled: bool = False, window: int = 600, trace_path: str | None = None,
+                 overlay: bool = False) -> None:
+        """Initialize a profiler that keeps the timings of the given number of frames."""
+        self.enabled = enabled
+        self.overlay = overlay
+        self.timings = {name: RollingTimings(window) for name in PHASES + ('frame',)}
+        self._phases = {name: _Phase(self, name) for name in PHASES}
+        self._frame = {}
+        self._frame_start = self._origin = perf_counter()
+        self._frame_number = 0
+        self._spans = []
+        self._json = trace_path is not None and trace_path.endswith('.json')
+        self._trace = None if trace_path is None or not enabled else open(trace_path, 'w')
+        if self._trace is not None:
+            self._trace.write('[\n' if self._json else ','.join(('frame', 'time') + PHASES
+                                                                 + ('total',)) + '\n')
+        self._report = []
+        self._report_time = float('-inf')
+
+    def phase(self, name: str) -> _Phase | _NoPhase:
+        """Return a context manager that times the given phase of the current frame."""
+        return self._phases[name] if self.enabled else _NO_PHASE
+
+    def record(self, name: str, start: float, end: float) -> None:
+        """Add the time between start and end to the given phase of the current frame."""
+        self._frame[name] = self._frame.get(name, 0.0) + end - start
+        if self._trace is not None:
+            self._spans.append((name, start, end))
+
+    def begin_frame(self) -> None:
+        """Start timing a new frame."""
+        if self.enabled:
+            self._frame.clear()
+            self._spans.clear()
+            self._frame_number += 1
+            self._frame_start = perf_counter()
+
+    def end_frame(self) -> None:
+        """Stop timing the current frame, and write it to the trace file."""
+        if not self.enabled:
+            return
+        end = perf_counter()
+        total = end - self._frame_start
+        for name, seconds in self._frame.items():
+            self.timings[name].add(seconds)
+        self.timings['frame'].add(total)
+        if self._trace is not None:
+            self._write_frame(end)
+
+    def _write_frame(self, end: float) -> None:
+        """Write the current frame to the trace file."""
+        if self._json:
+            events = [{'name': 'frame', 'ph': 'X', 'pid': 0, 'tid': 0,
+                       'ts': round((self._frame_start - self._origin) * 1e6, 1),
+                       'dur': round((end - self._frame_start) * 1e6, 1),
+                       'args': {'frame': self._frame_number}}]
+            events += [{'name': name, 'ph': 'X', 'pid': 0, 'tid': 0,
+                        'ts': round((start - self._origin) * 1e6, 1),
+                        'dur': round((stop - start) * 1e6, 1)} for name, start, stop in self._spans]
+            separator = '' if self._frame_number == 1 else ',\n'
+            self._trace.write(separator + ',\n'.join(json.dumps(event) for event in events))
+        else:
+            durations = [f'{self._frame[name] * 1e3:.3f}' if name in self._frame else ''
+                         for name in PHASES]
+            self._trace.write(','.join([str(self._frame_number),
+                                        f'{self._frame_start - self._origin:.6f}', *durations,
+                                        f'{(end - self._frame_start) * 1e3:.3f}']) + '\n')
+
+    def report(self) -> list[str]:
+        """Return the 50th, 95th and 99th percentiles and the maximum of the time spent in each
+        phase and in whole frames, in milliseconds, as lines of a table. The report is made
+        again at most twice a second, so that it can be read on screen."""
+        now = perf_counter()
+        if now - self._report_time >= _REPORT_INTERVAL:
+            self._report_time = now
+            self._report = [f'{"MS":<8}{"P50":>7}{"P95":>7}{"P99":>7}{"MAX":>7}']
+            for name, timings in self.timings.items():
+                values = timings.percentiles(50, 95, 99, 100)
+                self._report.append(f'{name.upper():<8}'
+                                    + ''.join(f'{value * 1e3:>7.2f}' for value in values))
+        return self._report
+
+    def close(self) -> None:
+        """Finish and close the trace file, if there is one."""
+        if self._trace is not None:
+            if self._json:
+                self._trace.write('\n]\n')
+            self._trace.close()
+            self._trace = None
@@ -0,0 +1,76 @@
+"""The registry module indexes the things in the game by name, for lookups that do not scan."""
+
+from typing import Generic, Protocol, TypeVar
+
+
+class Named(Protocol):
+    """Anything with a name, like an item or an NPC."""
+    name: str
+
+
+T = TypeVar('T', bound=Named)
+
+
+class NameIndex(Generic[T]):
+    """The things in a container, like the items in a room or an inventory, by name. Several
+    things may share a name, in which case the one added first is found first. A name that only
+    one thing has maps to that thing, without a list.
+
+    Attributes:
+        _entities: The thing with each name, or the things with it in the order they were added
+                   if there are several.
+        _size: The number of things in this index.
+    """
+    __slots__ = ('_entities', '_size')
+    # Attribute types
+    _entities: dict[str, T | list[T]]
+    _size: int
+
+    def __init__(self, entities=None) -> None:
+        """Initialize an index of the given things."""
+        self._entities = {}
+        self._size = 0
+        for entity in entities if entities else ():
+            self.add(entity)
+
+    def add(self, entity: T) -> None:
+        """Add the given thing to this index."""
+        entities = self._entities.get(entity.name)
+        if entities is None:
+            self._entities[entity.name] = entity
+        elif type(entities) is list:
+            entities.append(entity)
+        else:
+            self._entities[entity.name] = [entities, entity]
+        self._size += 1
+
+    def remove(self, entity: T) -> None:
+        """Remove the given thing from this index.
+
+        Raises:
+            KeyError: If nothing in this index has the name of the thing.
+            ValueError: If the thing is not in this index, though something with its name is.
+        """
+        entities = self._entities[entity.name]
+        if type(entities) is not list:
+            if entities is not entity:
+                raise ValueError(f'{entity.name} is not in the index')
+            del self._entities[entity.name]
+        else:
+            entities.remove(entity)
+            if len(entities) == 1:
+                self._entities[entity.name] = entities[0]
+        self._size -= 1
+
+    def get(self, name: str) -> T | None:
+        """Return the first thing with the given name, or None if there is none."""
+        entities = self._entities.get(name)
+        return entities[0] if type(entities) is list else entities
+
+    def __contains__(self, name: str) -> bool:
+        """Return whether anything in this index has the given name."""
+        return name in self._entities
+
+    def __len__(self) -> int:
+        """Return the number of things in this index."""
+        return self._size
@@ -0,0 +1,185 @@
+"""The replay module records the input of a session to a log and plays it back, so that a session
+can be repeated exactly, as a benchmark or as a bug report.
+
+The log is JSON, one value per line, gzipped if its name ends in .gz. The first line is a header
+with the seed of the dice. Every other line is a frame that had input: the milliseconds since the
+session started, the events of the frame as [type, attributes] pairs, and the mouse position and
+buttons as [x, y, buttons], or null if they did not change.
+"""
+
+import gzip
+import json
+from random import randrange
+from time import perf_counter, sleep
+from typing import IO
+
+import pygame
+
+from game import dice
+from game.scheduler import FrameScheduler
+
+# The version of the log format.
+LOG_VERSION = 1
+
+
+class LiveInput:
+    """The input of the player: the events of each frame, paced by the scheduler, and the state
+    of the mouse at the start of the frame.
+
+    Attributes:
+        scheduler: Paces the game loop, keeping the FPS while active and sleeping while idle.
+        mouse_pos: The position of the mouse during the current frame.
+        mouse_buttons: Whether each of the left, middle and right mouse buttons is pressed during
+                       the current frame.
+    """
+    # Attribute types
+    scheduler: FrameScheduler
+    mouse_pos: tuple[int, int]
+    mouse_buttons: tuple[bool, bool, bool]
+
+    def __init__(self, scheduler: FrameScheduler) -> None:
+        """Initialize the input of the player."""
+        self.scheduler = scheduler
+        self.mouse_pos = (0, 0)
+        self.mouse_buttons = (False, False, False)
+
+    def wait(self, animating: bool = False) -> list[pygame.event.Event]:
+        """Sleep until the next frame is due and return the events that arrived meanwhile."""
+        events = self.scheduler.wait(animating)
+        self.mouse_pos = pygame.mouse.get_pos()
+        self.mouse_buttons = pygame.mouse.get_pressed()[:3]
+        return events
+
+    def close(self) -> None:
+        """Stop taking input."""
+
+
+class SessionRecorder(LiveInput):
+    """The input of the player, which is also written to a log. Inherits from LiveInput.
+
+    Attributes:
+        _log: The log file.
+        _start: The time the session started.
+        _last_mouse: The state of the mouse written last, or None if none was.
+    """
+    # Attribute types
+    _log: IO[str]
+    _start: float
+    _last_mouse: list[int] | None
+
+    def __init__(self, scheduler: FrameScheduler, path: str, seed: int | None = None) -> None:
+        """Initialize a recorder writing to the log at the given path, and seed the dice with
+        the given seed, or a random one."""
+        LiveInput.__init__(self, scheduler)
+        seed = randrange(2 ** 32) if seed is None else seed
+        dice.seed(seed)
+        self._log = _open(path, 'w')
+        self._write({'version': LOG_VERSION, 'seed': seed, 'pygame': pygame.version.ver})
+        self._start = perf_counter()
+        self._last_mouse = None
+
+    def wait(self, animating: bool = False) -> list[pygame.event.Event]:
+        """Sleep until the next frame is due and return the events that arrived meanwhile,
+        writing the frame to the log if it had any input."""
+        events = LiveInput.wait(self, animating)
+        mouse = [*self.mouse_pos, sum(pressed << index
+                                      for index, pressed in enumerate(self.mouse_buttons))]
+        if events or mouse != self._last_mouse:
+            self._write([round((perf_counter() - self._start) * 1000),
+                         [[event.type, _attributes(event)] for event in events],
+                         None if mouse == self._last_mouse else mouse])
+            self._last_mouse = mouse
+        return events
+
+    def _write(self, value: object) -> None:
+        """Write the given value to a new line of the log."""
+        self._log.write(json.dumps(value, separators=(',', ':')) + '\n')
+
+    def close(self) -> None:
+        """Finish and close the log."""
+        self._log.close()
+
+
+class SessionReplayer(LiveInput):
+    """The input of a session read back from a log, instead of the player. Inherits from
+    LiveInput. The frames of the log are played as fast as possible, or at the pace they were
+    recorded, and the session ends with a QUIT event once they run out.
+
+    Attributes:
+        realtime: Whether the frames are played at the pace they were recorded.
+        frames: The number of frames played.
+        _log: The log file.
+        _start: The time the replay started.
+        _next: The next frame of the log, or None if there are no more.
+    """
+    # Attribute types
+    realtime: bool
+    frames: int
+    _log: IO[str]
+    _start: float
+    _next: list | None
+
+    def __init__(self, scheduler: FrameScheduler, path: str, realtime: bool = False) -> None:
+        """Initialize a replay of the log at the given path, and seed the dice the way they
+        were seeded for the session.
+
+        Raises:
+            ValueError: If the log is not in a format this version of the game can read.
+        """
+        LiveInput.__init__(self, scheduler)
+        self.realtime = realtime
+        self.frames = 0
+        self._log = _open(path, 'r')
+        header = json.loads(self._log.readline())
+        if header.get('version') != LOG_VERSION:
+            raise ValueError(f'unsupported session log version: {header.get("version")}')
+        dice.seed(header['seed'])
+        self._start = perf_counter()
+        self._next = self._read()
+
+    def _read(self) -> list | None:
+        """Return the next frame of the log, or None if there are no more."""
+        line = self._log.readline()
+        return json.loads(line) if line else None
+
+    def wait(self, animating: bool = False) -> list[pygame.event.Event]:
+        """Return the events of the next frame of the log. When playing at the recorded pace,
+        frames without input are played at the frame rate until the next frame of the log is
+        due."""
+        self.frames += 1
+        if self._next is None:
+            return [pygame.event.Event(pygame.QUIT)]
+        if self.realtime:
+            delay = self._start + self._next[0] / 1000 - perf_counter()
+            if delay > 0:
+                sleep(min(delay, 1 / self.scheduler.fps))
+                if delay > 1 / self.scheduler.fps:
+                    return []
+
+        _, events, mouse = self._next
+        self._next = self._read()
+        if mouse is not None:
+            self.mouse_pos = (mouse[0], mouse[1])
+            self.mouse_buttons = tuple(bool(mouse[2] >> index & 1) for index in range(3))
+        return [pygame.event.Event(event_type, {name: tuple(value) if isinstance(value, list)
+                                                else value for name, value in attributes.items()})
+                for event_type, attributes in events]
+
+    def close(self) -> None:
+        """Close the log."""
+        self._log.close()
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    """Open the log at the given path as text, through gzip if its name ends in .gz."""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _attributes(event: pygame.event.Event) -> dict:
+    """Return the attributes of the given event that can be written to the log, which are all
+    that the game reads."""
+    return {name: value for name, value in event.dict.items()
+            if value is None or isinstance(value, (int, float, str))
+            or isinstance(value, tuple) and all(isinstance(part, (int, float)) for part in value)}
@@ -0,0 +1,435 @@
+"""The save module saves the state of a game to a compact binary file and restores it, with the
+writing done on a background thread.
+
+A save file starts with a header, which holds the fingerprint of the world file the game was
+played in, followed by blocks. Each block is a kind, the length and CRC of its payload, and the
+payload: a zlib-compressed run of records. The first block is a full checkpoint of every record,
+and each later block a delta of only the records that changed since the save before. A record is
+keyed by its tag and the number of its entity in the world file, and the last record with a key
+wins. An empty record means that the entity is as it is in the world file again. Items are
+referred to by their numbers in the world file, never by object, so that a snapshot is a flat
+list of numbers however the rooms and characters refer to each other.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from threading import Lock
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from game.dice import rng
+from game.item import Item
+from game.world import NPCState, World
+
+if TYPE_CHECKING:
+    from game.engine import Engine
+
+MAGIC = b'FSAV'
+VERSION = 1
+
+# The kinds of blocks.
+_CHECKPOINT = 0
+_DELTA = 1
+
+# The tags of the records: the state of the game, the player, an NPC, and the items of a room.
+_GAME = 0
+_PLAYER = 1
+_NPC = 2
+_ROOM = 3
+
+# The header of the file: the magic bytes, the version, and the fingerprint of the world.
+_FILE = struct.Struct('<4sHHI')
+# The header of a block: its kind, and the length and CRC of its payload.
+_BLOCK = struct.Struct('<BII')
+# The header of a record: its tag, the number of its entity, and the length of its body.
+_RECORD = struct.Struct('<BII')
+# A character: the number of its room, its health and armor class, its flags, the number of the
+# item it holds or -1, and the number of items in its inventory, which follow.
+_CHARACTER = struct.Struct('<IiiBiI')
+# The state of the game: whether the player is in combat, and the state of the dice.
+_STATE = struct.Struct('<B625IBd')
+
+# A snapshot: the body of every record by its tag and entity number.
+Snapshot = dict[tuple[int, int], bytes]
+
+
+def _numbers(items: list[Item]) -> list[int]:
+    """Return the numbers of the given items in the world file.
+
+    Raises:
+        ValueError: If an item was not loaded from the world file.
+    """
+    numbers = [item.key for item in items]
+    if None in numbers:
+        raise ValueError('only items loaded from the world can be saved')
+    return numbers
+
+
+def _character(room: int, state: NPCState) -> bytes:
+    """Return the body of the record of a character in the room with the given number, with the
+    given state, its flags in place of whether it is hostile."""
+    health, ac, flags, inventory, holding = state
+    holding = -1 if holding is None else _numbers([holding])[0]
+    inventory = _numbers(inventory)
+    return (_CHARACTER.pack(room, health, ac, flags, holding, len(inventory))
+            + struct.pack(f'<{len(inventory)}I', *inventory))
+
+
+def capture(engine: Engine) -> Snapshot:
+    """Return a snapshot of the state of the given engine. Only what can differ from the world
+    file is in it: the player, and the NPCs and the rooms that changed.
+
+    Raises:
+        ValueError: If the player is not in a room of the world, or an item was not loaded from
+                    the world file.
+    """
+    world = engine.world
+    room = world.number(engine.current_room)
+    if room is None:
+        raise ValueError('only games in rooms of the world can be saved')
+    _, state, gauss = rng.getstate()
+    player = engine.player
+    snapshot = {(_GAME, 0): _STATE.pack(engine.combat, *state, gauss is not None, gauss or 0.0),
+                (_PLAYER, 0): _character(room, (player.health, player.ac, player.sitting,
+                                                player.inventory, player.holding))}
+    for number, (npc_room, npc) in world.changed_npcs().items():
+        snapshot[_NPC, number] = _character(npc_room, npc)
+    for number, items in world.changed_rooms().items():
+        items = _numbers(items)
+        snapshot[_ROOM, number] = struct.pack(f'<I{len(items)}I', len(items), *items)
+    return snapshot
+
+
+def _encode(snapshot: Snapshot) -> bytes:
+    """Return the compressed payload of a block of the records of the given snapshot."""
+    return zlib.compress(b''.join(_RECORD.pack(tag, number, len(body)) + body
+                                  for (tag, number), body in snapshot.items()), 1)
+
+
+class SaveFile:
+    """A save file that snapshots are written to, each as a delta of the records that changed
+    since the last one, with a full checkpoint written in place of the whole file before the
+    first and after every given number of deltas.
+
+    Attributes:
+        path: The path of the save file.
+        fingerprint: The fingerprint of the world the snapshots are of.
+        deltas: The number of deltas written between two checkpoints.
+        written: The number of bytes written to the file since the last checkpoint, including it.
+        _saved: The last snapshot written, or None if none was written yet.
+        _count: The number of deltas written since the last checkpoint.
+    """
+    # Attribute types
+    path: str
+    fingerprint: int
+    deltas: int
+    written: int
+    _saved: Snapshot | None
+    _count: int
+
+    def __init__(self, path: str, fingerprint: int, deltas: int = 20) -> None:
+        """Initialize a save file for a world with the given fingerprint. Nothing is written until
+        the first snapshot."""
+        self.path = path
+        self.fingerprint = fingerprint
+        self.deltas = deltas
+        self.written = 0
+        self._saved = None
+        self._count = 0
+
+    def write(self, snapshot: Snapshot) -> None:
+        """Write the given snapshot, as a delta if there was a snapshot before it and fewer than
+        the number of deltas since the last checkpoint, and as a checkpoint otherwise."""
+        if self._saved is None or self._count >= self.deltas:
+            payload = _encode(snapshot)
+            data = (_FILE.pack(MAGIC, VERSION, 0, self.fingerprint)
+                    + _BLOCK.pack(_CHECKPOINT, len(payload), zlib.crc32(payload)) + payload)
+            # Replace the file at once, so that a crash never leaves it without a checkpoint.
+            temporary = self.path + '.tmp'
+            with open(temporary, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, self.path)
+            self.written = len(data)
+            self._count = 0
+        else:
+            changed = {key: body for key, body in snapshot.items()
+                       if self._saved.get(key) != body}
+            changed.update((key, b'') for key in self._saved if key not in snapshot)
+            if not changed:
+                return
+            payload = _encode(changed)
+            with open(self.path, 'ab') as file:
+                file.write(_BLOCK.pack(_DELTA, len(payload), zlib.crc32(payload)) + payload)
+            self.written += _BLOCK.size + len(payload)
+            self._count += 1
+        self._saved = snapshot
+
+
+def read(path: str, world: World) -> Snapshot:
+    """Return the snapshot saved in the file at the given path, made of its checkpoint and the
+    deltas after it. A delta cut short by a crash while it was written, and the blocks after it,
+    are ignored.
+
+    Raises:
+        ValueError: If the file is not a save file, was saved in another world, or its checkpoint
+                    or a delta that was written in full is damaged.
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    if data[:len(MAGIC)] != MAGIC or len(data) < _FILE.size:
+        raise ValueError(f'{path} is not a save file')
+    _, version, _, fingerprint = _FILE.unpack_from(data)
+    if version != VERSION:
+        raise ValueError(f'{path} is a save file of version {version}, not {VERSION}')
+    if fingerprint != world.fingerprint:
+        raise ValueError(f'{path} was saved in another world')
+    snapshot = {}
+    position = _FILE.size
+    while position + _BLOCK.size <= len(data):
+        kind, length, crc = _BLOCK.unpack_from(data, position)
+        payload = data[position + _BLOCK.size:position + _BLOCK.size + length]
+        checkpoint = position == _FILE.size
+        if checkpoint and kind != _CHECKPOINT:
+            break
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            # Only the last delta can be cut short by a crash. The checkpoint replaces the file
+            # whole, so one that is cut short was damaged after it was written.
+            if checkpoint:
+                raise ValueError(f'the checkpoint of {path} is damaged')
+            break
+        try:
+            records = zlib.decompress(payload)
+        except zlib.error as error:
+            raise ValueError(f'a block of {path} is damaged') from error
+        offset = 0
+        while offset < len(records):
+            if offset + _RECORD.size > len(records):
+                raise ValueError(f'a block of {path} is damaged')
+            tag, number, size = _RECORD.unpack_from(records, offset)
+            offset += _RECORD.size
+            if offset + size > len(records):
+                raise ValueError(f'a block of {path} is damaged')
+            if size:
+                snapshot[tag, number] = records[offset:offset + size]
+            else:
+                snapshot.pop((tag, number), None)
+            offset += size
+        position += _BLOCK.size + length
+    if position == _FILE.size:
+        raise ValueError(f'{path} has no checkpoint')
+    return snapshot
+
+
+# A decoded character: the number of its room, its health, armor class and flags, the number of the
+# item it holds or -1, and the numbers of the items in its inventory.
+_Character = tuple[int, int, int, int, int, tuple[int, ...]]
+
+
+def _decode_character(body: bytes) -> _Character:
+    """Return the character of the given record body.
+
+    Raises:
+        ValueError: If the body is not that of a character.
+    """
+    if len(body) < _CHARACTER.size:
+        raise ValueError('a character of the save file is damaged')
+    *fields, count = _CHARACTER.unpack_from(body)
+    if len(body) != _CHARACTER.size + 4 * count:
+        raise ValueError('a character of the save file is damaged')
+    return (*fields, struct.unpack_from(f'<{count}I', body, _CHARACTER.size))
+
+
+def _decode_items(body: bytes) -> tuple[int, ...]:
+    """Return the item numbers of the given record body of the items of a room.
+
+    Raises:
+        ValueError: If the body is not that of the items of a room.
+    """
+    if len(body) < 4 or len(body) != 4 + 4 * struct.unpack_from('<I', body)[0]:
+        raise ValueError('a room of the save file is damaged')
+    return struct.unpack_from(f'<{len(body) // 4 - 1}I', body, 4)
+
+
+def restore(engine: Engine, path: str) -> None:
+    """Put the game saved in the file at the given path in place of the game of the given
+    engine. The whole saved game is read and checked before the game of the engine is changed,
+    so that it is left as it was if the saved game cannot be restored.
+
+    Raises:
+        ValueError: If the file is not a save file, was saved in another world, or is damaged.
+    """
+    world = engine.world
+    snapshot = read(path, world)
+    if (_PLAYER, 0) not in snapshot or (_GAME, 0) not in snapshot:
+        raise ValueError(f'{path} has no player')
+    player = _decode_character(snapshot[_PLAYER, 0])
+    npcs = {number: _decode_character(body)
+            for (tag, number), body in snapshot.items() if tag == _NPC}
+    rooms = {number: _decode_items(body)
+             for (tag, number), body in snapshot.items() if tag == _ROOM}
+    if len(snapshot[_GAME, 0]) != _STATE.size:
+        raise ValueError(f'the state of the game in {path} is damaged')
+    state = _STATE.unpack(snapshot[_GAME, 0])
+    # The last number of the state of the dice is its position in the others.
+    if state[625] > 624 or not 0 <= player[0] < world.size:
+        raise ValueError(f'the state of the game in {path} is damaged')
+
+    # Every item is made at once, so that the same number is the same object wherever it is.
+    numbers = {number for items in rooms.values() for number in items}
+    for record in (player, *npcs.values()):
+        numbers.update(record[5])
+        if record[4] >= 0:
+            numbers.add(record[4])
+    items = {number: world.item(number) for number in numbers}
+    world.restore({number: [items[key] for key in keys] for number, keys in rooms.items()},
+                  {number: (health, ac, bool(flags), [items[key] for key in inventory],
+                            items[holding] if holding >= 0 else None)
+                   for number, (_, health, ac, flags, holding, inventory) in npcs.items()})
+
+    engine.clear()
+    _, health, ac, flags, holding, inventory = player
+    engine.player.restore(health, ac, [items[key] for key in inventory],
+                          items[holding] if holding >= 0 else None)
+    engine.player.sitting = bool(flags)
+    engine.combat = bool(state[0])
+    rng.setstate((3, state[1:626], state[627] if state[626] else None))
+    engine.setup_nouns()
+    engine.set_room(world.room(player[0]))
+
+
+class Autosaver:
+    """Saves a game to a save file on a background thread, so that saving never holds up a
+    frame. The state of the game is captured on the calling thread, which is quick, and encoded
+    and written on the background thread. Saves asked for while one is being written are
+    collapsed into the latest. The game is saved every given number of seconds while commands
+    are entered, and the changes since the last save when it is closed. A game saved earlier is
+    never replaced by autosaves until the player saves or restores the game, so that starting a
+    new game and quitting it does not lose it.
+
+    Attributes:
+        file: The save file.
+        interval: The number of seconds between autosaves, or 0 to only save when asked to.
+        dirty: Whether commands were entered since the last save.
+        armed: Whether the game is autosaved: from the start if there was no saved game, and
+               once the player saves or restores otherwise.
+        _writer: The background thread the snapshots are written on.
+        _lock: Guards the pending snapshot.
+        _pending: The snapshot waiting to be written, or None.
+        _future: The last write given to the background thread, or None.
+        _last: The time of the last save.
+    """
+    # Attribute types
+    file: SaveFile
+    interval: float
+    dirty: bool
+    armed: bool
+    _writer: ThreadPoolExecutor
+    _lock: Lock
+    _pending: Snapshot | None
+    _future: Future | None
+    _last: float
+
+    def __init__(self, path: str, world: World, interval: float = 60.0,
+                 deltas: int = 20) -> None:
+        """Initialize an autosaver that saves games in the given world to the file at the given
+        path."""
+        self.file = SaveFile(path, world.fingerprint, deltas)
+        self.interval = interval
+        self.dirty = False
+        self.armed = not os.path.exists(path)
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='autosave')
+        self._lock = Lock()
+        self._pending = None
+        self._future = None
+        self._last = perf_counter()
+
+    def save(self, engine: Engine) -> None:
+        """Capture the state of the given engine and write it on the background thread, and
+        autosave it from now on.
+
+        Raises:
+            ValueError: If the game cannot be saved as it is, in which case nothing changes.
+        """
+        snapshot = capture(engine)
+        if self._future is not None and self._future.done():
+            self._check(engine)
+        with self._lock:
+            queued = self._pending is not None
+            self._pending = snapshot
+        if not queued:
+            self._future = self._writer.submit(self._write)
+        self.dirty = False
+        self.armed = True
+        self._last = perf_counter()
+
+    def _write(self) -> None:
+        """Write the pending snapshot. Runs on the background thread."""
+        with self._lock:
+            snapshot, self._pending = self._pending, None
+        if snapshot is not None:
+            self.file.write(snapshot)
+
+    def _check(self, engine: Engine) -> None:
+        """Tell the player of the given engine if the last write, which is done, failed. The save
+        file may then end in a block cut short, after which deltas would be ignored, so the next
+        save starts over from a checkpoint."""
+        error = self._future.exception()
+        self._future = None
+        if isinstance(error, OSError):
+            engine.add_text(f'THE GAME COULD NOT BE SAVED: {error.strerror or error}.'.upper())
+            self.file = SaveFile(self.file.path, self.file.fingerprint, self.file.deltas)
+        elif error is not None:
+            raise error
+
+    def update(self, engine: Engine) -> None:
+        """Note that a command was entered, and save the given engine if the interval has passed
+        since the last save. Called after every command."""
+        self.dirty = True
+        if self.armed and self.interval and perf_counter() - self._last >= self.interval:
+            self._autosave(engine)
+
+    def _autosave(self, engine: Engine) -> None:
+        """Save the given engine, unless it cannot be saved as it is, in which case it is saved
+        the next time it is autosaved."""
+        try:
+            self.save(engine)
+        except ValueError:
+            pass
+
+    def exists(self) -> bool:
+        """Return whether there is a saved game."""
+        return os.path.exists(self.file.path)
+
+    def flush(self, engine: Engine) -> None:
+        """Wait for the snapshots being written, and tell the player of the given engine if the
+        last one could not be."""
+        if self._future is not None:
+            wait([self._future])
+            self._check(engine)
+
+    def restore(self, engine: Engine) -> None:
+        """Put the saved game in place of the game of the given engine, once every save is
+        written.
+
+        Raises:
+            ValueError: If the save file was saved in another world or is damaged, in which case
+                        the game is left as it was.
+        """
+        self.flush(engine)
+        restore(engine, self.file.path)
+        # The next save starts over from a checkpoint of the restored game.
+        self.file = SaveFile(self.file.path, self.file.fingerprint, self.file.deltas)
+        self.dirty = False
+        self.armed = True
+
+    def close(self, engine: Engine) -> None:
+        """Save the given engine if commands were entered since the last save and it is
+        autosaved, wait for the writes, and stop the background thread."""
+        if self.dirty and self.armed:
+            self._autosave(engine)
+        self.flush(engine)
+        self._writer.shutdown()
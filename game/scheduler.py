@@ -0,0 +1,77 @@
+"""The scheduler module decides when the game loop wakes up."""
+
+from collections import deque
+from time import perf_counter
+
+import pygame
+
+
+class FrameScheduler:
+    """Paces the game loop. While something is animating, or shortly after the last input, the
+    loop runs at the full frame rate. Otherwise it blocks until an input event arrives, waking up
+    only at the idle frame rate.
+
+    Attributes:
+        fps: The frame rate while active.
+        idle_fps: The frame rate while idle, or 0 to sleep until the next input.
+        idle_delay: The number of seconds without input after which the loop goes idle.
+        adaptive: Whether the loop goes idle at all. If not, it always runs at fps.
+        clock: The clock used to keep the frame rate while active.
+        _last_input: The time of the last input event.
+        _wakeups: The times the loop woke up during the last second.
+    """
+    # Attribute types
+    fps: int
+    idle_fps: int
+    idle_delay: float
+    adaptive: bool
+    clock: pygame.time.Clock
+    _last_input: float
+    _wakeups: deque[float]
+
+    def __init__(self, fps: int, idle_fps: int, idle_delay: float, adaptive: bool = True) -> None:
+        """Initialize a scheduler that starts out active."""
+        self.fps = fps
+        self.idle_fps = idle_fps
+        self.idle_delay = idle_delay
+        self.adaptive = adaptive
+        self.clock = pygame.time.Clock()
+        self._last_input = perf_counter()
+        self._wakeups = deque()
+
+    @property
+    def idle(self) -> bool:
+        """Whether the loop is idle, unless something is animating."""
+        return self.adaptive and perf_counter() - self._last_input >= self.idle_delay
+
+    @property
+    def wakeups_per_second(self) -> int:
+        """The number of times the loop woke up during the last second."""
+        self._forget_wakeups(perf_counter())
+        return len(self._wakeups)
+
+    def wait(self, animating: bool = False) -> list[pygame.event.Event]:
+        """Sleep until the next frame is due and return the events that arrived meanwhile."""
+        if animating or not self.idle:
+            self.clock.tick(self.fps)
+            events = pygame.event.get()
+        else:
+            if self.idle_fps:
+                event = pygame.event.wait(max(1, 1000 // self.idle_fps))
+            else:
+                event = pygame.event.wait()
+            events = [] if event.type == pygame.NOEVENT else [event] + pygame.event.get()
+            # Keep the clock from counting the time spent idle as one very long frame.
+            self.clock.tick()
+
+        now = perf_counter()
+        if events:
+            self._last_input = now
+        self._wakeups.append(now)
+        self._forget_wakeups(now)
+        return events
+
+    def _forget_wakeups(self, now: float) -> None:
+        """Forget the wakeups that happened more than a second ago."""
+        while self._wakeups and now - self._wakeups[0] > 1:
+            self._wakeups.popleft()
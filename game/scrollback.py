@@ -0,0 +1,121 @@
+"""The scrollback module holds the transcript of the game, within a fixed memory budget."""
+
+from collections import deque
+from tempfile import TemporaryFile
+from typing import BinaryIO
+
+from game.layout import TextLayout
+
+# The number of bytes read from the transcript file at a time when paging history back in.
+_PAGE_BYTES = 4096
+
+
+class Scrollback:
+    """The messages displayed by the game. The most recent messages are kept in memory, and older
+    ones are spilled to a transcript file, one message per line, from which they are paged back in
+    when the player scrolls past the oldest message in memory.
+
+    Attributes:
+        layout: The word-wrapped lines of the messages in memory.
+        max_lines: The number of lines kept in memory, or None for no limit.
+        max_bytes: The number of bytes of messages kept in memory, or None for no limit.
+        _file: The transcript file.
+        _messages: The messages in memory, with the number of lines each one takes up.
+        _bytes: The number of bytes of the messages in memory.
+        _first_offset: The position in the transcript file of the oldest message in memory, or of
+                       the end of the file if that message was never spilled.
+        _spilled_in_memory: The number of the oldest messages in memory that are also in the
+                            transcript file, because they were paged back in.
+    """
+    # Attribute types
+    layout: TextLayout
+    max_lines: int | None
+    max_bytes: int | None
+    _file: BinaryIO
+    _messages: deque[tuple[str, int]]
+    _bytes: int
+    _first_offset: int
+    _spilled_in_memory: int
+
+    def __init__(self, layout: TextLayout, max_lines: int | None = None,
+                 max_bytes: int | None = None, path: str | None = None) -> None:
+        """Initialize an empty scrollback. Spilled messages are written to the file at the given
+        path, or to a temporary file if there is no path."""
+        self.layout = layout
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self._file = TemporaryFile() if path is None else open(path, 'w+b')
+        self._messages = deque()
+        self._bytes = 0
+        self._first_offset = 0
+        self._spilled_in_memory = 0
+
+    def append(self, text: str) -> int:
+        """Add the given message, spilling the oldest messages to the transcript file if memory is
+        over budget. Return the number of lines the message takes up."""
+        line_count = self.layout.append(text)
+        self._messages.append((text, line_count))
+        self._bytes += len(text.encode())
+        while len(self._messages) > 1 and self._over_budget():
+            self._spill()
+        return line_count
+
+    def _over_budget(self) -> bool:
+        """Return whether the messages in memory take up more than the budget."""
+        return ((self.max_lines is not None and len(self.layout) > self.max_lines)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes))
+
+    def _spill(self) -> None:
+        """Remove the oldest message from memory, writing it to the transcript file unless it is
+        already there."""
+        text, line_count = self._messages.popleft()
+        data = text.encode()
+        self._bytes -= len(data)
+        self.layout.trim(line_count)
+        if self._spilled_in_memory:
+            self._spilled_in_memory -= 1
+            self._first_offset += len(data) + 1
+        else:
+            self._file.seek(0, 2)
+            self._file.write(data.replace(b'\n', b' ').replace(b'\r', b' ') + b'\n')
+            self._first_offset = self._file.tell()
+
+    def page_in(self) -> int:
+        """Bring the messages just before the oldest message in memory back from the transcript
+        file, and return the number of lines they take up."""
+        if self._first_offset == 0:
+            return 0
+
+        # Read back whole lines until at least one message is complete.
+        start = self._first_offset
+        chunk = b''
+        while start > 0 and chunk.count(b'\n') < 2:
+            start = max(0, start - _PAGE_BYTES)
+            self._file.seek(start)
+            chunk = self._file.read(self._first_offset - start)
+        records = chunk.split(b'\n')[:-1]
+        if start > 0:
+            # The first record may be cut off.
+            start += len(records.pop(0)) + 1
+
+        messages = []
+        lines = []
+        for record in records:
+            text = record.decode()
+            message_lines = self.layout.wrap(text)
+            messages.append((text, len(message_lines)))
+            lines.extend(message_lines)
+            self._bytes += len(record)
+        self._messages.extendleft(reversed(messages))
+        self._spilled_in_memory += len(messages)
+        self.layout.prepend(lines)
+        self._first_offset = start
+        return len(lines)
+
+    def __len__(self) -> int:
+        """Return the number of messages in memory."""
+        return len(self._messages)
+
+    def close(self) -> None:
+        """Close the transcript file."""
+        self._file.close()
@@ -0,0 +1,176 @@
+"""The server module lets many players play at once, each their own game in the same world, over
+TCP or a Unix socket, without a display or audio. It runs every game in one process, on asyncio.
+
+Usage: python -m game.server [--host HOST] [--port PORT] [--unix PATH] [--sessions N]
+
+The protocol is lines of UTF-8 text. A player sends a command a line, and the server answers with
+the text it produced a line, then an empty line. The server starts by describing the room the
+player is in, ended by an empty line too. QUIT, or closing the connection, ends the game.
+"""
+
+import asyncio
+from argparse import ArgumentParser
+
+from game.engine import Engine
+from game.world import World, load_world
+from game.settings import (SERVER_HOST, SERVER_PORT, SERVER_SESSIONS, SERVER_IDLE_TIMEOUT,
+                           SERVER_LINE_LIMIT)
+
+
+class Server:
+    """Plays a game for every player connected to it, each in its own copy of the same world,
+    sharing the world file. Commands are handled one at a time on the event loop, as they are
+    short, so the games need no locks.
+
+    Attributes:
+        world: The world the world of every game is shared from.
+        sessions: The number of players let in at once. Players beyond it are turned away.
+        idle_timeout: The number of seconds a player may go without entering a command before
+                      their game ends.
+        line_limit: The longest command, in bytes, read from a player. Longer ones end the game.
+        games: The game of each player being played, by the stream to the player.
+        commands: The number of commands handled since the server started.
+        _active: The time, by the clock of the event loop, each player last entered a command
+                 at, by the stream to the player.
+        _sweeper: The task that lets idle players go, once the server listens.
+    """
+    # Attribute types
+    world: World
+    sessions: int
+    idle_timeout: float
+    line_limit: int
+    games: dict[asyncio.StreamWriter, Engine]
+    commands: int
+    _active: dict[asyncio.StreamWriter, float]
+    _sweeper: asyncio.Task | None
+
+    def __init__(self, world: World, sessions: int = SERVER_SESSIONS,
+                 idle_timeout: float = SERVER_IDLE_TIMEOUT,
+                 line_limit: int = SERVER_LINE_LIMIT) -> None:
+        """Initialize a server with no players, for games in the given world."""
+        self.world = world
+        self.sessions = sessions
+        self.idle_timeout = idle_timeout
+        self.line_limit = line_limit
+        self.games = {}
+        self.commands = 0
+        self._active = {}
+        self._sweeper = None
+
+    async def listen(self, host: str = SERVER_HOST, port: int = SERVER_PORT,
+                     path: str | None = None) -> asyncio.AbstractServer:
+        """Start listening for players on the Unix socket at the given path if there is one, and
+        on the given TCP host and port otherwise, and return the listening server. As many
+        players as are let in at once can be waiting to connect."""
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self.sweep())
+        if path is not None:
+            return await asyncio.start_unix_server(self.play, path, limit=self.line_limit,
+                                                   backlog=self.sessions)
+        return await asyncio.start_server(self.play, host, port, limit=self.line_limit,
+                                          backlog=self.sessions)
+
+    async def play(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Play a game with the player connected through the given streams, until they quit or
+        leave, or sweep lets them go."""
+        if len(self.games) >= self.sessions:
+            await _send(writer, ['THE SERVER IS FULL. TRY AGAIN LATER.'])
+            await _close(writer)
+            return
+        game = self.games[writer] = Engine(self.world.share())
+        loop = asyncio.get_running_loop()
+        self._active[writer] = loop.time()
+        try:
+            await _send(writer, [game.current_room.desc])
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    await _send(writer, ['THAT COMMAND IS TOO LONG. GOODBYE.'])
+                    break
+                if not line:
+                    break
+                self._active[writer] = loop.time()
+                # Commands are upper case, as the window types them.
+                user_input = line.decode('utf-8', 'replace').strip().upper()
+                if user_input == 'QUIT':
+                    await _send(writer, ['GOODBYE.'])
+                    break
+                self.commands += 1
+                await _send(writer, game.submit(user_input))
+        except ConnectionError:
+            pass
+        finally:
+            del self.games[writer]
+            self._active.pop(writer, None)
+            game.world.close()
+            await _close(writer)
+
+    async def sweep(self) -> None:
+        """Let go of the players who have not entered a command within the idle timeout, checking
+        ten times every timeout, so that waiting for commands takes no timer for each."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.idle_timeout / 10)
+            deadline = loop.time() - self.idle_timeout
+            for writer in [writer for writer, time in self._active.items() if time < deadline]:
+                # Ending the connection ends the game, as if the player had left.
+                writer.write(b'YOU FALL ASLEEP. GOODBYE.\n\n')
+                writer.close()
+                del self._active[writer]
+
+    def close(self) -> None:
+        """Stop letting idle players go. The games being played go on until their players
+        leave."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+
+async def _send(writer: asyncio.StreamWriter, texts: list[str]) -> None:
+    """Send the given texts to a player, a line each, then an empty line to end them. Texts of
+    several lines are split, and empty lines left out, so that only the end is empty."""
+    lines = [line for text in texts for line in text.splitlines() if line]
+    lines.append('\n')
+    writer.write('\n'.join(lines).encode('utf-8'))
+    await writer.drain()
+
+
+async def _close(writer: asyncio.StreamWriter) -> None:
+    """Close the connection to a player, whether or not they already closed it."""
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except ConnectionError:
+        pass
+
+
+async def main(host: str, port: int, path: str | None, sessions: int) -> None:
+    """Serve games in the world of the settings until interrupted. The address the server
+    listens on is printed once it does, so that a port of 0 lets it pick a free one."""
+    world = load_world()
+    server = Server(world, sessions)
+    listener = await server.listen(host, port, path)
+    address = path if path is not None else '{}:{}'.format(*listener.sockets[0].getsockname())
+    print(f'LISTENING ON {address}', flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+        world.close()
+
+
+if __name__ == '__main__':
+    arguments = ArgumentParser(description='Let many players play Forged at once.')
+    arguments.add_argument('--host', default=SERVER_HOST, help='the host to listen on')
+    arguments.add_argument('--port', type=int, default=SERVER_PORT,
+                           help='the port to listen on, or 0 for a free one')
+    arguments.add_argument('--unix', metavar='PATH', help='listen on a Unix socket instead')
+    arguments.add_argument('--sessions', type=int, default=SERVER_SESSIONS,
+                           help='the number of players let in at once')
+    options = arguments.parse_args()
+    try:
+        asyncio.run(main(options.host, options.port, options.unix, options.sessions))
+    except KeyboardInterrupt:
+        pass
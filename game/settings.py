@@ -1,5 +1,89 @@
 """Settings."""
 
+import os
+
 WIDTH = 1280
 HEIGHT = 720
 FPS = 60
+
+# Whether the game loop sleeps until the next input while nothing is happening on screen.
+ADAPTIVE_FPS = True
+# The frame rate while idle, or 0 to sleep until the next input.
+IDLE_FPS = 2
+# The number of seconds without input after which the game loop goes idle.
+IDLE_DELAY = 1.0
+
+# The number of characters that fit on one line of the transcript.
+LINE_LENGTH = 44
+
+# The number of lines and bytes of text kept in memory, or None for no limit. Older text is
+# spilled to the transcript file.
+SCROLLBACK_LINES = 1000
+SCROLLBACK_BYTES = None
+# The file older text is spilled to, or None for a temporary file.
+TRANSCRIPT_PATH = None
+
+# The number of characters of new text revealed a second, for a typing effect, or 0 to reveal it
+# as fast as the budget allows.
+TYPEWRITER_SPEED = 0
+# The number of seconds a frame may spend revealing new text. ESC reveals the rest at once.
+TYPEWRITER_BUDGET = 0.004
+
+# The number of commands kept in the history, which UP, DOWN and Ctrl+R go through.
+HISTORY_SIZE = 500
+# The file the history is saved to, so that it is kept between sessions, or None to not save it.
+HISTORY_PATH = os.path.join(os.path.expanduser('~'), '.forged_history')
+
+# The authored source of the world, and the binary file it is compiled to and loaded from. The
+# world is compiled again whenever its source is newer than the compiled file.
+WORLD_SOURCE = 'world/world.json'
+WORLD_PATH = 'world/world.bin'
+# The number of regions away from the region of the player that stay loaded. Regions further away
+# are released, and loaded again when the player comes near them.
+WORLD_RADIUS = 1
+
+# The file the game is saved to, with SAVE and RESTORE and by the autosave, or None to not save.
+SAVE_PATH = os.path.join(os.path.expanduser('~'), '.forged_save')
+# The number of seconds between autosaves while commands are entered, or 0 to only save with SAVE.
+AUTOSAVE_INTERVAL = 60.0
+# The number of saves written as deltas of what changed since the save before them, between two
+# full checkpoints.
+SAVE_DELTAS = 20
+
+# The address the server listens on for players, with python -m game.server.
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 4000
+# The number of players the server lets play at once. Players beyond it are turned away.
+SERVER_SESSIONS = 10_000
+# The number of seconds a player may go without entering a command before the server lets them go.
+SERVER_IDLE_TIMEOUT = 900.0
+# The longest command, in bytes, the server reads from a player.
+SERVER_LINE_LIMIT = 1024
+
+# Whether every frame is drawn and presented in full, instead of only the parts that changed.
+FULL_REDRAW = False
+
+# Whether the phases of each frame are timed. F3 shows their timings on screen.
+PROFILE = True
+# Whether the timings are on screen from the start.
+PROFILE_OVERLAY = False
+# The number of the latest frames the timings on screen are taken from.
+PROFILE_WINDOW = 600
+# The file the timings of every frame are written to, or None to not write them. A file ending in
+# .json is a trace for chrome://tracing or Perfetto, and any other file is CSV.
+PROFILE_TRACE_PATH = None
+
+# The file the number of calls and the time spent in each command handler are written to when
+# the game quits, or None to not write them.
+COMMAND_STATS_PATH = None
+
+# The number of milliseconds the music takes to fade from one track into the next.
+CROSSFADE_MS = 1500
+# The number of sound effects that can play at once.
+SOUND_CHANNELS = 8
+
+# The number of images, fonts and sounds that are kept loaded after they are no longer in use.
+ASSET_CACHE_SIZE = 32
+# The file the load times of the images, fonts and sounds are written to when the game quits, or
+# None to not write them.
+ASSET_STATS_PATH = None
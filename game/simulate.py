@@ -0,0 +1,225 @@
+"""The simulate module plays out many fights at once by the rules of combat of the game, to
+balance the items and characters without playing. It needs NumPy, which the game itself does not.
+
+Usage: python -m game.simulate FIRST SECOND [--fights N] [--rounds N] [--seed N]
+
+Each side is given as KIND:DAMAGE[:HEALTH[:AC]], where KIND is weapon, magic or none, and the
+health and armor class default to those of a new character. The first side strikes first, like
+the player does, and the report gives the odds of each side and how long their fights take.
+"""
+
+from argparse import ArgumentParser
+
+import numpy as np
+
+from game.character import Character
+from game.item import Item, Magic, Weapon
+from game.player import Player
+
+# The number of fights played out at once, in arrays of fights by rounds, which bounds the
+# memory a simulation takes.
+BATCH = 100_000
+# The number of rounds of the fights of a batch played out at once.
+SPAN = 16
+
+
+class Combatant:
+    """One side of a fight: a character's health, armor class and the item it attacks with.
+
+    Attributes:
+        item: The item the side attacks with, or None if it does not attack.
+        health: The hit points of the side.
+        ac: The armor class of the side.
+    """
+    # Attribute types
+    item: Item | None
+    health: int
+    ac: int
+
+    def __init__(self, item: Item | None, health: int = 100, ac: int = 10) -> None:
+        """Initialize a side of a fight."""
+        self.item = item
+        self.health = health
+        self.ac = ac
+
+    @classmethod
+    def of(cls, character: Character) -> 'Combatant':
+        """Return a side of a fight with the health and armor class of the given character,
+        attacking with the item it holds. The player only attacks with weapons."""
+        item = character.holding
+        if type(character) is Player and type(item) is not Weapon:
+            item = None
+        return cls(item, character.health, character.ac)
+
+
+def damage(item: Item | None, ac: int, rolls: np.ndarray) -> np.ndarray:
+    """Return the damage of an attack with the given item, against the given armor class, for
+    each of the given d20 rolls, by the rules of Player.attack, NPC.attack and NPC.spell_attack.
+    A weapon hits for its damage on a roll of at least the armor class, and crits for twice its
+    damage on a 20. A spell always hits for its damage. Anything else does no damage."""
+    if type(item) is Weapon:
+        return np.where(rolls == 20, np.int32(2 * item.damage),
+                        np.where(rolls >= ac, np.int32(item.damage), np.int32(0)))
+    if type(item) is Magic:
+        return np.full(rolls.shape, item.damage, dtype=np.int32)
+    return np.zeros(rolls.shape, dtype=np.int32)
+
+
+class CombatReport:
+    """The outcome of many fights between two sides, each side numbered by its position: 0 for
+    the side that strikes first and 1 for the other.
+
+    Attributes:
+        fights: The number of fights.
+        rounds: The most rounds a fight lasts before it is a draw.
+        wins: The number of fights each side won.
+        draws: The number of fights neither side won.
+        kills: The number of fights each side won in each round, by the round counting from 0.
+        attacks: The number of attacks each side made.
+        hits: The number of attacks of each side that did damage.
+        crits: The number of attacks of each side that were critical hits.
+    """
+    # Attribute types
+    fights: int
+    rounds: int
+    wins: list[int]
+    draws: int
+    kills: list[np.ndarray]
+    attacks: list[int]
+    hits: list[int]
+    crits: list[int]
+
+    def __init__(self, rounds: int) -> None:
+        """Initialize a report of no fights."""
+        self.fights = 0
+        self.rounds = rounds
+        self.wins = [0, 0]
+        self.draws = 0
+        self.kills = [np.zeros(rounds, dtype=np.int64), np.zeros(rounds, dtype=np.int64)]
+        self.attacks = [0, 0]
+        self.hits = [0, 0]
+        self.crits = [0, 0]
+
+    def survival(self, side: int) -> float:
+        """Return the odds of the given side being alive at the end of a fight."""
+        return (self.fights - self.wins[1 - side]) / self.fights
+
+    def hit_rate(self, side: int) -> float:
+        """Return the share of the attacks of the given side that did damage."""
+        return self.hits[side] / self.attacks[side] if self.attacks[side] else 0.0
+
+    def crit_rate(self, side: int) -> float:
+        """Return the share of the attacks of the given side that were critical hits."""
+        return self.crits[side] / self.attacks[side] if self.attacks[side] else 0.0
+
+    def time_to_kill(self, side: int, percentile: float) -> int | None:
+        """Return the number of rounds within which the given share, as a percentage, of the
+        fights the given side won were won, or None if it never won."""
+        if not self.wins[side]:
+            return None
+        cumulative = np.cumsum(self.kills[side])
+        return int(np.searchsorted(cumulative, percentile / 100 * self.wins[side])) + 1
+
+    def summary(self) -> str:
+        """Return the report as text, a line a side."""
+        lines = [f'{self.fights} fights of at most {self.rounds} rounds, '
+                 f'{self.draws / self.fights:.2%} drawn']
+        for side, name in enumerate(('FIRST', 'SECOND')):
+            rounds = '/'.join('-' if self.time_to_kill(side, percentile) is None
+                              else str(self.time_to_kill(side, percentile))
+                              for percentile in (50, 90, 99))
+            lines.append(f'{name}: wins {self.wins[side] / self.fights:.2%}, survives '
+                         f'{self.survival(side):.2%}, hits {self.hit_rate(side):.2%}, crits '
+                         f'{self.crit_rate(side):.2%}, rounds to kill p50/p90/p99 {rounds}')
+        return '\n'.join(lines)
+
+
+def _batch(report: CombatReport, sides: tuple[Combatant, Combatant], fights: int,
+           generator: np.random.Generator) -> None:
+    """Play out the given number of fights between the given sides and add them to the
+    report. The fights are played out SPAN rounds at a time, and only those still undecided
+    go on to the next rounds, so that short fights do not cost as much as long ones."""
+    # The damage each side has dealt in each undecided fight.
+    taken = [np.zeros(fights, dtype=np.int64), np.zeros(fights, dtype=np.int64)]
+    start = 0
+    while fights and start < report.rounds:
+        span = min(SPAN, report.rounds - start)
+        rolls = []
+        dealt = []
+        kill = []
+        for side in (0, 1):
+            attacker, defender = sides[side], sides[1 - side]
+            rolls.append(generator.integers(1, 21, size=(fights, span), dtype=np.int8))
+            dealt.append(damage(attacker.item, defender.ac, rolls[side]))
+            total = np.cumsum(dealt[side], axis=1, dtype=np.int64) + taken[side][:, None]
+            # The attack after which the defender has taken all its health, or span if none is.
+            dead = total >= defender.health
+            kill.append(np.where(dead[:, -1], dead.argmax(axis=1), span))
+            taken[side] = total[:, -1]
+
+        # The first side attacks first in every round, so it wins a round both sides would win.
+        first_wins = (kill[0] <= kill[1]) & (kill[0] < span)
+        second_wins = kill[1] < kill[0]
+        made = [np.where(first_wins, kill[0] + 1, np.where(second_wins, kill[1] + 1, span)),
+                np.where(first_wins, kill[0], np.where(second_wins, kill[1] + 1, span))]
+        won = (first_wins, second_wins)
+        for side in (0, 1):
+            attacked = np.arange(span) < made[side][:, None]
+            report.wins[side] += int(np.count_nonzero(won[side]))
+            report.kills[side][start:start + span] += np.bincount(kill[side][won[side]],
+                                                                  minlength=span)[:span]
+            report.attacks[side] += int(made[side].sum())
+            report.hits[side] += int(np.count_nonzero((dealt[side] > 0) & attacked))
+            if type(sides[side].item) is Weapon:
+                report.crits[side] += int(np.count_nonzero((rolls[side] == 20) & attacked))
+
+        undecided = ~(first_wins | second_wins)
+        taken = [taken[0][undecided], taken[1][undecided]]
+        report.fights += fights - len(taken[0])
+        fights = len(taken[0])
+        start += span
+    report.draws += fights
+    report.fights += fights
+
+
+def simulate(first: Combatant, second: Combatant, fights: int = 1_000_000, rounds: int = 200,
+             seed: int | None = None) -> CombatReport:
+    """Play out the given number of fights between the given sides, each a round after round of
+    an attack of the first side then an attack of the second, until one side is dead or the
+    given number of rounds have passed, and return the report of the fights."""
+    generator = np.random.default_rng(seed)
+    report = CombatReport(rounds)
+    for start in range(0, fights, BATCH):
+        _batch(report, (first, second), min(BATCH, fights - start), generator)
+    return report
+
+
+def _side(text: str) -> Combatant:
+    """Return the side of a fight described by the given KIND:DAMAGE[:HEALTH[:AC]] text.
+
+    Raises:
+        ValueError: If the text does not describe a side.
+    """
+    kind, *numbers = text.split(':')
+    numbers = [int(number) for number in numbers]
+    if not 1 <= len(numbers) <= 3 or kind not in ('weapon', 'magic', 'none'):
+        raise ValueError(f'not a side: {text}')
+    item = {'weapon': Weapon, 'magic': Magic}[kind](kind.upper(), '', numbers[0]) \
+        if kind != 'none' else None
+    return Combatant(item, *numbers[1:])
+
+
+if __name__ == '__main__':
+    arguments = ArgumentParser(description='Play out many fights by the rules of combat of Forged.')
+    arguments.add_argument('first', type=_side, metavar='FIRST',
+                           help='the side that strikes first, as KIND:DAMAGE[:HEALTH[:AC]]')
+    arguments.add_argument('second', type=_side, metavar='SECOND',
+                           help='the other side, as KIND:DAMAGE[:HEALTH[:AC]]')
+    arguments.add_argument('--fights', type=int, default=1_000_000,
+                           help='the number of fights to play out')
+    arguments.add_argument('--rounds', type=int, default=200,
+                           help='the most rounds a fight lasts before it is a draw')
+    arguments.add_argument('--seed', type=int, help='seed the dice')
+    options = arguments.parse_args()
+    print(simulate(options.first, options.second, options.fights, options.rounds,
+                   options.seed).summary())
@@ -0,0 +1,83 @@
+"""The soundbank module plays the sound effects of the game on a fixed pool of mixer channels."""
+
+from time import perf_counter
+
+import pygame
+
+from game.assets import assets
+
+# The sound effects of the game by name, with the path of their file and their priority. A sound
+# may cut off a playing sound of the same or a lower priority when every channel is busy.
+MANIFEST = {'open_inventory': ('assets/sounds/inventory/leather_inventory.wav', 1)}
+
+
+class SoundBank:
+    """The decoded sound effects of the game, played on a fixed pool of channels, so that the
+    mixer never mixes more than a fixed number of sounds however many are played in a turn. When
+    every channel is busy, the sound of the lowest priority that has played the longest is cut off
+    for a new sound of the same or a higher priority, and the new sound is dropped otherwise. A
+    sound played more than once in a frame is only played once.
+
+    Attributes:
+        sounds: The decoded sound effects with their priorities, by name.
+        channels: The channels the sound effects are played on.
+        played: The number of sounds played.
+        collapsed: The number of sounds not played because they were already played that frame.
+        stolen: The number of sounds cut off to play another.
+        dropped: The number of sounds not played because every channel was busy with sounds of
+                 a higher priority.
+        _voices: The priority, start time and name of the last sound played on each channel.
+        _frame: The names of the sounds played during the current frame.
+    """
+    # Attribute types
+    sounds: dict[str, tuple[pygame.mixer.Sound, int]]
+    channels: list[pygame.mixer.Channel]
+    played: int
+    collapsed: int
+    stolen: int
+    dropped: int
+    _voices: list[tuple[int, float, str] | None]
+    _frame: set[str]
+
+    def __init__(self, channels: list[pygame.mixer.Channel],
+                 manifest: dict[str, tuple[str, int]] = MANIFEST) -> None:
+        """Initialize a bank that decodes the sounds of the given manifest and plays them on the
+        given channels, which must be reserved so that nothing else plays on them."""
+        self.sounds = {name: (assets.sound(path), priority)
+                       for name, (path, priority) in manifest.items()}
+        self.channels = channels
+        self.played = self.collapsed = self.stolen = self.dropped = 0
+        self._voices = [None] * len(channels)
+        self._frame = set()
+
+    def play(self, name: str) -> bool:
+        """Play the specified sound, unless it was already played this frame or every channel is
+        busy with sounds of a higher priority, and return whether it was played."""
+        if name in self._frame:
+            self.collapsed += 1
+            return False
+        sound, priority = self.sounds[name]
+        index = self._free_channel()
+        if index is None:
+            index = min(range(len(self.channels)), key=lambda voice: self._voices[voice][:2])
+            if self._voices[index][0] > priority:
+                self.dropped += 1
+                return False
+            self.stolen += 1
+        # Channel.play cuts off the sound that is playing on the channel, if there is one.
+        self.channels[index].play(sound)
+        self._voices[index] = (priority, perf_counter(), name)
+        self._frame.add(name)
+        self.played += 1
+        return True
+
+    def _free_channel(self) -> int | None:
+        """Return the index of a channel that is not playing, or None if they all are."""
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return index
+        return None
+
+    def end_frame(self) -> None:
+        """Let every sound be played again. Called once a frame."""
+        self._frame.clear()
@@ -0,0 +1,124 @@
+"""The tiles module keeps the rendered lines of the transcript off screen, so that scrolling only
+copies pixels."""
+
+import pygame
+
+from game.glyphs import GlyphAtlas
+from game.layout import TextLayout
+
+
+class _Tile:
+    """A surface with a run of consecutive lines of the transcript drawn on it, one under the
+    other.
+
+    Attributes:
+        surface: The surface the lines are drawn on.
+        drawn: Whether each line of the tile has been drawn.
+    """
+    # Attribute types
+    surface: pygame.Surface
+    drawn: bytearray
+
+    def __init__(self, surface: pygame.Surface, lines: int) -> None:
+        """Initialize a tile with no lines drawn on the given surface."""
+        self.surface = surface
+        self.drawn = bytearray(lines)
+
+
+class TranscriptTiles:
+    """The lines of the transcript rendered onto tiles of a fixed number of lines, keyed by the
+    number of the first line, which never changes. A line is rendered once, when it first comes
+    into view, and the viewport is copied from the one or two tiles under it, at any pixel
+    offset. Only the tiles under the viewport and their neighbours are kept.
+
+    Attributes:
+        width: The width of the tiles in pixels.
+        line_height: The height of a line in pixels.
+        tile_lines: The number of lines on a tile.
+        margin: The distance in pixels from the left of a tile to the start of each line.
+        _atlas: The atlas the lines on the tiles were drawn with, or None if there are no tiles.
+        _tiles: The tiles by the number of the first line over the number of lines on a tile.
+        _spare: The surfaces of forgotten tiles, which new tiles reuse.
+    """
+    # Attribute types
+    width: int
+    line_height: int
+    tile_lines: int
+    margin: int
+    _atlas: GlyphAtlas | None
+    _tiles: dict[int, _Tile]
+    _spare: list[pygame.Surface]
+
+    def __init__(self, width: int, line_height: int, tile_lines: int = 12,
+                 margin: int = 0) -> None:
+        """Initialize a cache with no tiles."""
+        self.width = width
+        self.line_height = line_height
+        self.tile_lines = tile_lines
+        self.margin = margin
+        self._atlas = None
+        self._tiles = {}
+        self._spare = []
+
+    def draw(self, dest: pygame.Surface, rect: pygame.Rect, layout: TextLayout, top: int,
+             atlas: GlyphAtlas, stop: int | None = None) -> None:
+        """Draw the lines of the given layout onto the given rectangle of dest, with the given
+        atlas, starting the given number of pixels below the top of the line numbered 0. Lines
+        from the one numbered stop on are left blank, if there is a stop."""
+        self._use(atlas)
+        tile_height = self.tile_lines * self.line_height
+        bottom = top + rect.height
+        first_tile = top // tile_height
+        last_tile = (bottom - 1) // tile_height
+        for index in range(first_tile, last_tile + 1):
+            tile = self._tile(index, layout, stop)
+            tile_top = index * tile_height
+            area_top = max(top, tile_top)
+            area = pygame.Rect(0, area_top - tile_top, min(self.width, rect.width),
+                               min(bottom, tile_top + tile_height) - area_top)
+            dest.blit(tile.surface, (rect.x, rect.y + area_top - top), area)
+
+        # Forget the tiles that are not under the viewport or next to it.
+        for index in [index for index in self._tiles
+                      if not first_tile - 1 <= index <= last_tile + 1]:
+            self._spare.append(self._tiles.pop(index).surface)
+
+    def prepare(self, layout: TextLayout, number: int, atlas: GlyphAtlas) -> None:
+        """Draw the line of the given layout with the given number onto its tile ahead of time,
+        so that drawing the viewport later only copies it."""
+        self._use(atlas)
+        self._tile(number // self.tile_lines, layout, number + 1)
+
+    def _use(self, atlas: GlyphAtlas) -> None:
+        """Forget every tile if it was drawn with another atlas than the given one."""
+        if atlas is not self._atlas:
+            self._atlas = atlas
+            self.clear()
+
+    def _tile(self, index: int, layout: TextLayout, stop: int | None = None) -> _Tile:
+        """Return the tile with the given index, with every line of the layout that is on it
+        drawn, up to the line numbered stop if there is a stop."""
+        tile = self._tiles.get(index)
+        if tile is None:
+            if self._spare:
+                surface = self._spare.pop()
+            else:
+                surface = pygame.Surface((self.width, self.tile_lines * self.line_height))
+                surface = surface.convert()
+            surface.fill(self._atlas.background or 'black')
+            tile = self._tiles[index] = _Tile(surface, self.tile_lines)
+        first = index * self.tile_lines
+        start = max(first, layout.first_line)
+        end = min(first + self.tile_lines, layout.first_line + len(layout),
+                  first + self.tile_lines if stop is None else stop)
+        for number in range(start, end):
+            if not tile.drawn[number - first]:
+                tile.drawn[number - first] = 1
+                self._atlas.blit(tile.surface, layout[number - layout.first_line],
+                                 (self.margin, (number - first) * self.line_height))
+        return tile
+
+    def clear(self) -> None:
+        """Forget every tile."""
+        self._tiles.clear()
+        self._spare.clear()
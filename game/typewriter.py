@@ -0,0 +1,150 @@
+"""The typewriter module reveals new text a little at a time, over several frames."""
+
+from collections import deque
+from time import perf_counter
+
+from game.scrollback import Scrollback
+from game.ui import UIManager, VISIBLE_LINES
+
+
+class Typewriter:
+    """The text on its way from the game to the screen. New messages are queued, and every frame
+    reveals more of them, at a steady number of characters a second for a typing effect, and
+    never for longer than a time budget, so that a long message costs a few frames a little each
+    instead of one frame a lot. Each line is rendered onto the transcript tiles as soon as it is
+    fully revealed, within the same budget, unless it will have scrolled past by the time the
+    frame is shown.
+
+    Attributes:
+        scrollback: The transcript the messages are added to.
+        ui: The UI manager the transcript is shown by.
+        speed: The number of characters revealed a second, or 0 to reveal as many as the budget
+               allows.
+        budget: The number of seconds a frame may spend revealing text.
+        _queue: The messages not yet added to the transcript.
+        _line: The number of the line being revealed, counting every line ever added.
+        _shown: The number of characters of that line that are revealed.
+        _end: The number of the line after the last line added to the transcript.
+        _credit: The characters the speed allows that have not been revealed yet.
+        _last: The time of the last frame that revealed text, or None if it had nothing left.
+    """
+    # Attribute types
+    scrollback: Scrollback
+    ui: UIManager
+    speed: float
+    budget: float
+    _queue: deque[str]
+    _line: int
+    _shown: int
+    _end: int
+    _credit: float
+    _last: float | None
+
+    def __init__(self, scrollback: Scrollback, ui: UIManager, speed: float = 0,
+                 budget: float = 0.004) -> None:
+        """Initialize a typewriter with nothing to reveal."""
+        self.scrollback = scrollback
+        self.ui = ui
+        self.speed = speed
+        self.budget = budget
+        self._queue = deque()
+        self._end = self._line = ui.lines.first_line + len(ui.lines)
+        self._shown = 0
+        self._credit = 0.0
+        self._last = None
+
+    def write(self, text: str) -> None:
+        """Queue the given message, to be revealed after the messages queued before it."""
+        self._queue.append(text)
+
+    def busy(self) -> bool:
+        """Return whether there is text left to reveal."""
+        return bool(self._queue) or self._line < self._end
+
+    def update(self) -> None:
+        """Reveal as much text as the speed allows since the last frame, within the budget.
+        Called once a frame."""
+        if not self.busy():
+            self._last = None
+            return
+        follow = self._at_bottom()
+        now = perf_counter()
+        if self.speed:
+            self._credit += self.speed * (0.0 if self._last is None else now - self._last)
+            # A message starts showing on the frame it arrives.
+            self._credit = max(self._credit, 1.0)
+        else:
+            self._credit = float('inf')
+        self._last = now
+        deadline = now + self.budget
+        while self._credit >= 1 and perf_counter() < deadline and self._reveal():
+            pass
+        if not self.speed:
+            self._credit = 0.0
+        self._show(follow)
+
+    def skip(self) -> None:
+        """Reveal all the text at once. The lines are rendered when they come on screen, since
+        most will have scrolled past by then."""
+        follow = self._at_bottom()
+        self._credit = float('inf')
+        while self._reveal(prepare=False):
+            pass
+        self._credit = 0.0
+        self._show(follow)
+
+    def _reveal(self, prepare: bool = True) -> bool:
+        """Reveal more of the line being revealed, as much as the credit allows, adding the next
+        message to the transcript first if every line added is revealed, and render the line if
+        prepare is true and it is fully revealed. Return whether there was anything to reveal."""
+        lines = self.ui.lines
+        if self._line >= self._end:
+            if not self._queue:
+                return False
+            first_line = lines.first_line
+            self.scrollback.append(self._queue.popleft())
+            # The scroll position counts from the first line in memory, so lines spilled to the
+            # transcript file would move the view down the text by as many lines.
+            self.ui.scroll_position = max(0, self.ui.scroll_position
+                                          - (lines.first_line - first_line))
+            self._end = lines.first_line + len(lines)
+            # Lines spilled before they were revealed are not shown at all.
+            self._line = max(self._line, lines.first_line)
+            return True
+        line = lines[self._line - lines.first_line]
+        count = min(len(line) - self._shown, self._credit)
+        self._shown += int(count)
+        self._credit -= int(count)
+        if self._shown >= len(line):
+            # Without the typing effect, lines with a screenful of text after them, counting a
+            # line for each queued message, are scrolled past before they are ever shown.
+            if prepare and (self.speed
+                            or self._end - self._line + len(self._queue) <= VISIBLE_LINES):
+                self.ui.prepare_line(self._line)
+            self._line += 1
+            self._shown = 0
+        return True
+
+    def follow(self) -> None:
+        """Scroll to the bottom of the revealed text, so that the text revealed next is
+        followed."""
+        self.ui.scroll_position = max(0, self._revealed() - 8)
+
+    def _revealed(self) -> int:
+        """Return the number of lines in memory that are at least partly revealed."""
+        if self._line < self._end:
+            return self._line - self.ui.lines.first_line + (self._shown > 0)
+        return len(self.ui.lines)
+
+    def _at_bottom(self) -> bool:
+        """Return whether the view is scrolled to the bottom of the revealed text, with the last
+        line of it on screen."""
+        return self.ui.scroll_position >= self._revealed() - VISIBLE_LINES
+
+    def _show(self, follow: bool) -> None:
+        """Tell the UI manager how much of the transcript is revealed, and scroll to the bottom
+        of it if follow is true, which it is when the view was at the bottom before this frame
+        revealed more, so that a player who scrolled up to read is not pulled back down."""
+        self.ui.hidden_from = (self._line, self._shown) if self._line < self._end else None
+        if follow:
+            self.follow()
@@ -1,12 +1,31 @@
 """UI handles the user interface."""
 
 import pygame
-from game.settings import WIDTH, HEIGHT
-from textwrap import wrap
+from game.settings import WIDTH, HEIGHT, FULL_REDRAW
+from game.layout import TextLayout
+from game.glyphs import GlyphAtlas, get_atlas
+from game.dirty import DirtyRegions
+from game.assets import assets, FONT_PATH
+from game.tiles import TranscriptTiles
+
+# The distance in pixels between the tops of two lines of the transcript.
+LINE_HEIGHT = 67
+# The number of lines of the transcript on screen.
+VISIBLE_LINES = 9
 
 
 class TitleElements:
-    """Title screen elements."""
+    """Title screen elements. Everything in front of the background is composited into one layer
+    for each hover state of the start button, so that a frame of the title screen is two blits.
+
+    Attributes:
+        foregrounds: The layer in front of the background, without and with the start button
+                     hovered over.
+        foreground_rect: Where the layer in front of the background goes on screen.
+    """
+    # Attribute types
+    foregrounds: dict[bool, pygame.Surface]
+    foreground_rect: pygame.Rect | None
 
     def __init__(self) -> None:
         """I will take ChatGPTs word for it."""
@@ -22,11 +41,14 @@ class TitleElements:
         self.press_enter_rect = None
         self.press_enter_shadow = None
         self.press_enter_shadow_rect = None
+        self.foregrounds = {}
+        self.foreground_rect = None
 
     def initialize(self, font: pygame.font.Font, title_font: pygame.font.Font) -> None:
         """Initialize this stuff for some reason."""
         # Background
-        self.title_bg = pygame.image.load('assets/images/fantasy_bg.png').convert_alpha()
+        # The background is opaque, which blits faster without per-pixel alpha.
+        self.title_bg = assets.image('assets/images/fantasy_bg.png', alpha=False)
         self.title_bg_rect = self.title_bg.get_rect(center=(WIDTH // 2 + 120, HEIGHT // 2 - 100))
 
         # Title text
@@ -37,18 +59,42 @@ class TitleElements:
             center=(WIDTH // 2 - 4, HEIGHT // 4 + 4))
 
         # Sword
-        self.sword_surf = pygame.image.load(
-            'assets/images/fire_sword_transparent.png').convert_alpha()
+        self.sword_surf = assets.image('assets/images/fire_sword_transparent.png')
         self.sword_rect = self.sword_surf.get_rect(midbottom=(WIDTH // 2, HEIGHT - 20))
 
         # Press enter
-        self.press_enter_surf = font.render('PRESS ENTER TO START', True, 'ivory')
+        self.press_enter_surf = get_atlas(font, 'ivory').render('PRESS ENTER TO START')
         self.press_enter_rect = self.press_enter_surf.get_rect(
             bottomright=(WIDTH - 18, HEIGHT - 18))
-        self.press_enter_shadow = font.render('PRESS ENTER TO START', True, 'black')
+        self.press_enter_shadow = get_atlas(font, 'black').render('PRESS ENTER TO START')
         self.press_enter_shadow_rect = self.press_enter_shadow.get_rect(
             bottomright=(WIDTH - 20, HEIGHT - 16))
 
+        # Foreground layers
+        hover_surf = get_atlas(font, 'gold').render('PRESS ENTER TO START')
+        self.foreground_rect = self.sword_rect.unionall(
+            [self.title_text_rect, self.title_text_shadow_rect, self.press_enter_rect,
+             self.press_enter_shadow_rect])
+        self.foregrounds = {hover: self.composite((
+            (self.sword_surf, self.sword_rect),
+            (self.title_text_shadow, self.title_text_shadow_rect),
+            (self.title_text_surf, self.title_text_rect),
+            (self.press_enter_shadow, self.press_enter_shadow_rect),
+            (press_enter_surf, self.press_enter_rect)))
+            for hover, press_enter_surf in ((False, self.press_enter_surf), (True, hover_surf))}
+
+    def composite(self, layers: tuple[tuple[pygame.Surface, pygame.Rect], ...]) -> pygame.Surface:
+        """Return a transparent surface the size of the foreground with the given layers drawn on
+        it, back to front, where they go on screen. The surface has premultiplied alpha, which
+        keeps the edges of the layers the same as if they were drawn on screen one by one, and
+        must be blitted with BLEND_PREMULTIPLIED."""
+        surface = pygame.Surface(self.foreground_rect.size, pygame.SRCALPHA).convert_alpha()
+        surface.fill((0, 0, 0, 0))
+        surface.blits([(layer.convert_alpha().premul_alpha(),
+                        rect.move(-self.foreground_rect.x, -self.foreground_rect.y), None,
+                        pygame.BLEND_PREMULTIPLIED) for layer, rect in layers], doreturn=False)
+        return surface
+
 
 class UIManager:
     """The brains of the UI of Forged.
@@ -58,73 +104,173 @@ class UIManager:
         font: The main font of the game.
         title_font: The title screen sized font.
         user_text: The text typed by the user before input.
-        user_input: The text input by the user.
+        user_input: The text input by the user and not handled yet, or None if there is none.
         scroll_position: The current scroll position.
-        lines: The lines of text to be rendered.
+        scroll_offset: The number of pixels the transcript is scrolled down past the line at the
+                       scroll position, for smooth scrolling.
+        lines: The word-wrapped transcript to be rendered.
+        hidden_from: The number of the first line of the transcript that is not fully shown yet,
+                     counting every line ever added, and the number of its characters that are,
+                     or None if the whole transcript is shown.
         bg_offset_x: The x-offset of the background image.
         bg_offset_y: The y-offset of the background image.
+        overlay_font: The small font of the performance overlay.
+        dirty: The areas of the screen that changed since the last frame was presented.
+        tiles: The rendered lines of the transcript around the lines on screen.
+        _drawn_mode: The screen that was drawn last, 'text' or 'menu', or None if the next frame
+                     must be drawn in full.
+        _drawn_lines: The numbers of the first line on screen, counting every line ever added,
+                      and of the line after the last, and the scroll offset.
+        _drawn_hidden: The part of the transcript that was hidden when it was drawn.
+        _drawn_prompt: The user text that is on screen.
+        _drawn_menu: The background offsets and hover state that are on screen.
+        _drawn_overlay: The lines of the performance overlay that are on screen.
     """
     # Attribute types
     screen: pygame.Surface
     font: pygame.font.Font
     title_font: pygame.font.Font
+    overlay_font: pygame.font.Font
     title_elements: TitleElements
     user_text: str
-    user_input: str
+    user_input: str | None
     scroll_position: int
-    lines: list[str]
+    scroll_offset: int
+    lines: TextLayout
+    hidden_from: tuple[int, int] | None
     bg_offset_x: int
     bg_offset_y: int
+    dirty: DirtyRegions
+    tiles: TranscriptTiles
+    _drawn_mode: str | None
+    _drawn_lines: tuple[int, int, int] | None
+    _drawn_hidden: tuple[int, int] | None
+    _drawn_prompt: str | None
+    _drawn_menu: tuple[int, int, bool] | None
+    _drawn_overlay: list[str] | None
 
     def __init__(self) -> None:
         """Initialize the UI manager."""
-        pygame.display.set_icon(pygame.image.load('assets/images/F.png'))
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_icon(assets.image('assets/images/F.png'))
         pygame.display.set_caption('Forged', 'assets/images/fire_sword_scaled.png')
-        self.font = pygame.font.Font('assets/font/Commodore Pixelized v1.2.ttf', 36)
-        self.title_font = pygame.font.Font('assets/font/Commodore Pixelized v1.2.ttf', 72)
+        self.font = assets.font(FONT_PATH, 36)
+        self.title_font = assets.font(FONT_PATH, 72)
+        self.overlay_font = assets.font(FONT_PATH, 16)
         self.title_elements = TitleElements()
         self.user_text = '> '
-        self.user_input = ''
+        self.user_input = None
         self.scroll_position = 0
-        self.lines = []
+        self.scroll_offset = 0
+        self.lines = TextLayout()
+        self.hidden_from = None
         self.bg_offset_x = 0
         self.bg_offset_y = 0
+        self.dirty = DirtyRegions(FULL_REDRAW)
+        self.tiles = TranscriptTiles(WIDTH, LINE_HEIGHT, margin=18)
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Forget what has been drawn, so that the next frame is drawn and presented in full."""
+        self._drawn_mode = None
+        self._drawn_lines = None
+        self._drawn_hidden = None
+        self._drawn_prompt = None
+        self._drawn_menu = None
+        self._drawn_overlay = None
+
+    def text_atlas(self) -> GlyphAtlas:
+        """Return the glyph atlas the transcript and the prompt are drawn with."""
+        return get_atlas(self.font, 'white', 'black')
+
+    def prepare_line(self, number: int) -> None:
+        """Render the line of the transcript with the given number, counting every line ever
+        added, ahead of the frame that shows it."""
+        self.tiles.prepare(self.lines, number, self.text_atlas())
 
-    def render_text(self, display_text: str) -> None:
-        """Render text when playing the game."""
-        pairs = []
-        line_spacing = 18
-        self.lines = wrap(display_text, 44)
+    def render_text(self) -> None:
+        """Render text when playing the game. Only the parts of the screen that changed since the
+        last frame are drawn again."""
+        atlas = self.text_atlas()
+        prompt_top = HEIGHT - 18 - atlas.height
+        if self._drawn_mode != 'text' or self.dirty.full_redraw:
+            self.invalidate()
+            self._drawn_mode = 'text'
+            self.screen.fill('black')
+            self.dirty.mark_all()
 
         # while len(self.lines) > 9:
         #     self.lines.pop(0)
 
-        # Handling scrolling
-        start_idx = self.scroll_position
-        end_idx = self.scroll_position + 9
-        if end_idx > len(self.lines):
-            end_idx = len(self.lines)
+        # Handling scrolling. Lines are numbered from the first line ever added, so that the
+        # lines already rendered keep their place when old lines are spilled or paged back in.
+        start = self.lines.first_line + self.scroll_position
+        # A line partly scrolled off the top lets the top of one more line show at the bottom.
+        end = min(start + VISIBLE_LINES + (self.scroll_offset > 0),
+                  self.lines.first_line + len(self.lines))
 
-        # Getting a text surf and rect for every line
-        for line in self.lines[start_idx:end_idx]:
-            text_surf = self.font.render(line, True, 'white')
-            text_rect = text_surf.get_rect(topleft=(18, line_spacing))
-            pairs.append((text_surf, text_rect))
-            line_spacing += 67
-        self.screen.fill('black')
-
-        # Game text rendering
-        for text_pair in pairs:
-            self.screen.blit(text_pair[0], text_pair[1])
+        # Game text rendering, copied from the rendered lines around the screen
+        visible_lines = (start, end, self.scroll_offset)
+        view_rect = pygame.Rect(0, 18, WIDTH, VISIBLE_LINES * LINE_HEIGHT)
+        top = start * LINE_HEIGHT + self.scroll_offset
+        hidden = self.hidden_from
+        if visible_lines != self._drawn_lines or (
+                hidden != self._drawn_hidden and (hidden is None or self._drawn_hidden is None
+                                                  or hidden[0] != self._drawn_hidden[0])):
+            self._drawn_lines = visible_lines
+            self._drawn_hidden = hidden
+            text_rect = pygame.Rect(0, 0, WIDTH, prompt_top)
+            # The tiles are opaque, so only the margins around them are cleared.
+            self.screen.fill('black', (0, 0, WIDTH, view_rect.top))
+            self.screen.fill('black', (0, view_rect.bottom, WIDTH, prompt_top - view_rect.bottom))
+            self.tiles.draw(self.screen, view_rect, self.lines, top, atlas,
+                            None if hidden is None else hidden[0])
+            if hidden is not None:
+                self.render_partial_line(atlas, view_rect, top)
+            self.dirty.mark(text_rect)
+        elif hidden != self._drawn_hidden:
+            # Only more of the line being revealed is shown.
+            self._drawn_hidden = hidden
+            self.render_partial_line(atlas, view_rect, top)
 
         # User text rendering at the bottom
-        user_text_surf = self.font.render(self.user_text, True, 'white')
-        user_text_rect = user_text_surf.get_rect(bottomleft=(18, HEIGHT - 18))
-        self.screen.blit(user_text_surf, user_text_rect)
+        if self.user_text != self._drawn_prompt:
+            self._drawn_prompt = self.user_text
+            prompt_rect = pygame.Rect(0, prompt_top, WIDTH, HEIGHT - prompt_top)
+            self.screen.fill('black', prompt_rect)
+            atlas.blit(self.screen, self.user_text, (18, prompt_top))
+            self.dirty.mark(prompt_rect)
+
+    def render_partial_line(self, atlas: GlyphAtlas, view_rect: pygame.Rect, top: int) -> None:
+        """Render the shown part of the line being revealed, if it is on screen, given where the
+        transcript is on screen."""
+        number, shown = self.hidden_from
+        line_rect = pygame.Rect(0, view_rect.y + number * LINE_HEIGHT - top, WIDTH, LINE_HEIGHT)
+        line_rect = line_rect.clip(view_rect)
+        if not line_rect or not 0 <= number - self.lines.first_line < len(self.lines):
+            return
+        self.screen.set_clip(line_rect)
+        self.screen.fill('black', line_rect)
+        atlas.blit(self.screen, self.lines[number - self.lines.first_line][:shown],
+                   (18, view_rect.y + number * LINE_HEIGHT - top))
+        self.screen.set_clip(None)
+        self.dirty.mark(line_rect)
+
+    def render_main_menu(self, mouse_pos: tuple[int, int]) -> bool:
+        """Render the main menu for the given mouse position. Returns whether the user is
+        hovering over the start button. Nothing is drawn if the background offset and the hover
+        state did not change."""
 
-    def render_main_menu(self) -> bool:
-        """Render the main menu. Returns whether the user is hovering over the start button."""
+        # Press enter button hover visual and background offset
+        self.bg_offset_x = mouse_pos[0] // 6
+        self.bg_offset_y = mouse_pos[1] // 6
+        hover = bool(self.title_elements.press_enter_rect.collidepoint(mouse_pos))
+        menu_state = (self.bg_offset_x, self.bg_offset_y, hover)
+        if (self._drawn_mode == 'menu' and menu_state == self._drawn_menu
+                and not self.dirty.full_redraw):
+            return hover
+        self._drawn_mode = 'menu'
+        self._drawn_menu = menu_state
 
         # Background rect and offset
         title_bg_rect = pygame.Rect(0, 0, WIDTH, HEIGHT)
@@ -134,37 +280,32 @@ class UIManager:
         # Background render
         self.screen.blit(self.title_elements.title_bg, title_bg_rect)
 
-        # Sword
-        self.screen.blit(self.title_elements.sword_surf, self.title_elements.sword_rect)
-
-        # Game title text
-        self.screen.blit(self.title_elements.title_text_shadow,
-                         self.title_elements.title_text_shadow_rect)
-        self.screen.blit(self.title_elements.title_text_surf, self.title_elements.title_text_rect)
+        # Sword, game title text and press enter button
+        self.screen.blit(self.title_elements.foregrounds[hover],
+                         self.title_elements.foreground_rect,
+                         special_flags=pygame.BLEND_PREMULTIPLIED)
 
-        # Press enter button
-        self.screen.blit(self.title_elements.press_enter_shadow,
-                         self.title_elements.press_enter_shadow_rect)
-        self.screen.blit(self.title_elements.press_enter_surf,
-                         self.title_elements.press_enter_rect)
+        # The background moved, so the whole screen changed
+        self.dirty.mark_all()
+        return hover
 
-        # Press enter button hover visual
-        mouse_pos = pygame.mouse.get_pos()
-        self.bg_offset_x = mouse_pos[0] // 6
-        self.bg_offset_y = mouse_pos[1] // 6
-        if self.title_elements.press_enter_rect.collidepoint(mouse_pos):
-            self.title_elements.press_enter_surf = self.font.render(
-                'PRESS ENTER TO START', True, 'gold')
-            self.title_elements.press_enter_shadow = self.font.render(
-                'PRESS ENTER TO START', True, 'black')
-            return True
-        else:
-            self.title_elements.press_enter_surf = self.font.render(
-                'PRESS ENTER TO START', True, 'ivory')
-            self.title_elements.press_enter_shadow = self.font.render(
-                'PRESS ENTER TO START', True, 'black')
-            return False
+    def render_overlay(self, lines: list[str]) -> None:
+        """Render the given lines in a box at the top right of the screen, over the rest. The box
+        is only drawn again if the lines changed or something was drawn under it."""
+        atlas = get_atlas(self.overlay_font, 'yellow', 'black')
+        width = max(atlas.size(line)[0] for line in lines)
+        overlay_rect = pygame.Rect(0, 0, width + 16, len(lines) * atlas.height + 16)
+        overlay_rect.topright = (WIDTH - 8, 8)
+        if (lines == self._drawn_overlay and not self.dirty.everything
+                and overlay_rect.collidelist(self.dirty.rects) == -1):
+            return
+        self._drawn_overlay = lines
+        self.screen.fill('black', overlay_rect)
+        for index, line in enumerate(lines):
+            atlas.blit(self.screen, line, (overlay_rect.x + 8, overlay_rect.y + 8
+                                           + index * atlas.height))
+        self.dirty.mark(overlay_rect)
 
     def update(self) -> None:
-        """Update the display surface."""
-        pygame.display.update()
+        """Present the parts of the display surface that changed, if any."""
+        self.dirty.present()
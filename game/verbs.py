@@ -0,0 +1,162 @@
+"""The verbs module holds the handlers of the commands built into the game."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from game.commands import command
+from game.dice import rng
+
+if TYPE_CHECKING:
+    from game.engine import Engine
+
+
+# Commands without a subject.
+
+@command('LOOK')
+def look(game: Engine, subject: None) -> None:
+    """Describe the current room."""
+    game.add_text(game.current_room.desc)
+
+
+@command('INVENTORY', 'I')
+def inventory(game: Engine, subject: None) -> None:
+    """List the items the player is carrying."""
+    game.add_text(str(game.player))
+    game.play_sound('open_inventory')
+
+
+@command('WAIT')
+def wait(game: Engine, subject: None) -> None:
+    """Let time pass."""
+    game.add_text(rng.choice(('YOU LOITER.',
+                              'YOU WAIT FOR THE GAME TO BEAT ITSELF.',
+                              '*WHISTLING*',
+                              "MAYBE IF YOU WAIT LONG ENOUGH, YOU'LL WIN. MAYBE.")))
+
+
+@command('SIT')
+def sit(game: Engine, subject: None) -> None:
+    """Sit the player down."""
+    if not game.player.sitting:
+        game.add_text('YOU SIT DOWN.')
+        game.player.sitting = True
+    else:
+        game.add_text('YOU ARE ALREADY SITTING. ARE YOU TRYING TO PHASE THROUGH THE GROUND?')
+
+
+@command('STAND')
+def stand(game: Engine, subject: None) -> None:
+    """Stand the player up."""
+    if game.player.sitting:
+        game.add_text('YOU STAND UP.')
+        game.player.sitting = False
+    elif game.player.health >= 50:
+        game.add_text('YOU HAVE EXCELLENT POSTURE.')
+    else:
+        game.add_text('YOU FIGHT THE URGE TO HUNCH OVER IN PAIN.')
+
+
+@command('SLEEP')
+def sleep(game: Engine, subject: None) -> None:
+    """Refuse to sleep."""
+    game.add_text('NOW IS NOT THE TIME FOR A NAP.')
+
+
+@command('SAVE')
+def save(game: Engine, subject: None) -> None:
+    """Save the game, in the background, unless it cannot be saved as it is."""
+    if game.saves is None:
+        game.add_text('THIS GAME CANNOT BE SAVED.')
+        return
+    try:
+        game.saves.save(game)
+    except ValueError:
+        game.add_text('THE GAME COULD NOT BE SAVED.')
+        return
+    game.add_text('GAME SAVED.')
+
+
+@command('RESTORE')
+def restore(game: Engine, subject: None) -> None:
+    """Put the saved game in place of this one, unless it cannot be restored."""
+    if game.saves is None or not game.saves.exists():
+        game.add_text('THERE IS NO SAVED GAME.')
+        return
+    try:
+        game.saves.restore(game)
+    except (OSError, ValueError):
+        game.add_text('THE SAVED GAME COULD NOT BE RESTORED.')
+        return
+    game.add_text('GAME RESTORED.')
+    game.add_text(game.current_room.desc)
+
+
+# Commands with a subject.
+
+@command('EXAMINE', subject=True)
+def examine(game: Engine, subject: str) -> None:
+    """Describe the item or NPC with the given name."""
+    thing = (game.current_room.item_index.get(subject)
+             or game.player.inventory_index.get(subject)
+             or game.npc_index.get(subject))
+    if thing is not None:
+        game.add_text(thing.desc)
+    else:
+        game.add_text('YOU SEE NO SUCH THING.')
+
+
+@command('TAKE', subject=True)
+def take(game: Engine, subject: str) -> None:
+    """Move the item with the given name from the current room to the player's inventory."""
+    item = game.current_room.item_index.get(subject)
+    if item is not None:
+        game.current_room.remove_item(item)
+        game.player.add_item(item)
+        game.add_text(f'YOU TAKE THE {item.name}.')
+    elif any(subject in npc.inventory_index for npc in game.active_npcs):
+        game.add_text('NO GRABSIES.')
+    else:
+        game.add_text("YOU CAN'T SEE ANY SUCH THING.")
+
+
+@command('EQUIP', subject=True)
+def equip(game: Engine, subject: str) -> None:
+    """Make the player hold the item with the given name from their inventory."""
+    item = game.player.inventory_index.get(subject)
+    if item is not None:
+        game.player.hold(item)
+        game.add_text(f'YOU ARE NOW HOLDING THE {item.name}.')
+    else:
+        game.add_text("YOU DON'T HAVE ANY SUCH THING IN YOUR INVENTORY, SO YOU CAN'T EQUIP IT.")
+
+
+@command('ATTACK', subject=True)
+def attack(game: Engine, subject: str) -> None:
+    """Make the player attack the NPC with the given name, which starts combat."""
+    npc = game.npc_index.get(subject)
+    if npc is not None:
+        if not npc.hostile:
+            game.add_text(f'{npc.name} IS NOW HOSTILE.')
+            npc.hostile = True
+        game.add_text(game.player.attack(npc))
+        game.combat = True
+    else:
+        game.add_text('YOU SEE NO SUCH TARGET.')
+
+
+@command('DROP', subject=True)
+def drop(game: Engine, subject: str) -> None:
+    """Move the item with the given name, or every item, from the player's inventory to the
+    current room."""
+    if subject == 'ALL':
+        for item in list(game.player.inventory):
+            game.player.remove_item(item)
+            game.add_text(f'YOU DROP THE {item.name}.')
+        return
+    item = game.player.inventory_index.get(subject)
+    if item is not None:
+        game.player.remove_item(item)
+        game.add_text(f'YOU DROP THE {item.name}.')
+    else:
+        game.add_text("YOU AREN'T CARRYING ANY SUCH THING, SO YOU CAN'T DROP IT.")
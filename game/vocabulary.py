@@ -0,0 +1,86 @@
+"""The vocabulary module indexes the nouns the parser recognizes, which may be several words long."""
+
+# The key of a trie node that holds the number of times the noun ending at that node was added.
+# Words are never empty, so it cannot clash with a word.
+_COUNT = ''
+
+
+class Vocabulary:
+    """A set of nouns, kept in a trie of their words, that finds the longest noun at a position
+    in a list of words in a single pass. Every noun is counted, so that a noun added by several
+    things, like two items with the same name, stays in the vocabulary until they are all removed.
+
+    Attributes:
+        _root: The root node of the trie. Each node maps the next word of a noun to the node for
+               that word, and _COUNT to the number of times the noun ending at the node was added.
+        _size: The number of distinct nouns in the vocabulary.
+    """
+    # Attribute types
+    _root: dict
+    _size: int
+
+    def __init__(self, nouns=None) -> None:
+        """Initialize a vocabulary with the given nouns."""
+        self._root = {}
+        self._size = 0
+        for noun in nouns if nouns else ():
+            self.add(noun)
+
+    def add(self, noun: str) -> None:
+        """Add the given noun to this vocabulary, or count it once more if it is already in it."""
+        node = self._root
+        for word in noun.split():
+            node = node.setdefault(word, {})
+        if _COUNT not in node:
+            self._size += 1
+        node[_COUNT] = node.get(_COUNT, 0) + 1
+
+    def remove(self, noun: str) -> None:
+        """Count the given noun once less, removing it from this vocabulary once it is no longer
+        counted.
+
+        Preconditions:
+            noun in self
+        """
+        path = [self._root]
+        for word in noun.split():
+            path.append(path[-1][word])
+        node = path[-1]
+        node[_COUNT] -= 1
+        if node[_COUNT]:
+            return
+        del node[_COUNT]
+        self._size -= 1
+        # Prune the nodes that no longer lead to any noun.
+        for word, parent in zip(reversed(noun.split()), reversed(path[:-1])):
+            if parent[word]:
+                break
+            del parent[word]
+
+    def match(self, words: list[str], start: int) -> tuple[str, int] | None:
+        """Return the longest noun made of the words beginning at the given index, with the index
+        of the word after it, or None if no noun begins there."""
+        node = self._root
+        longest = None
+        for index in range(start, len(words)):
+            node = node.get(words[index])
+            if node is None:
+                break
+            if _COUNT in node:
+                longest = index + 1
+        if longest is None:
+            return None
+        return ' '.join(words[start:longest]), longest
+
+    def __contains__(self, noun: str) -> bool:
+        """Return whether the given noun is in this vocabulary."""
+        node = self._root
+        for word in noun.split():
+            node = node.get(word)
+            if node is None:
+                return False
+        return _COUNT in node
+
+    def __len__(self) -> int:
+        """Return the number of distinct nouns in this vocabulary."""
+        return self._size
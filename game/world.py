@@ -0,0 +1,620 @@
+"""The world module compiles the world of the game from its authored source into a compact binary
+file, and loads the rooms, items and NPCs from that file a region at a time, as the player comes
+near them.
+
+Usage: python -m game.world [SOURCE] [COMPILED]
+
+The source is a JSON file of regions, each with its rooms by key:
+
+    {"start": "tomb", "death": "hell",
+     "player": {"items": [{"kind": "weapon", "name": "DAGGER", "desc": "...", "damage": 3}]},
+     "regions": {"crypt": {"rooms": {"tomb": {"desc": "...", "exits": {"NORTH": "hall"},
+                                              "items": [], "assets": []}}}},
+     "npcs": {"deck": {"name": "DECK", "desc": "...", "room": "tomb", "items": [],
+                       "holding": "DAGGER"}}}
+
+The compiled file starts with a header of counts and section offsets, followed by the sections:
+a table of the distinct strings, fixed size records of the rooms, regions, items and NPCs, a pool
+of the variable length lists the records point into, and the room numbers sorted by key. The rooms
+of a region are numbered consecutively, so that a region is loaded by reading a run of records.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from collections.abc import Iterator, Mapping
+from copy import copy
+from typing import BinaryIO
+
+from game.character import NPC
+from game.item import Item, Weapon, Armor, Magic
+from game.room import Room
+from game.settings import WORLD_SOURCE, WORLD_PATH, WORLD_RADIUS
+
+# The first bytes of a compiled world file, and the version of its format.
+MAGIC = b'FWLD'
+VERSION = 2
+
+# The kinds of items by the name they have in the source, with the field of the source that holds
+# the value of their third argument, if they have one. A kind is numbered by its position here.
+_KINDS = {'item': (Item, None),
+          'weapon': (Weapon, 'damage'),
+          'armor': (Armor, 'rating'),
+          'magic': (Magic, 'damage')}
+
+# The header: the magic bytes and the version, the number of strings, rooms, regions, items and
+# NPCs, the numbers of the start and death rooms, the list of the items of the player, the
+# offsets of the sections, and the CRC of the sections.
+_HEADER = struct.Struct('<4sHH18I')
+# A room: its key, description and region, and its lists of exits, items and assets.
+_ROOM = struct.Struct('<9I')
+# A region: its name, its first room and number of rooms, and its lists of neighbouring regions
+# and NPCs.
+_REGION = struct.Struct('<7I')
+# An item: its kind, name, description and value.
+_ITEM = struct.Struct('<3Ii')
+# An NPC: its name, description and room, its list of items, and the position in that list of the
+# item it holds, or -1.
+_NPC = struct.Struct('<5Ii')
+# A pair of 32 bit numbers.
+_PAIR = struct.Struct('<2I')
+
+# The state of an NPC that can change while the game is played: its health, armor class, whether
+# it is hostile, its inventory, and the item it holds or None.
+NPCState = tuple[int, int, bool, list[Item], Item | None]
+
+
+class _Compiler:
+    """The sections of a compiled world as they are built from its source.
+
+    Attributes:
+        strings: The number of each distinct string.
+        pool: The lists the records point into, one after the other.
+        items: The records of the items.
+    """
+    # Attribute types
+    strings: dict[str, int]
+    pool: list[int]
+    items: list[tuple[int, int, int, int]]
+
+    def __init__(self) -> None:
+        """Initialize a compiler with empty sections."""
+        self.strings = {}
+        self.pool = []
+        self.items = []
+
+    def string(self, text: str) -> int:
+        """Return the number of the given string, adding it to the string table if it is new."""
+        return self.strings.setdefault(text, len(self.strings))
+
+    def list(self, values: list[int]) -> tuple[int, int]:
+        """Add the given list to the pool and return its position and length."""
+        self.pool.extend(values)
+        return len(self.pool) - len(values), len(values)
+
+    def item(self, source: dict) -> int:
+        """Add the item of the given source and return its number.
+
+        Raises:
+            ValueError: If the item is of an unknown kind or is missing its value.
+        """
+        kind = source.get('kind', 'item')
+        if kind not in _KINDS:
+            raise ValueError(f'unknown kind of item {kind!r}')
+        field = _KINDS[kind][1]
+        if field is not None and field not in source:
+            raise ValueError(f'{source["name"]!r} has no {field}')
+        self.items.append((list(_KINDS).index(kind), self.string(source['name']),
+                           self.string(source.get('desc', '')),
+                           source[field] if field is not None else 0))
+        return len(self.items) - 1
+
+    def compile(self, source: dict) -> bytes:
+        """Return the compiled world of the given source.
+
+        Raises:
+            ValueError: If a room is defined twice, or an unknown room or item is referred to.
+        """
+        regions = list(source['regions'].items())
+        keys = []
+        region_of = []
+        for region_number, (_, region) in enumerate(regions):
+            keys.extend(region['rooms'])
+            region_of.extend([region_number] * len(region['rooms']))
+        numbers = {}
+        for number, key in enumerate(keys):
+            if key in numbers:
+                raise ValueError(f'room {key!r} is defined twice')
+            numbers[key] = number
+
+        def room_number(key: str, where: str) -> int:
+            """Return the number of the room with the given key."""
+            if key not in numbers:
+                raise ValueError(f'unknown room {key!r} {where}')
+            return numbers[key]
+
+        rooms = []
+        neighbours = [set() for _ in regions]
+        for _, region in regions:
+            for key, room in region['rooms'].items():
+                exits = []
+                for direction, target in room.get('exits', {}).items():
+                    target = room_number(target, f'in the exits of {key!r}')
+                    exits += (self.string(direction), target)
+                    # Regions are neighbours whichever way their exits go.
+                    if region_of[target] != region_of[numbers[key]]:
+                        neighbours[region_of[target]].add(region_of[numbers[key]])
+                        neighbours[region_of[numbers[key]]].add(region_of[target])
+                items = [self.item(item) for item in room.get('items', ())]
+                assets = [self.string(path) for path in room.get('assets', ())]
+                rooms.append((self.string(key), self.string(room.get('desc', '')),
+                              region_of[numbers[key]], *self.list(exits), *self.list(items),
+                              *self.list(assets)))
+
+        npcs = []
+        region_npcs = [[] for _ in regions]
+        for key, npc in source.get('npcs', {}).items():
+            room = room_number(npc['room'], f'as the room of {key!r}')
+            items = [self.item(item) for item in npc.get('items', ())]
+            names = [item['name'] for item in npc.get('items', ())]
+            holding = npc.get('holding')
+            if holding is not None and holding not in names:
+                raise ValueError(f'{key!r} holds {holding!r}, which it does not have')
+            region_npcs[region_of[room]].append(len(npcs))
+            npcs.append((self.string(npc['name']), self.string(npc.get('desc', '')), room,
+                         *self.list(items), names.index(holding) if holding is not None else -1))
+
+        region_records = []
+        first = 0
+        for number, (name, region) in enumerate(regions):
+            region_records.append((self.string(name), first, len(region['rooms']),
+                                   *self.list(sorted(neighbours[number])),
+                                   *self.list(region_npcs[number])))
+            first += len(region['rooms'])
+
+        player = self.list([self.item(item)
+                            for item in source.get('player', {}).get('items', ())])
+        start = room_number(source['start'], 'to start in')
+        death = room_number(source.get('death', source['start']), 'to go to when dying')
+
+        encoded = [text.encode('utf-8') for text in self.strings]
+        offsets = [0]
+        for text in encoded:
+            offsets.append(offsets[-1] + len(text))
+        text = b''.join(encoded)
+        sections = [struct.pack(f'<{len(offsets)}I', *offsets),
+                    text + bytes(-len(text) % 4),
+                    b''.join(_ROOM.pack(*record) for record in rooms),
+                    b''.join(_REGION.pack(*record) for record in region_records),
+                    b''.join(_ITEM.pack(*record) for record in self.items),
+                    b''.join(_NPC.pack(*record) for record in npcs),
+                    struct.pack(f'<{len(self.pool)}I', *self.pool),
+                    struct.pack(f'<{len(keys)}I', *sorted(range(len(keys)),
+                                                          key=keys.__getitem__))]
+        positions = []
+        position = _HEADER.size
+        for section in sections:
+            positions.append(position)
+            position += len(section)
+        body = b''.join(sections)
+        header = _HEADER.pack(MAGIC, VERSION, 0, len(self.strings), len(rooms),
+                              len(region_records), len(self.items), len(npcs), start, death,
+                              *player, *positions, zlib.crc32(body))
+        return header + body
+
+
+def compile_world(source_path: str, path: str) -> None:
+    """Compile the world source at the given path into a world file at the other given path.
+
+    Raises:
+        ValueError: If the source refers to a room or an item it does not define.
+    """
+    with open(source_path, encoding='utf-8') as file:
+        data = _Compiler().compile(json.load(file))
+    # Replace the file at once, so that a game starting meanwhile never reads half of it.
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(data)
+    os.replace(temporary, path)
+
+
+class _Exits(Mapping[str, Room]):
+    """The exits of a loaded room, which load the rooms they lead to when they are looked up, so
+    that a room never holds on to the rooms of another region. A room has few exits, so they are
+    kept in a flat tuple, which is searched, rather than a dictionary.
+
+    Attributes:
+        _world: The world the rooms are loaded from.
+        _exits: The direction of each exit followed by the number of the room it leads to.
+    """
+    __slots__ = ('_world', '_exits')
+    # Attribute types
+    _world: 'World'
+    _exits: tuple[str | int, ...]
+
+    def __init__(self, world: 'World', exits: tuple[str | int, ...]) -> None:
+        """Initialize the exits in the given directions, each followed by the number of the
+        room it leads to."""
+        self._world = world
+        self._exits = exits
+
+    def __getitem__(self, direction: str) -> Room:
+        """Return the room the exit in the given direction leads to."""
+        exits = self._exits
+        for index in range(0, len(exits), 2):
+            if exits[index] == direction:
+                return self._world.room(exits[index + 1])
+        raise KeyError(direction)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the directions of the exits."""
+        return iter(self._exits[::2])
+
+    def __len__(self) -> int:
+        """Return the number of exits."""
+        return len(self._exits) // 2
+
+
+class World:
+    """A compiled world, read through a memory map, of which only the regions near the player are
+    loaded as rooms, items and NPCs. Opening a world only reads its header, so that it takes the
+    same time and memory however many rooms it has. A region is loaded when a room of it is first
+    needed, and released when the player goes further than a number of regions away from it.
+
+    The rooms and NPCs of a released region are loaded anew from the file when they are needed
+    again, but what changed in them is not: the items of a room that changed while it was loaded
+    are kept, and put back in the room when it is loaded again, and so is the state of an NPC
+    that changed. NPCs stay in the rooms they have in the world file.
+
+    Attributes:
+        path: The path of the world file.
+        fingerprint: The CRC of the header of the world file, which holds the CRC of the rest of
+                     it, so that worlds that differ in anything have different fingerprints.
+        radius: The number of regions away from the region of the player that stay loaded.
+        size: The number of rooms in the world.
+        start: The number of the room the player starts in.
+        death: The number of the room the player goes to when they die.
+        rooms: The rooms that are loaded, by number.
+        npcs: The NPCs in the loaded regions, by number.
+        _file: The world file.
+        _data: The memory map of the world file.
+        _counts: The number of strings, rooms, regions, items and NPCs.
+        _player: The position and length of the list of the items of the player.
+        _sections: The offsets of the sections of the file.
+        _shared: Whether the file is shared from another world, which closes it.
+        _numbers: The number of each loaded room.
+        _original: The numbers of the items each loaded room has in the world file, by room
+                   number.
+        _regions: The rooms of each loaded region, by number.
+        _moved: The items of the rooms that changed, by room number, while their region is
+                released.
+        _states: The state each loaded NPC has in the world file, with its items by number, by
+                 NPC number.
+        _kept: The state of the NPCs that changed, by NPC number, while their region is
+               released.
+        _arrived: The NPCs loaded since the player last entered a room.
+        _departed: The NPCs released since the player last entered a room.
+    """
+    # Attribute types
+    path: str
+    fingerprint: int
+    radius: int
+    size: int
+    start: int
+    death: int
+    rooms: dict[int, Room]
+    npcs: dict[int, NPC]
+    _file: BinaryIO
+    _data: mmap.mmap
+    _counts: tuple[int, ...]
+    _player: tuple[int, int]
+    _sections: tuple[int, ...]
+    _shared: bool
+    _numbers: dict[Room, int]
+    _original: dict[int, list[int]]
+    _regions: dict[int, list[Room]]
+    _moved: dict[int, list[Item]]
+    _states: dict[int, tuple]
+    _kept: dict[int, NPCState]
+    _arrived: list[NPC]
+    _departed: list[NPC]
+
+    def __init__(self, path: str, radius: int = 1) -> None:
+        """Open the world file at the given path, with nothing loaded.
+
+        Raises:
+            ValueError: If the file is not a world file of this version.
+        """
+        self.path = path
+        self.radius = radius
+        self._shared = False
+        self._file = open(path, 'rb')
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f'{path} is not a world file')
+        fields = _HEADER.unpack_from(self._data)
+        if fields[1] != VERSION:
+            self.close()
+            raise ValueError(f'{path} is a world file of version {fields[1]}, not {VERSION}')
+        # The header holds the CRC of the rest of the file, so its own CRC covers the whole file
+        # without reading more than the header.
+        self.fingerprint = zlib.crc32(self._data[:_HEADER.size])
+        self._counts = fields[3:8]
+        self.size = self._counts[1]
+        self.start, self.death = fields[8:10]
+        self._player = fields[10:12]
+        self._sections = fields[12:20]
+        self._empty()
+
+    def _empty(self) -> None:
+        """Forget every loaded and changed room, item and NPC."""
+        self.rooms = {}
+        self.npcs = {}
+        self._numbers = {}
+        self._original = {}
+        self._regions = {}
+        self._moved = {}
+        self._states = {}
+        self._kept = {}
+        self._arrived = []
+        self._departed = []
+
+    def share(self) -> 'World':
+        """Return a new world with nothing loaded, read through the memory map of this one, so
+        that many games can be played in their own copy of the world without opening its file
+        for each. The file stays open until this world is closed."""
+        world = copy(self)
+        world._shared = True
+        world._empty()
+        return world
+
+    def _string(self, number: int) -> str:
+        """Return the string with the given number."""
+        start, end = _PAIR.unpack_from(self._data, self._sections[0] + 4 * number)
+        return str(self._data[self._sections[1] + start:self._sections[1] + end], 'utf-8')
+
+    def _list(self, position: int, length: int) -> tuple[int, ...]:
+        """Return the list of the pool at the given position with the given length."""
+        return struct.unpack_from(f'<{length}I', self._data, self._sections[6] + 4 * position)
+
+    def item(self, number: int) -> Item:
+        """Return a new item of the record with the given number in the world file.
+
+        Raises:
+            ValueError: If there is no item with that number.
+        """
+        if not 0 <= number < self._counts[3]:
+            raise ValueError(f'there is no item {number} in {self.path}')
+        kind, name, desc, value = _ITEM.unpack_from(self._data,
+                                                    self._sections[4] + _ITEM.size * number)
+        item_type, field = list(_KINDS.values())[kind]
+        if field is None:
+            item = item_type(self._string(name), self._string(desc))
+        else:
+            item = item_type(self._string(name), self._string(desc), value)
+        item.key = number
+        return item
+
+    def room(self, number: int) -> Room:
+        """Return the room with the given number, loading its region if it is not loaded."""
+        room = self.rooms.get(number)
+        if room is None:
+            self._load(_ROOM.unpack_from(self._data, self._sections[2] + _ROOM.size * number)[2])
+            room = self.rooms[number]
+        return room
+
+    def find(self, key: str) -> Room:
+        """Return the room with the given key, loading its region if it is not loaded.
+
+        Raises:
+            KeyError: If there is no room with that key.
+        """
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            number, = struct.unpack_from('<I', self._data, self._sections[7] + 4 * middle)
+            found = self._string(_ROOM.unpack_from(self._data,
+                                                   self._sections[2] + _ROOM.size * number)[0])
+            if found == key:
+                return self.room(number)
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+        raise KeyError(key)
+
+    def number(self, room: Room) -> int | None:
+        """Return the number of the given room, or None if it is not a loaded room of this
+        world."""
+        return self._numbers.get(room)
+
+    def player_items(self) -> list[Item]:
+        """Return new items of the items the player starts with."""
+        return [self.item(number) for number in self._list(*self._player)]
+
+    def enter(self, room: Room) -> tuple[list[NPC], list[NPC]]:
+        """Load the regions near the region of the given room, release the regions further away,
+        and return the NPCs loaded and the NPCs released since the last room was entered. Rooms
+        not loaded from this world change nothing."""
+        number = self._numbers.get(room)
+        if number is not None:
+            near = self._near(_ROOM.unpack_from(self._data,
+                                                self._sections[2] + _ROOM.size * number)[2])
+            for region in near:
+                if region not in self._regions:
+                    self._load(region)
+            for region in [region for region in self._regions if region not in near]:
+                self._release(region)
+        arrived, self._arrived = self._arrived, []
+        departed, self._departed = self._departed, []
+        # Rooms looked up on the way can load a region that is released again before this.
+        both = {id(npc) for npc in arrived}.intersection(id(npc) for npc in departed)
+        return ([npc for npc in arrived if id(npc) not in both],
+                [npc for npc in departed if id(npc) not in both])
+
+    def _region(self, number: int) -> tuple[int, ...]:
+        """Return the record of the region with the given number."""
+        return _REGION.unpack_from(self._data, self._sections[3] + _REGION.size * number)
+
+    def _near(self, region: int) -> set[int]:
+        """Return the regions at most the radius away from the region with the given number."""
+        near = {region}
+        edge = [region]
+        for _ in range(self.radius):
+            edge = [neighbour for number in edge
+                    for neighbour in self._list(*self._region(number)[3:5])
+                    if neighbour not in near]
+            near.update(edge)
+        return near
+
+    def _load(self, region: int) -> None:
+        """Load the rooms of the region with the given number, and the NPCs in them."""
+        _, first, count, _, _, npcs_at, npcs_count = self._region(region)
+        rooms = []
+        for number in range(first, first + count):
+            key, desc, _, *lists = _ROOM.unpack_from(self._data,
+                                                     self._sections[2] + _ROOM.size * number)
+            exits = self._list(*lists[0:2])
+            self._original[number] = list(self._list(*lists[2:4]))
+            items = self._moved.pop(number, None)
+            if items is None:
+                items = [self.item(item) for item in self._original[number]]
+            room = Room(self._string(key), self._string(desc), items,
+                        _Exits(self, tuple(sys.intern(self._string(value)) if index % 2 == 0
+                                           else value for index, value in enumerate(exits))),
+                        [self._string(path) for path in self._list(*lists[4:6])])
+            self.rooms[number] = room
+            self._numbers[room] = number
+            rooms.append(room)
+        self._regions[region] = rooms
+
+        for number in self._list(npcs_at, npcs_count):
+            npc = self._npc(number)
+            self._states[number] = _state(npc)
+            state = self._kept.pop(number, None)
+            if state is not None:
+                health, ac, npc.hostile, inventory, holding = state
+                npc.restore(health, ac, inventory, holding)
+            self.npcs[number] = npc
+            self._arrived.append(npc)
+
+    def _npc(self, number: int) -> NPC:
+        """Return a new NPC of the record with the given number, in its room, which must be
+        loaded."""
+        name, desc, room, items_at, items_count, holding = _NPC.unpack_from(
+            self._data, self._sections[5] + _NPC.size * number)
+        npc = NPC(self.rooms[room], self._string(name), self._string(desc))
+        for item in self._list(items_at, items_count):
+            npc.add_item(self.item(item))
+        if holding >= 0:
+            npc.holding = npc.inventory[holding]
+        return npc
+
+    def _npc_room(self, number: int) -> int:
+        """Return the number of the room of the NPC with the given number."""
+        return _NPC.unpack_from(self._data, self._sections[5] + _NPC.size * number)[2]
+
+    def _changed(self, number: int, room: Room) -> bool:
+        """Return whether the items of the given room, which has the given number, are not the
+        items it has in the world file."""
+        return [item.key for item in room.items] != self._original[number]
+
+    def _release(self, region: int) -> None:
+        """Release the rooms of the region with the given number and the NPCs in them, keeping
+        the items of the rooms and the state of the NPCs that changed."""
+        for room in self._regions.pop(region):
+            number = self._numbers.pop(room)
+            del self.rooms[number]
+            if self._changed(number, room):
+                self._moved[number] = room.items
+            del self._original[number]
+        _, _, _, _, _, npcs_at, npcs_count = self._region(region)
+        for number in self._list(npcs_at, npcs_count):
+            npc = self.npcs.pop(number)
+            if _state(npc) != self._states.pop(number):
+                self._kept[number] = (npc.health, npc.ac, npc.hostile, npc.inventory,
+                                      npc.holding)
+            self._departed.append(npc)
+
+    def changed_rooms(self) -> dict[int, list[Item]]:
+        """Return the items of the rooms whose items are not the items they have in the world
+        file, by room number."""
+        changed = dict(self._moved)
+        for number, room in self.rooms.items():
+            if self._changed(number, room):
+                changed[number] = room.items
+        return changed
+
+    def changed_npcs(self) -> dict[int, tuple[int, NPCState]]:
+        """Return the number of the room and the state of each NPC whose state is not the state
+        it has in the world file, by NPC number."""
+        changed = {number: (self._npc_room(number), state) for number, state in self._kept.items()}
+        for number, npc in self.npcs.items():
+            if _state(npc) != self._states[number]:
+                changed[number] = (self._npc_room(number), (npc.health, npc.ac, npc.hostile,
+                                                            npc.inventory, npc.holding))
+        return changed
+
+    def restore(self, rooms: dict[int, list[Item]], npcs: dict[int, NPCState]) -> None:
+        """Release every region without keeping what changed in them, and start over with the
+        given items of the rooms and states of the NPCs that changed, by number. The NPCs are
+        given their states when their regions are loaded. Nothing changes if a number is not one
+        of this world.
+
+        Raises:
+            ValueError: If there is no room or NPC with one of the given numbers.
+        """
+        if (any(not 0 <= number < self.size for number in rooms)
+                or any(not 0 <= number < self._counts[4] for number in npcs)):
+            raise ValueError(f'there are no such rooms or NPCs in {self.path}')
+        self._empty()
+        self._moved = dict(rooms)
+        self._kept = dict(npcs)
+
+    def close(self) -> None:
+        """Close the world file, unless this world shares it with the world it was shared from.
+        Rooms that are not loaded cannot be loaded after this."""
+        if not self._shared:
+            self._data.close()
+            self._file.close()
+
+
+def _state(npc: NPC) -> tuple:
+    """Return the state of the given NPC with its items by number, to compare with the state it
+    had before."""
+    return (npc.health, npc.ac, npc.hostile, [item.key for item in npc.inventory],
+            None if npc.holding is None else npc.holding.key)
+
+
+def load_world(source_path: str = WORLD_SOURCE, path: str = WORLD_PATH,
+               radius: int = WORLD_RADIUS) -> World:
+    """Open the world file at the given path, compiling it from the world source first if there
+    is a source and the file is missing, older than it, or of another version of the format.
+
+    Raises:
+        ValueError: If the world file is not one of this version, and there is no source.
+    """
+    if os.path.exists(source_path) and (not os.path.exists(path)
+                                        or os.path.getmtime(path) < os.path.getmtime(source_path)):
+        compile_world(source_path, path)
+    try:
+        return World(path, radius)
+    except ValueError:
+        if not os.path.exists(source_path):
+            raise
+    compile_world(source_path, path)
+    return World(path, radius)
+
+
+if __name__ == '__main__':
+    source_path = sys.argv[1] if len(sys.argv) > 1 else WORLD_SOURCE
+    path = sys.argv[2] if len(sys.argv) > 2 else WORLD_PATH
+    compile_world(source_path, path)
+    with open(path, 'rb') as file:
+        counts = _HEADER.unpack_from(file.read(_HEADER.size))[3:8]
+    print(f'{path}: {counts[1]} rooms in {counts[2]} regions, {counts[3]} items, {counts[4]} '
+          f'NPCs, {counts[0]} strings, {os.path.getsize(path)} bytes')
@@ -1,10 +1,55 @@
 """The main module is the entry point for the game."""
 
-from game.game import Game
+import sys
+from argparse import ArgumentParser
+from time import perf_counter
 
 
 if __name__ == '__main__':
-    # Initialize the game and the title screen and run the game.
-    game = Game()
-    game.ui.title_elements.initialize(game.ui.font, game.ui.title_font)
-    game.run()
+    arguments = ArgumentParser(description='Forged, a text adventure.')
+    arguments.add_argument('--headless', action='store_true',
+                           help='play without a window: read commands from standard input, one '
+                                'per line, and write the text of the game to standard output')
+    arguments.add_argument('--seed', type=int,
+                           help='seed the dice, so that the rolls are the same every time')
+    arguments.add_argument('--record', metavar='LOG',
+                           help='record the input of the session to the given log, gzipped if '
+                                'its name ends in .gz')
+    arguments.add_argument('--replay', metavar='LOG',
+                           help='play the session recorded in the given log back, as fast as '
+                                'possible, then quit')
+    arguments.add_argument('--realtime', action='store_true',
+                           help='play the session back at the pace it was recorded')
+    options = arguments.parse_args()
+    if options.record and options.replay:
+        arguments.error('--record and --replay cannot be used together')
+    if options.headless and (options.record or options.replay):
+        arguments.error('--record and --replay need the window')
+
+    if options.headless:
+        from game import dice
+        from game.engine import Engine
+        if options.seed is not None:
+            dice.seed(options.seed)
+        for line in Engine().run_commands(line.rstrip('\n').upper() for line in sys.stdin):
+            print(line)
+    else:
+        from game import dice
+        from game.game import Game
+        from game.replay import SessionRecorder, SessionReplayer
+        # Initialize the game and the title screen and run the game.
+        game = Game(recorded=bool(options.record or options.replay))
+        game.ui.title_elements.initialize(game.ui.font, game.ui.title_font)
+        if options.replay:
+            game.input_source = SessionReplayer(game.scheduler, options.replay, options.realtime)
+        elif options.record:
+            game.input_source = SessionRecorder(game.scheduler, options.record, options.seed)
+        elif options.seed is not None:
+            dice.seed(options.seed)
+        start = perf_counter()
+        try:
+            game.run()
+        finally:
+            if options.replay:
+                print(f'Replayed {game.input_source.frames} frames in '
+                      f'{perf_counter() - start:.3f} s', file=sys.stderr)
@@ -0,0 +1,115 @@
+"""Test that the combat simulator plays fights out like the code of the game does."""
+
+from math import sqrt
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from game import dice  # noqa: E402
+from game.character import NPC  # noqa: E402
+from game.item import Magic, Weapon  # noqa: E402
+from game.player import Player  # noqa: E402
+from game.room import Room  # noqa: E402
+from game.simulate import Combatant, simulate  # noqa: E402
+
+# The number of fights the game plays out, one attack at a time. The simulator plays out ten
+# times as many.
+FIGHTS = 5_000
+# The number of standard errors a statistic of the simulator may be off from the game.
+ERRORS = 4.0
+# The most rounds a fight lasts before it is a draw.
+ROUNDS = 200
+# The matchups: the damage of the player's weapon and the player's armor class, then the kind and
+# damage of the NPC's item and the NPC's health and armor class.
+MATCHUPS = (
+    (3, 10, 'weapon', 5, 100, 10),
+    (20, 12, 'magic', 15, 100, 8),
+    (8, 20, 'weapon', 8, 60, 15),
+    (10, 5, 'magic', 0, 100, 21),
+)
+
+
+def fight(player: Player, npc: NPC, rounds: int) -> tuple[int, int, list[list[int]]]:
+    """Play out a fight between the given player and NPC by the code of the game, the player
+    striking first, and return the winner (0 for the player, 1 for the NPC or -1 if neither
+    won), the round it ended in, and the damage of every attack of each side."""
+    strike = npc.spell_attack if type(npc.holding) is Magic else npc.attack
+    dealt = [[], []]
+    for round_ in range(rounds):
+        for side, (attack, target) in enumerate(((player.attack, npc), (strike, player))):
+            health = target.health
+            attack(target)
+            dealt[side].append(health - target.health)
+            if target.health <= 0:
+                return side, round_, dealt
+    return -1, rounds, dealt
+
+
+def check_close(name: str, scalar: list[float], simulated: float, samples: int) -> None:
+    """Check that the mean of the given statistic over the fights the game played out is within
+    ERRORS standard errors of the mean the simulator found over the given number of samples.
+
+    Raises:
+        AssertionError: If it is not.
+    """
+    count = len(scalar)
+    mean = sum(scalar) / count
+    variance = sum((value - mean) ** 2 for value in scalar) / max(count - 1, 1)
+    error = sqrt(variance / count + variance / max(samples, 1))
+    assert mean == pytest.approx(simulated, rel=0, abs=ERRORS * error + 1e-9), (
+        f'{name}: the game gives {mean:.4f}, the simulator {simulated:.4f}, more than {ERRORS} '
+        f'standard errors apart')
+
+
+@pytest.mark.parametrize('weapon, ac, kind, damage, health, npc_ac', MATCHUPS)
+def test_parity(weapon: int, ac: int, kind: str, damage: int, health: int,
+                npc_ac: int) -> None:
+    """The simulator agrees with Player.attack, NPC.attack and NPC.spell_attack on the win rates,
+    the rounds fights take, and the hit and crit rates of each side."""
+    dice.seed(3)
+    room = Room('arena', 'AN ARENA.')
+    item = Weapon('SWORD', '', weapon)
+    spell = {'weapon': Weapon, 'magic': Magic}[kind](kind.upper(), '', damage)
+    wins = [[], []]
+    rounds = []
+    attacks = [[], []]
+    for _ in range(FIGHTS):
+        player = Player(room)
+        player.holding = item
+        player.ac = ac
+        npc = NPC(room, 'FOE', 'A FOE.')
+        npc.holding = spell
+        npc.health = health
+        npc.ac = npc_ac
+        winner, round_, dealt = fight(player, npc, ROUNDS)
+        for side in (0, 1):
+            wins[side].append(winner == side)
+            attacks[side].extend(dealt[side])
+        if winner != -1:
+            rounds.append(round_)
+
+    report = simulate(Combatant(item, 100, ac), Combatant(spell, health, npc_ac), FIGHTS * 10,
+                      ROUNDS, seed=3)
+    for side, damages in zip((0, 1), (weapon, damage)):
+        check_close(f'wins of side {side}', wins[side], report.wins[side] / report.fights,
+                    report.fights)
+        if damages:
+            check_close(f'hits of side {side}', [dealt > 0 for dealt in attacks[side]],
+                        report.hit_rate(side), report.attacks[side])
+        if side == 0 or kind == 'weapon':
+            check_close(f'crits of side {side}', [dealt == 2 * damages for dealt in attacks[side]],
+                        report.crit_rate(side), report.attacks[side])
+    if rounds:
+        kills = report.kills[0] + report.kills[1]
+        check_close('rounds', rounds, float((kills * range(ROUNDS)).sum() / kills.sum()),
+                    int(kills.sum()))
+
+
+def test_of_player_without_weapon() -> None:
+    """A player holding a spell does not attack, as Player.attack only attacks with weapons."""
+    player = Player(Room('arena', 'AN ARENA.'))
+    player.holding = Magic('FIREBALL', '', 100)
+    report = simulate(Combatant.of(player), Combatant(None), 100, 10, seed=1)
+    assert report.draws == 100
+    assert not report.hits[0]